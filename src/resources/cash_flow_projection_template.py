@@ -66,8 +66,104 @@ HEADER_FONT = Font(name='Arial', size=12, bold=True)
 NORMAL_FONT = Font(name='Arial', size=10)
 HIGHLIGHT_FONT = Font(name='Arial', size=10, bold=True, color="1B4620")
 
-def create_workbook(output_path):
-    """Create the Cash Flow Projection Template workbook with all worksheets."""
+# Line items shared by the Input tab and the Monthly Projection
+REVENUE_STREAMS = [
+    "Product Sales",
+    "Service Revenue",
+    "Subscription Income",
+    "Other Revenue 1",
+    "Other Revenue 2"
+]
+
+EXPENSE_CATEGORIES = [
+    "Salaries & Wages",
+    "Rent/Mortgage",
+    "Utilities",
+    "Insurance",
+    "Supplies",
+    "Marketing & Advertising",
+    "Professional Services",
+    "Equipment & Maintenance",
+    "Loan Payments",
+    "Taxes",
+    "Other Expenses"
+]
+
+FUNDING_SOURCES = [
+    "Bank Loan",
+    "Investor Funding",
+    "Business Line of Credit"
+]
+
+CAPEX_ITEMS = 3  # Unlabeled capital expenditure rows on the Input tab
+
+PROJECTION_HORIZONS = (12, 24, 36, 60)  # Supported projection lengths in months
+
+class ProjectionLayout:
+    """
+    Where the Monthly Projection puts each month and line item.
+    
+    setup_monthly_projection records the row of every labelled line as it
+    writes it, and the Annual Summary and Dashboard build all of their
+    references to the projection from this object rather than from literal
+    addresses, so they follow the sheet at any horizon.
+    """
+    
+    SHEET = "Monthly Projection"
+    HEADER_ROW = 4
+    FIRST_MONTH_COLUMN = 3  # Column C
+    
+    def __init__(self, months=12):
+        if months not in PROJECTION_HORIZONS:
+            raise ValueError(f"Projection horizon must be one of {PROJECTION_HORIZONS} months")
+        self.months = months
+        self.rows = {}  # Column A label -> row
+    
+    @property
+    def years(self):
+        return self.months // 12
+    
+    @property
+    def last_column(self):
+        return self.month_column(self.months)
+    
+    def month_column(self, month):
+        """Column letter of a 1-based projection month"""
+        return get_column_letter(self.FIRST_MONTH_COLUMN + month - 1)
+    
+    def year_months(self, year):
+        """First and last month of a 1-based projection year"""
+        return 12 * (year - 1) + 1, 12 * year
+    
+    def cell(self, label, month):
+        """Reference to one month of a projection line, e.g. 'Monthly Projection'!C7"""
+        return f"'{self.SHEET}'!{self.month_column(month)}{self.rows[label]}"
+    
+    def span(self, label, year=None):
+        """Reference to a projection line over one year, or the whole horizon"""
+        first, last = self.year_months(year) if year else (1, self.months)
+        row = self.rows[label]
+        return f"'{self.SHEET}'!{self.month_column(first)}{row}:{self.month_column(last)}{row}"
+    
+    def reference(self, wb, label):
+        """Chart reference to a projection line over the whole horizon"""
+        row = self.rows[label]
+        return Reference(wb[self.SHEET], min_col=self.FIRST_MONTH_COLUMN, max_col=self.FIRST_MONTH_COLUMN + self.months - 1,
+                         min_row=row, max_row=row)
+    
+    def month_labels(self, wb):
+        """Chart reference to the month headers"""
+        return Reference(wb[self.SHEET], min_col=self.FIRST_MONTH_COLUMN, max_col=self.FIRST_MONTH_COLUMN + self.months - 1,
+                         min_row=self.HEADER_ROW, max_row=self.HEADER_ROW)
+
+def create_workbook(output_path, months=12):
+    """Create the Cash Flow Projection Template workbook with all worksheets.
+    
+    Args:
+        output_path: Where to save the workbook
+        months: Projection horizon, one of PROJECTION_HORIZONS
+    """
+    layout = ProjectionLayout(months)
     wb = Workbook()
     
     # Rename the default sheet to "Dashboard"
@@ -82,14 +178,14 @@ def create_workbook(output_path):
     guidance_sheet = wb.create_sheet("Guidance")
     
     # Set up all worksheets
-    setup_input_tab(wb, input_sheet)
-    setup_monthly_projection(wb, monthly_sheet)
-    setup_annual_summary(wb, annual_sheet)
+    setup_input_tab(wb, input_sheet, layout)
+    setup_monthly_projection(wb, monthly_sheet, layout)
+    setup_annual_summary(wb, annual_sheet, layout)
     setup_assumptions(wb, assumptions_sheet)
     setup_guidance(wb, guidance_sheet)
     
     # Setup dashboard last since it references other sheets
-    setup_dashboard(wb, dashboard_sheet)
+    setup_dashboard(wb, dashboard_sheet, layout)
     
     # Save the workbook
     wb.save(output_path)
@@ -97,8 +193,15 @@ def create_workbook(output_path):
     
     return wb
 
-def setup_dashboard(wb, sheet):
-    """Set up the Dashboard worksheet with key metrics and visualizations"""
+def setup_dashboard(wb, sheet, layout=None):
+    """Set up the Dashboard worksheet with key metrics and visualizations
+    
+    Args:
+        wb: The workbook, whose Monthly Projection must already be set up
+        sheet: The worksheet to set up
+        layout: ProjectionLayout filled in by setup_monthly_projection
+    """
+    layout = layout or ProjectionLayout()
     # Set column widths
     sheet.column_dimensions['A'].width = 25
     sheet.column_dimensions['B'].width = 15
@@ -137,66 +240,62 @@ def setup_dashboard(wb, sheet):
         sheet[f'{col}{row}'].fill = GREY_FILL
         sheet[f'{col}{row}'].alignment = Alignment(horizontal='center')
     
-    # Metrics
+    # Metrics, each with its Monthly Projection line
     metrics = [
-        "Cash Balance",
-        "Monthly Cash Flow",
-        "Cumulative Cash Flow",
-        "Revenue",
-        "Expenses",
-        "Cash Flow Ratio"
+        ("Cash Balance", "Running Cash Balance"),
+        ("Monthly Cash Flow", "Net Monthly Cash Flow"),
+        ("Cumulative Cash Flow", "Net Monthly Cash Flow"),
+        ("Cash Inflows", "Total Cash Inflows"),
+        ("Cash Outflows", "Total Cash Outflows"),
+        ("Cash Flow Ratio", "Cash Flow Ratio")
     ]
+    metric_rows = {metric: row + 1 + i for i, (metric, _) in enumerate(metrics)}
     
-    # Add metrics rows
-    for i, metric in enumerate(metrics):
+    # Add metrics rows: first month, peak, low, last month and the whole horizon
+    for metric, line in metrics:
         row += 1
         sheet[f'A{row}'] = metric
         sheet[f'A{row}'].font = NORMAL_FONT
         sheet[f'A{row}'].alignment = Alignment(horizontal='left')
         
+        first = layout.cell(line, 1)
+        last = layout.cell(line, layout.months)
+        span = layout.span(line)
         if metric == "Cash Balance":
-            sheet[f'B{row}'] = "=Input!D13"  # Starting balance from Input sheet
-            sheet[f'C{row}'] = "=MAX('Monthly Projection'!O6:O17)"  # Peak balance from Monthly Projection
-            sheet[f'D{row}'] = "=MIN('Monthly Projection'!O6:O17)"  # Low balance from Monthly Projection
-            sheet[f'E{row}'] = "='Monthly Projection'!O17"  # Ending balance (December)
-            sheet[f'F{row}'] = "=E7-B7"  # Net change in cash
-        elif metric == "Monthly Cash Flow":
-            sheet[f'B{row}'] = "='Monthly Projection'!N6"  # January net cash flow
-            sheet[f'C{row}'] = "=MAX('Monthly Projection'!N6:N17)"  # Peak monthly cash flow
-            sheet[f'D{row}'] = "=MIN('Monthly Projection'!N6:N17)"  # Low monthly cash flow
-            sheet[f'E{row}'] = "='Monthly Projection'!N17"  # December net cash flow
-            sheet[f'F{row}'] = "=SUM('Monthly Projection'!N6:N17)"  # Sum of all monthly cash flows
+            sheet[f'B{row}'] = "=Input!B7"  # Starting balance from Input sheet
+            sheet[f'C{row}'] = f"=MAX({span})"  # Peak balance
+            sheet[f'D{row}'] = f"=MIN({span})"  # Low balance
+            sheet[f'E{row}'] = f"={last}"  # Ending balance
+            sheet[f'F{row}'] = f"=E{row}-B{row}"  # Net change in cash
         elif metric == "Cumulative Cash Flow":
-            sheet[f'B{row}'] = "='Monthly Projection'!N6"  # January (same as monthly for first month)
-            sheet[f'C{row}'] = "=MAX('Monthly Projection'!N6,'Monthly Projection'!N6+'Monthly Projection'!N7,'Monthly Projection'!N6+'Monthly Projection'!N7+'Monthly Projection'!N8,'Monthly Projection'!N6+'Monthly Projection'!N7+'Monthly Projection'!N8+'Monthly Projection'!N9,'Monthly Projection'!N6+'Monthly Projection'!N7+'Monthly Projection'!N8+'Monthly Projection'!N9+'Monthly Projection'!N10,'Monthly Projection'!N6+'Monthly Projection'!N7+'Monthly Projection'!N8+'Monthly Projection'!N9+'Monthly Projection'!N10+'Monthly Projection'!N11,'Monthly Projection'!N6+'Monthly Projection'!N7+'Monthly Projection'!N8+'Monthly Projection'!N9+'Monthly Projection'!N10+'Monthly Projection'!N11+'Monthly Projection'!N12,'Monthly Projection'!N6+'Monthly Projection'!N7+'Monthly Projection'!N8+'Monthly Projection'!N9+'Monthly Projection'!N10+'Monthly Projection'!N11+'Monthly Projection'!N12+'Monthly Projection'!N13,'Monthly Projection'!N6+'Monthly Projection'!N7+'Monthly Projection'!N8+'Monthly Projection'!N9+'Monthly Projection'!N10+'Monthly Projection'!N11+'Monthly Projection'!N12+'Monthly Projection'!N13+'Monthly Projection'!N14,'Monthly Projection'!N6+'Monthly Projection'!N7+'Monthly Projection'!N8+'Monthly Projection'!N9+'Monthly Projection'!N10+'Monthly Projection'!N11+'Monthly Projection'!N12+'Monthly Projection'!N13+'Monthly Projection'!N14+'Monthly Projection'!N15,'Monthly Projection'!N6+'Monthly Projection'!N7+'Monthly Projection'!N8+'Monthly Projection'!N9+'Monthly Projection'!N10+'Monthly Projection'!N11+'Monthly Projection'!N12+'Monthly Projection'!N13+'Monthly Projection'!N14+'Monthly Projection'!N15+'Monthly Projection'!N16,'Monthly Projection'!N6+'Monthly Projection'!N7+'Monthly Projection'!N8+'Monthly Projection'!N9+'Monthly Projection'!N10+'Monthly Projection'!N11+'Monthly Projection'!N12+'Monthly Projection'!N13+'Monthly Projection'!N14+'Monthly Projection'!N15+'Monthly Projection'!N16+'Monthly Projection'!N17)"
-            sheet[f'D{row}'] = "=MIN('Monthly Projection'!N6,'Monthly Projection'!N6+'Monthly Projection'!N7,'Monthly Projection'!N6+'Monthly Projection'!N7+'Monthly Projection'!N8,'Monthly Projection'!N6+'Monthly Projection'!N7+'Monthly Projection'!N8+'Monthly Projection'!N9,'Monthly Projection'!N6+'Monthly Projection'!N7+'Monthly Projection'!N8+'Monthly Projection'!N9+'Monthly Projection'!N10,'Monthly Projection'!N6+'Monthly Projection'!N7+'Monthly Projection'!N8+'Monthly Projection'!N9+'Monthly Projection'!N10+'Monthly Projection'!N11,'Monthly Projection'!N6+'Monthly Projection'!N7+'Monthly Projection'!N8+'Monthly Projection'!N9+'Monthly Projection'!N10+'Monthly Projection'!N11+'Monthly Projection'!N12,'Monthly Projection'!N6+'Monthly Projection'!N7+'Monthly Projection'!N8+'Monthly Projection'!N9+'Monthly Projection'!N10+'Monthly Projection'!N11+'Monthly Projection'!N12+'Monthly Projection'!N13,'Monthly Projection'!N6+'Monthly Projection'!N7+'Monthly Projection'!N8+'Monthly Projection'!N9+'Monthly Projection'!N10+'Monthly Projection'!N11+'Monthly Projection'!N12+'Monthly Projection'!N13+'Monthly Projection'!N14,'Monthly Projection'!N6+'Monthly Projection'!N7+'Monthly Projection'!N8+'Monthly Projection'!N9+'Monthly Projection'!N10+'Monthly Projection'!N11+'Monthly Projection'!N12+'Monthly Projection'!N13+'Monthly Projection'!N14+'Monthly Projection'!N15,'Monthly Projection'!N6+'Monthly Projection'!N7+'Monthly Projection'!N8+'Monthly Projection'!N9+'Monthly Projection'!N10+'Monthly Projection'!N11+'Monthly Projection'!N12+'Monthly Projection'!N13+'Monthly Projection'!N14+'Monthly Projection'!N15+'Monthly Projection'!N16,'Monthly Projection'!N6+'Monthly Projection'!N7+'Monthly Projection'!N8+'Monthly Projection'!N9+'Monthly Projection'!N10+'Monthly Projection'!N11+'Monthly Projection'!N12+'Monthly Projection'!N13+'Monthly Projection'!N14+'Monthly Projection'!N15+'Monthly Projection'!N16+'Monthly Projection'!N17)"
-            sheet[f'E{row}'] = "=SUM('Monthly Projection'!N6:N17)"  # Sum of all monthly cash flows
-            sheet[f'F{row}'] = "=E9"  # Same as ending cumulative cash flow
-        elif metric == "Revenue":
-            sheet[f'B{row}'] = "='Monthly Projection'!B6"  # January revenue
-            sheet[f'C{row}'] = "=MAX('Monthly Projection'!B6:B17)"  # Peak monthly revenue
-            sheet[f'D{row}'] = "=MIN('Monthly Projection'!B6:B17)"  # Low monthly revenue
-            sheet[f'E{row}'] = "='Monthly Projection'!B17"  # December revenue
-            sheet[f'F{row}'] = "=SUM('Monthly Projection'!B6:B17)"  # Total annual revenue
-        elif metric == "Expenses":
-            sheet[f'B{row}'] = "='Monthly Projection'!H6"  # January expenses
-            sheet[f'C{row}'] = "=MAX('Monthly Projection'!H6:H17)"  # Peak monthly expenses
-            sheet[f'D{row}'] = "=MIN('Monthly Projection'!H6:H17)"  # Low monthly expenses
-            sheet[f'E{row}'] = "='Monthly Projection'!H17"  # December expenses
-            sheet[f'F{row}'] = "=SUM('Monthly Projection'!H6:H17)"  # Total annual expenses
+            # Cumulative flow is the running balance less the starting balance
+            balance = layout.span("Running Cash Balance")
+            sheet[f'B{row}'] = f"={first}"  # First month (same as monthly for first month)
+            sheet[f'C{row}'] = f"=MAX({balance})-Input!B7"
+            sheet[f'D{row}'] = f"=MIN({balance})-Input!B7"
+            sheet[f'E{row}'] = f"=SUM({span})"  # Sum of all monthly cash flows
+            sheet[f'F{row}'] = f"=E{row}"  # Same as ending cumulative cash flow
         elif metric == "Cash Flow Ratio":
-            sheet[f'B{row}'] = "=IF(B10=0,0,B8/B10)"  # January cash flow ratio
-            sheet[f'C{row}'] = "=MAX('Monthly Projection'!B6/'Monthly Projection'!H6,'Monthly Projection'!B7/'Monthly Projection'!H7,'Monthly Projection'!B8/'Monthly Projection'!H8,'Monthly Projection'!B9/'Monthly Projection'!H9,'Monthly Projection'!B10/'Monthly Projection'!H10,'Monthly Projection'!B11/'Monthly Projection'!H11,'Monthly Projection'!B12/'Monthly Projection'!H12,'Monthly Projection'!B13/'Monthly Projection'!H13,'Monthly Projection'!B14/'Monthly Projection'!H14,'Monthly Projection'!B15/'Monthly Projection'!H15,'Monthly Projection'!B16/'Monthly Projection'!H16,'Monthly Projection'!B17/'Monthly Projection'!H17)"
-            sheet[f'D{row}'] = "=MIN('Monthly Projection'!B6/'Monthly Projection'!H6,'Monthly Projection'!B7/'Monthly Projection'!H7,'Monthly Projection'!B8/'Monthly Projection'!H8,'Monthly Projection'!B9/'Monthly Projection'!H9,'Monthly Projection'!B10/'Monthly Projection'!H10,'Monthly Projection'!B11/'Monthly Projection'!H11,'Monthly Projection'!B12/'Monthly Projection'!H12,'Monthly Projection'!B13/'Monthly Projection'!H13,'Monthly Projection'!B14/'Monthly Projection'!H14,'Monthly Projection'!B15/'Monthly Projection'!H15,'Monthly Projection'!B16/'Monthly Projection'!H16,'Monthly Projection'!B17/'Monthly Projection'!H17)"
-            sheet[f'E{row}'] = "=IF(E10=0,0,E8/E10)"  # December cash flow ratio
-            sheet[f'F{row}'] = "=IF(F10=0,0,F8/F10)"  # Annual cash flow ratio
+            inflows = metric_rows["Cash Inflows"]
+            outflows = metric_rows["Cash Outflows"]
+            sheet[f'B{row}'] = f"={first}"
+            sheet[f'C{row}'] = f"=MAX({span})"
+            sheet[f'D{row}'] = f"=MIN({span})"
+            sheet[f'E{row}'] = f"={last}"
+            sheet[f'F{row}'] = f"=IF(F{outflows}=0,0,F{inflows}/F{outflows})"  # Ratio over the whole horizon
+        else:
+            sheet[f'B{row}'] = f"={first}"  # First month
+            sheet[f'C{row}'] = f"=MAX({span})"  # Peak month
+            sheet[f'D{row}'] = f"=MIN({span})"  # Low month
+            sheet[f'E{row}'] = f"={last}"  # Last month
+            sheet[f'F{row}'] = f"=SUM({span})"  # Total over the horizon
             
         # Format cells based on metric type
         for col in ['B', 'C', 'D', 'E', 'F']:
-            if metric in ["Cash Balance", "Monthly Cash Flow", "Cumulative Cash Flow", "Revenue", "Expenses"]:
-                sheet[f'{col}{row}'].number_format = '_($* #,##0.00_);_($* (#,##0.00);_($* "-"??_);_(@_)'
-            elif metric == "Cash Flow Ratio":
+            if metric == "Cash Flow Ratio":
                 sheet[f'{col}{row}'].number_format = '0.00'
+            else:
+                sheet[f'{col}{row}'].number_format = '_($* #,##0.00_);_($* (#,##0.00);_($* "-"??_);_(@_)'
     
     # Cash Flow Chart
     chart_title = "Monthly Cash Flow"
@@ -214,11 +313,9 @@ def setup_dashboard(wb, sheet):
     chart1.y_axis.title = "Amount"
     chart1.x_axis.title = "Month"
     
-    # Create data references
-    months = Reference(wb["Monthly Projection"], min_col=2, min_row=4, max_row=4, max_col=14)
-    data = Reference(wb["Monthly Projection"], min_col=14, min_row=5, max_row=17, max_col=14)
-    
-    chart1.add_data(data)
+    # Create data references; projection lines run across the month columns
+    months = layout.month_labels(wb)
+    chart1.series.append(Series(layout.reference(wb, "Net Monthly Cash Flow"), title="Net Cash Flow"))
     chart1.set_categories(months)
     chart1.shape = 4
     sheet.add_chart(chart1, "A15")
@@ -239,23 +336,9 @@ def setup_dashboard(wb, sheet):
     chart2.y_axis.title = "Amount"
     chart2.x_axis.title = "Month"
     
-    # Add hidden cells to the sheet for series names
-    sheet['X1'] = "Revenue"
-    sheet['X2'] = "Expenses"
-    sheet['X3'] = "Cash Balance"
-    
-    # Create data references for revenue
-    revenue_data = Reference(wb["Monthly Projection"], min_col=2, min_row=5, max_row=17, max_col=2)
-    expense_data = Reference(wb["Monthly Projection"], min_col=8, min_row=5, max_row=17, max_col=8)
-    
-    # Add the series with titles from data
-    sheet['Y1'] = "='Monthly Projection'!B5"
-    sheet['Y2'] = "='Monthly Projection'!H5"
-    revenue_title = Reference(sheet, min_col=24, min_row=1, max_row=1)
-    expense_title = Reference(sheet, min_col=24, min_row=2, max_row=2)
-    
-    chart2.add_data(revenue_data, titles_from_data=False)
-    chart2.add_data(expense_data, titles_from_data=False)
+    # Add the inflow and outflow series
+    chart2.series.append(Series(layout.reference(wb, "Total Cash Inflows"), title="Cash Inflows"))
+    chart2.series.append(Series(layout.reference(wb, "Total Cash Outflows"), title="Cash Outflows"))
     chart2.set_categories(months)
     
     # Style the lines
@@ -284,11 +367,8 @@ def setup_dashboard(wb, sheet):
     chart3.y_axis.title = "Balance"
     chart3.x_axis.title = "Month"
     
-    # Create data reference for cash balance
-    balance_data = Reference(wb["Monthly Projection"], min_col=15, min_row=5, max_row=17, max_col=15)
-    
     # Add data series
-    chart3.add_data(balance_data, titles_from_data=False)
+    chart3.series.append(Series(layout.reference(wb, "Running Cash Balance"), title="Cash Balance"))
     chart3.set_categories(months)
     
     # Style the line
@@ -311,8 +391,10 @@ def setup_dashboard(wb, sheet):
     sheet[f'A{row}'].font = Font(name='Arial', size=9)
     sheet[f'A{row}'].alignment = Alignment(horizontal='center')
 
-def setup_input_tab(wb, sheet):
+def setup_input_tab(wb, sheet, layout=None):
     """Set up the Input tab for entering business information and assumptions"""
+    layout = layout or ProjectionLayout()
+    
     # Set column widths
     sheet.column_dimensions['A'].width = 30
     sheet.column_dimensions['B'].width = 20
@@ -330,7 +412,7 @@ def setup_input_tab(wb, sheet):
         ("Business Name", "", "Enter your business name"),
         ("Industry", "", "Select or enter your primary industry"),
         ("Projection Start Date", "", "MM/DD/YYYY format"),
-        ("Projection Period", "12", "Number of months to project (default: 12)"),
+        ("Projection Period", str(layout.months), "Number of months projected (set when the template is generated)"),
         ("Starting Cash Balance", 0, "Current cash balance to start projection"),
         ("Currency", "USD", "Default currency for all values")
     ]
@@ -370,16 +452,8 @@ def setup_input_tab(wb, sheet):
         sheet[f'{col}{row}'].font = Font(name='Arial', size=10, bold=True)
         sheet[f'{col}{row}'].fill = GREY_FILL
     
-    # Revenue streams (5 rows)
-    revenue_streams = [
-        "Product Sales",
-        "Service Revenue",
-        "Subscription Income",
-        "Other Revenue 1",
-        "Other Revenue 2"
-    ]
-    
-    for i, stream in enumerate(revenue_streams):
+    # Revenue streams
+    for i, stream in enumerate(REVENUE_STREAMS):
         row += 1
         sheet[f'A{row}'] = stream
         sheet[f'B{row}'] = 0
@@ -409,21 +483,7 @@ def setup_input_tab(wb, sheet):
         sheet[f'{col}{row}'].fill = GREY_FILL
     
     # Expense categories
-    expense_categories = [
-        "Salaries & Wages",
-        "Rent/Mortgage",
-        "Utilities",
-        "Insurance",
-        "Supplies",
-        "Marketing & Advertising",
-        "Professional Services",
-        "Equipment & Maintenance",
-        "Loan Payments",
-        "Taxes",
-        "Other Expenses"
-    ]
-    
-    for i, category in enumerate(expense_categories):
+    for i, category in enumerate(EXPENSE_CATEGORIES):
         row += 1
         sheet[f'A{row}'] = category
         sheet[f'B{row}'] = 0
@@ -449,8 +509,8 @@ def setup_input_tab(wb, sheet):
         sheet[f'{col}{row}'].font = Font(name='Arial', size=10, bold=True)
         sheet[f'{col}{row}'].fill = GREY_FILL
     
-    # Capital expenditure rows (3 rows)
-    for i in range(3):
+    # Capital expenditure rows
+    for i in range(CAPEX_ITEMS):
         row += 1
         sheet[f'A{row}'] = ""
         sheet[f'B{row}'] = 0
@@ -476,14 +536,8 @@ def setup_input_tab(wb, sheet):
         sheet[f'{col}{row}'].font = Font(name='Arial', size=10, bold=True)
         sheet[f'{col}{row}'].fill = GREY_FILL
     
-    # Funding sources (3 rows)
-    funding_sources = [
-        "Bank Loan",
-        "Investor Funding",
-        "Business Line of Credit"
-    ]
-    
-    for i, source in enumerate(funding_sources):
+    # Funding sources
+    for i, source in enumerate(FUNDING_SOURCES):
         row += 1
         sheet[f'A{row}'] = source
         sheet[f'B{row}'] = 0
@@ -517,45 +571,76 @@ def setup_input_tab(wb, sheet):
     sheet[f'A{row}'].font = Font(name='Arial', size=9)
     sheet[f'A{row}'].alignment = Alignment(horizontal='center')
 
-def setup_monthly_projection(wb, sheet):
-    """Set up the Monthly Projection worksheet with a detailed cash flow projection"""
+def input_row_index(input_sheet):
+    """
+    Map each label in column A of the Input sheet to its row number.
+    
+    Built once per projection so every section looks up its Input rows in a
+    dict instead of scanning the sheet for each line item and month.
+    """
+    index = {}
+    for row, (label,) in enumerate(input_sheet.iter_rows(min_col=1, max_col=1, values_only=True), start=1):
+        if isinstance(label, str) and label.strip():
+            index.setdefault(label.strip(), row)
+    return index
+
+def setup_monthly_projection(wb, sheet, layout=None):
+    """Set up the Monthly Projection worksheet with a detailed cash flow projection
+    
+    Args:
+        wb: The workbook, whose Input sheet must already be set up
+        sheet: The worksheet to set up
+        layout: ProjectionLayout giving the horizon; the row of every
+            labelled line is recorded in it for the other sheets
+    """
+    layout = layout or ProjectionLayout()
+    months = layout.months
+    currency_format = '_($* #,##0.00_);_($* (#,##0.00);_($* "-"??_);_(@_)'
+    last_col = layout.last_column
+    month_cols = [layout.month_column(month) for month in range(1, months + 1)]
+    first_col = month_cols[0]
+    
+    # Input rows by label, shared by every section below
+    input_sheet = wb["Input"]
+    input_rows = input_row_index(input_sheet)
+    
     # Set column widths
     sheet.column_dimensions['A'].width = 30
     sheet.column_dimensions['B'].width = 20
-    for col in range(3, 15):  # Columns C through N (12 months)
-        sheet.column_dimensions[get_column_letter(col)].width = 15
+    for col_letter in month_cols:
+        sheet.column_dimensions[col_letter].width = 15
     
     # Projection Title
-    sheet.merge_cells('A1:N1')
+    sheet.merge_cells(f'A1:{last_col}1')
     sheet['A1'] = "MONTHLY CASH FLOW PROJECTION"
     sheet['A1'].font = TITLE_FONT
     sheet['A1'].fill = BLUE_FILL
     sheet['A1'].alignment = Alignment(horizontal='center', vertical='center')
     
     # Business info line
-    sheet.merge_cells('A2:N2')
+    sheet.merge_cells(f'A2:{last_col}2')
     sheet['A2'] = "=CONCATENATE(\"Business: \", Input!B3, \" - \", \"Industry: \", Input!B4)"
     sheet['A2'].font = Font(name='Arial', size=10, italic=True)
     sheet['A2'].alignment = Alignment(horizontal='center')
     
     # Month headers
-    sheet['B4'] = "CATEGORY"
-    sheet['B4'].font = HEADER_FONT
-    sheet['B4'].fill = GREY_FILL
-    sheet['B4'].alignment = Alignment(horizontal='center')
+    header_row = layout.HEADER_ROW
+    sheet[f'B{header_row}'] = "CATEGORY"
+    sheet[f'B{header_row}'].font = HEADER_FONT
+    sheet[f'B{header_row}'].fill = GREY_FILL
+    sheet[f'B{header_row}'].alignment = Alignment(horizontal='center')
     
     # Generate month headers using formulas based on start date
-    for i in range(12):
-        col_letter = get_column_letter(i + 3)  # Start at column C
+    for i, col_letter in enumerate(month_cols):
         # Formula to calculate month based on start date
-        sheet[f'{col_letter}4'] = f'=TEXT(EDATE(Input!B5,{i}), "mmm-yy")'
-        sheet[f'{col_letter}4'].font = HEADER_FONT
-        sheet[f'{col_letter}4'].fill = GREY_FILL
-        sheet[f'{col_letter}4'].alignment = Alignment(horizontal='center')
+        sheet[f'{col_letter}{header_row}'] = f'=TEXT(EDATE(Input!B5,{i}), "mmm-yy")'
+        sheet[f'{col_letter}{header_row}'].font = HEADER_FONT
+        sheet[f'{col_letter}{header_row}'].fill = GREY_FILL
+        sheet[f'{col_letter}{header_row}'].alignment = Alignment(horizontal='center')
     
     # Cash Inflows Section
     row = 6
-    sheet.merge_cells(f'A{row}:N{row}')
+    sheet.merge_cells(f'A{row}:{last_col}{row}')
     sheet[f'A{row}'] = "CASH INFLOWS"
     sheet[f'A{row}'].font = HEADER_FONT
     sheet[f'A{row}'].fill = LIGHT_GREEN_FILL
@@ -563,6 +648,8 @@ def setup_monthly_projection(wb, sheet):
     
     # Category label for cash inflows summary
     row += 1
+    inflow_total_row = row
+    layout.rows["Total Cash Inflows"] = row
     sheet[f'A{row}'] = "Total Cash Inflows"
     sheet[f'A{row}'].font = Font(name='Arial', size=10, bold=True)
     sheet[f'B{row}'].font = Font(name='Arial', size=10, bold=True)
@@ -577,35 +664,19 @@ def setup_monthly_projection(wb, sheet):
     
     # Revenue streams from input tab
     revenue_rows = []
-    revenue_streams = [
-        "Product Sales",
-        "Service Revenue", 
-        "Subscription Income",
-        "Other Revenue 1",
-        "Other Revenue 2"
-    ]
-    
-    for stream in revenue_streams:
+    for stream in REVENUE_STREAMS:
         row += 1
         revenue_rows.append(row)
+        layout.rows[stream] = row
         sheet[f'A{row}'] = stream
         sheet[f'B{row}'] = "Monthly"
         
-        # Add formula for each month (copy from input with growth assumptions)
-        for i in range(12):
-            col_letter = get_column_letter(i + 3)  # Start at column C
-            
-            # Look up the value from Input tab
-            input_row = None
-            for r in range(11, 17):  # Approximate range where revenue streams are defined
-                if sheet.cell(row=r, column=1).value == stream:
-                    input_row = r
-                    break
-            
-            if input_row:
-                # Basic formula that can be enhanced with growth logic
+        input_row = input_rows.get(stream)
+        if input_row:
+            # Add formula for each month (basic formula that can be enhanced with growth logic)
+            for col_letter in month_cols:
                 sheet[f'{col_letter}{row}'] = f'=Input!B{input_row}'
-                sheet[f'{col_letter}{row}'].number_format = '_($* #,##0.00_);_($* (#,##0.00);_($* "-"??_);_(@_)'
+                sheet[f'{col_letter}{row}'].number_format = currency_format
     
     # Funding & Financing
     row += 2
@@ -615,38 +686,24 @@ def setup_monthly_projection(wb, sheet):
     
     # Funding sources from input tab
     funding_rows = []
-    funding_sources = [
-        "Bank Loan",
-        "Investor Funding",
-        "Business Line of Credit"
-    ]
-    
-    for source in funding_sources:
+    for source in FUNDING_SOURCES:
         row += 1
         funding_rows.append(row)
+        layout.rows[source] = row
         sheet[f'A{row}'] = source
         sheet[f'B{row}'] = "One-time"
         
-        # For each funding source, amount goes in specified month only
-        for i in range(12):
-            col_letter = get_column_letter(i + 3)  # Start at column C
-            
-            # Find corresponding input row
-            input_row = None
-            for r in range(30, 40):  # Approximate range for funding sources
-                if wb["Input"].cell(row=r, column=1).value == source:
-                    input_row = r
-                    break
-            
-            if input_row:
-                # Only put the amount in the specified month
-                month_cell = wb["Input"].cell(row=input_row, column=3).value
+        input_row = input_rows.get(source)
+        if input_row:
+            # For each funding source, amount goes in specified month only
+            month_cell = input_sheet.cell(row=input_row, column=3).value
+            for i, col_letter in enumerate(month_cols):
                 if month_cell and isinstance(month_cell, int) and month_cell == i + 1:
                     sheet[f'{col_letter}{row}'] = f'=Input!B{input_row}'
                 else:
                     sheet[f'{col_letter}{row}'] = 0
                 
-                sheet[f'{col_letter}{row}'].number_format = '_($* #,##0.00_);_($* (#,##0.00);_($* "-"??_);_(@_)'
+                sheet[f'{col_letter}{row}'].number_format = currency_format
     
     # Other Inflows
     row += 2
@@ -659,32 +716,30 @@ def setup_monthly_projection(wb, sheet):
     for i in range(2):
         row += 1
         other_inflow_rows.append(row)
+        layout.rows[f"Other Inflow {i+1}"] = row
         sheet[f'A{row}'] = f"Other Inflow {i+1}"
         sheet[f'B{row}'] = ""
         
-        for j in range(12):
-            col_letter = get_column_letter(j + 3)
+        for col_letter in month_cols:
             sheet[f'{col_letter}{row}'] = 0
-            sheet[f'{col_letter}{row}'].number_format = '_($* #,##0.00_);_($* (#,##0.00);_($* "-"??_);_(@_)'
+            sheet[f'{col_letter}{row}'].number_format = currency_format
     
     # Now add formulas for Total Cash Inflows
     first_revenue_row = revenue_rows[0]
     last_other_inflow_row = other_inflow_rows[-1]
     
     # Go back to the Total Cash Inflows row
-    inflow_total_row = 7
-    for i in range(12):
-        col_letter = get_column_letter(i + 3)
+    for col_letter in month_cols:
         # Sum all inflows
         sheet[f'{col_letter}{inflow_total_row}'] = f'=SUM({col_letter}{first_revenue_row}:{col_letter}{last_other_inflow_row})'
-        sheet[f'{col_letter}{inflow_total_row}'].number_format = '_($* #,##0.00_);_($* (#,##0.00);_($* "-"??_);_(@_)'
+        sheet[f'{col_letter}{inflow_total_row}'].number_format = currency_format
         sheet[f'{col_letter}{inflow_total_row}'].font = Font(name='Arial', size=10, bold=True)
     
     # Cash Outflows Section
     row = last_other_inflow_row + 2
     outflow_section_start = row
     
-    sheet.merge_cells(f'A{row}:N{row}')
+    sheet.merge_cells(f'A{row}:{last_col}{row}')
     sheet[f'A{row}'] = "CASH OUTFLOWS"
     sheet[f'A{row}'].font = HEADER_FONT
     sheet[f'A{row}'].fill = LIGHT_BLUE_FILL
@@ -693,6 +748,7 @@ def setup_monthly_projection(wb, sheet):
     # Category label for cash outflows summary
     row += 1
     outflow_total_row = row
+    layout.rows["Total Cash Outflows"] = row
     sheet[f'A{row}'] = "Total Cash Outflows"
     sheet[f'A{row}'].font = Font(name='Arial', size=10, bold=True)
     sheet[f'B{row}'].font = Font(name='Arial', size=10, bold=True)
@@ -705,41 +761,19 @@ def setup_monthly_projection(wb, sheet):
     
     # Expense categories from input tab
     expense_rows = []
-    expense_categories = [
-        "Salaries & Wages",
-        "Rent/Mortgage",
-        "Utilities",
-        "Insurance",
-        "Supplies",
-        "Marketing & Advertising",
-        "Professional Services",
-        "Equipment & Maintenance",
-        "Loan Payments",
-        "Taxes",
-        "Other Expenses"
-    ]
-    
-    for category in expense_categories:
+    for category in EXPENSE_CATEGORIES:
         row += 1
         expense_rows.append(row)
+        layout.rows[category] = row
         sheet[f'A{row}'] = category
         sheet[f'B{row}'] = "Monthly"
         
-        # Add formula for each month
-        for i in range(12):
-            col_letter = get_column_letter(i + 3)  # Start at column C
-            
-            # Find corresponding input row
-            input_row = None
-            for r in range(17, 30):  # Approximate range for expense categories
-                if wb["Input"].cell(row=r, column=1).value == category:
-                    input_row = r
-                    break
-            
-            if input_row:
-                # Basic formula that can be enhanced with growth logic
+        input_row = input_rows.get(category)
+        if input_row:
+            # Add formula for each month (basic formula that can be enhanced with growth logic)
+            for col_letter in month_cols:
                 sheet[f'{col_letter}{row}'] = f'=Input!B{input_row}'
-                sheet[f'{col_letter}{row}'].number_format = '_($* #,##0.00_);_($* (#,##0.00);_($* "-"??_);_(@_)'
+                sheet[f'{col_letter}{row}'].number_format = currency_format
     
     # Capital Expenditures
     row += 2
@@ -747,46 +781,42 @@ def setup_monthly_projection(wb, sheet):
     sheet[f'A{row}'].font = HEADER_FONT
     sheet[f'A{row}'].fill = GREY_FILL
     
-    # Capital expenditure rows from input
+    # Capital expenditure rows are unlabeled on the Input tab; they follow its column header row
+    capex_header_row = input_rows.get("Expenditure Description")
     capex_rows = []
-    for i in range(3):  # Assuming 3 capex rows in input
+    for i in range(CAPEX_ITEMS):
         row += 1
         capex_rows.append(row)
+        layout.rows[f"Capital Expenditure {i+1}"] = row
         sheet[f'A{row}'] = f"Capital Expenditure {i+1}"
         sheet[f'B{row}'] = "One-time"
         
         # For each capex, amount goes in specified month only
-        for j in range(12):
-            col_letter = get_column_letter(j + 3)
-            
-            # Find corresponding input row (since we don't have exact label matches)
-            input_row = 24 + i  # Approximate position in input
-            
-            # Only put the amount in the specified month
-            month_cell = wb["Input"].cell(row=input_row, column=3).value
+        input_row = capex_header_row + 1 + i if capex_header_row else None
+        month_cell = input_sheet.cell(row=input_row, column=3).value if input_row else None
+        for j, col_letter in enumerate(month_cols):
             if month_cell and isinstance(month_cell, int) and month_cell == j + 1:
                 sheet[f'{col_letter}{row}'] = f'=Input!B{input_row}'
             else:
                 sheet[f'{col_letter}{row}'] = 0
             
-            sheet[f'{col_letter}{row}'].number_format = '_($* #,##0.00_);_($* (#,##0.00);_($* "-"??_);_(@_)'
+            sheet[f'{col_letter}{row}'].number_format = currency_format
     
     # Now add formulas for Total Cash Outflows
     first_expense_row = expense_rows[0]
     last_capex_row = capex_rows[-1]
     
     # Go back to the Total Cash Outflows row
-    for i in range(12):
-        col_letter = get_column_letter(i + 3)
+    for col_letter in month_cols:
         # Sum all outflows
         sheet[f'{col_letter}{outflow_total_row}'] = f'=SUM({col_letter}{first_expense_row}:{col_letter}{last_capex_row})'
-        sheet[f'{col_letter}{outflow_total_row}'].number_format = '_($* #,##0.00_);_($* (#,##0.00);_($* "-"??_);_(@_)'
+        sheet[f'{col_letter}{outflow_total_row}'].number_format = currency_format
         sheet[f'{col_letter}{outflow_total_row}'].font = Font(name='Arial', size=10, bold=True)
     
     # Net Cash Flow Section
     row = last_capex_row + 2
     
-    sheet.merge_cells(f'A{row}:N{row}')
+    sheet.merge_cells(f'A{row}:{last_col}{row}')
     sheet[f'A{row}'] = "CASH FLOW SUMMARY"
     sheet[f'A{row}'].font = HEADER_FONT
     sheet[f'A{row}'].fill = CIF_GREEN
@@ -795,110 +825,143 @@ def setup_monthly_projection(wb, sheet):
     # Net Monthly Cash Flow
     row += 1
     net_flow_row = row
+    layout.rows["Net Monthly Cash Flow"] = row
     sheet[f'A{row}'] = "Net Monthly Cash Flow"
     sheet[f'A{row}'].font = Font(name='Arial', size=10, bold=True)
     sheet[f'B{row}'].font = Font(name='Arial', size=10, bold=True)
     
-    for i in range(12):
-        col_letter = get_column_letter(i + 3)
+    # Conditional formatting for negative cash flow
+    red_font = Font(color="FF0000", bold=True)
+    green_font = Font(color="00A651", bold=True)
+    
+    for col_letter in month_cols:
         # Inflows minus outflows
         sheet[f'{col_letter}{row}'] = f'={col_letter}{inflow_total_row}-{col_letter}{outflow_total_row}'
-        sheet[f'{col_letter}{row}'].number_format = '_($* #,##0.00_);_($* (#,##0.00);_($* "-"??_);_(@_)'
-        
-        # Conditional formatting for negative cash flow
-        red_font = Font(color="FF0000", bold=True)
-        green_font = Font(color="00A651", bold=True)
-        
-        rule = Rule(type="cellIs", operator="lessThan", formula=["0"], dxf=DifferentialStyle(font=red_font))
-        sheet.conditional_formatting.add(f'{col_letter}{row}', rule)
-        
-        rule = Rule(type="cellIs", operator="greaterThanOrEqual", formula=["0"], dxf=DifferentialStyle(font=green_font))
-        sheet.conditional_formatting.add(f'{col_letter}{row}', rule)
+        sheet[f'{col_letter}{row}'].number_format = currency_format
+    
+    # One rule pair per line rather than per cell keeps the file size proportional to the horizon
+    rule = Rule(type="cellIs", operator="lessThan", formula=["0"], dxf=DifferentialStyle(font=red_font))
+    sheet.conditional_formatting.add(f'{first_col}{row}:{last_col}{row}', rule)
+    
+    rule = Rule(type="cellIs", operator="greaterThanOrEqual", formula=["0"], dxf=DifferentialStyle(font=green_font))
+    sheet.conditional_formatting.add(f'{first_col}{row}:{last_col}{row}', rule)
     
     # Running Cash Balance
     row += 1
+    layout.rows["Running Cash Balance"] = row
     sheet[f'A{row}'] = "Running Cash Balance"
     sheet[f'A{row}'].font = Font(name='Arial', size=10, bold=True)
     sheet[f'B{row}'] = "Cumulative"
     sheet[f'B{row}'].font = Font(name='Arial', size=10, bold=True)
     
     # First month is starting balance plus first month's net flow
-    sheet[f'C{row}'] = f'=Input!B7+C{net_flow_row}'
-    sheet[f'C{row}'].number_format = '_($* #,##0.00_);_($* (#,##0.00);_($* "-"??_);_(@_)'
+    sheet[f'{first_col}{row}'] = f'=Input!B7+{first_col}{net_flow_row}'
+    sheet[f'{first_col}{row}'].number_format = currency_format
     
     # Subsequent months add previous balance to current month's net flow
-    for i in range(1, 12):
-        prev_col = get_column_letter(i + 2)
-        curr_col = get_column_letter(i + 3)
+    for prev_col, curr_col in zip(month_cols, month_cols[1:]):
         sheet[f'{curr_col}{row}'] = f'={prev_col}{row}+{curr_col}{net_flow_row}'
-        sheet[f'{curr_col}{row}'].number_format = '_($* #,##0.00_);_($* (#,##0.00);_($* "-"??_);_(@_)'
-        
-        # Add conditional formatting for negative balance
-        red_font = Font(color="FF0000", bold=True)
-        green_font = Font(color="00A651", bold=True)
-        
-        rule = Rule(type="cellIs", operator="lessThan", formula=["0"], dxf=DifferentialStyle(font=red_font))
-        sheet.conditional_formatting.add(f'{curr_col}{row}', rule)
-        
-        rule = Rule(type="cellIs", operator="greaterThanOrEqual", formula=["0"], dxf=DifferentialStyle(font=green_font))
-        sheet.conditional_formatting.add(f'{curr_col}{row}', rule)
+        sheet[f'{curr_col}{row}'].number_format = currency_format
+    
+    # Add conditional formatting for negative balance
+    rule = Rule(type="cellIs", operator="lessThan", formula=["0"], dxf=DifferentialStyle(font=red_font))
+    sheet.conditional_formatting.add(f'{first_col}{row}:{last_col}{row}', rule)
+    
+    rule = Rule(type="cellIs", operator="greaterThanOrEqual", formula=["0"], dxf=DifferentialStyle(font=green_font))
+    sheet.conditional_formatting.add(f'{first_col}{row}:{last_col}{row}', rule)
+    
+    # Cash Flow Ratio (inflows per dollar of outflows), charted on the Dashboard
+    row += 1
+    layout.rows["Cash Flow Ratio"] = row
+    sheet[f'A{row}'] = "Cash Flow Ratio"
+    sheet[f'A{row}'].font = Font(name='Arial', size=10, bold=True)
+    sheet[f'B{row}'] = "Inflows / Outflows"
+    sheet[f'B{row}'].font = Font(name='Arial', size=10, bold=True)
+    
+    for col_letter in month_cols:
+        sheet[f'{col_letter}{row}'] = f'=IF({col_letter}{outflow_total_row}=0,0,{col_letter}{inflow_total_row}/{col_letter}{outflow_total_row})'
+        sheet[f'{col_letter}{row}'].number_format = '0.00'
     
     # Add borders to all filled cells
     max_row = row
     for row in range(1, max_row + 1):
-        for col in range(1, 15):  # Columns A-N
+        for col in range(1, months + 3):  # Columns A through the last month
             cell = sheet.cell(row=row, column=col)
             cell.border = THIN_BORDER
     
     # Add notes and warnings
     row += 2
-    sheet.merge_cells(f'A{row}:N{row}')
+    sheet.merge_cells(f'A{row}:{last_col}{row}')
     sheet[f'A{row}'] = "Note: Negative cash flow or balance is highlighted in red. Review your assumptions or adjust your business plan accordingly."
     sheet[f'A{row}'].font = Font(name='Arial', size=9, italic=True)
     sheet[f'A{row}'].alignment = Alignment(horizontal='left')
     
     # Add company branding
     row += 2
-    sheet.merge_cells(f'A{row}:N{row}')
+    sheet.merge_cells(f'A{row}:{last_col}{row}')
     sheet[f'A{row}'] = "Prepared by Clarity Impact Finance"
     sheet[f'A{row}'].font = Font(name='Arial', size=10, bold=True)
     sheet[f'A{row}'].alignment = Alignment(horizontal='center')
     
     row += 1
-    sheet.merge_cells(f'A{row}:N{row}')
+    sheet.merge_cells(f'A{row}:{last_col}{row}')
     sheet[f'A{row}'] = "contact@clarityimpactfinance.com"
     sheet[f'A{row}'].font = Font(name='Arial', size=9)
     sheet[f'A{row}'].alignment = Alignment(horizontal='center')
 
-def setup_annual_summary(wb, sheet):
-    """Set up the Annual Summary worksheet with yearly totals and key metrics"""
+def setup_annual_summary(wb, sheet, layout=None):
+    """Set up the Annual Summary worksheet with yearly totals and key metrics
+    
+    Args:
+        wb: The workbook
+        sheet: The worksheet to set up
+        layout: ProjectionLayout of the Monthly Projection; one column per
+            projection year, plus a Total column for multi-year horizons
+    """
+    layout = layout or ProjectionLayout()
+    currency_format = '_($* #,##0.00_);_($* (#,##0.00);_($* "-"??_);_(@_)'
+    
+    # Value columns: one per year, then the whole horizon (the year column itself for a 12-month projection)
+    years = list(range(1, layout.years + 1))
+    year_cols = [get_column_letter(2 + i) for i in range(len(years))]
+    if len(years) > 1:
+        total_col = get_column_letter(2 + len(years))
+        periods = list(zip(year_cols, years)) + [(total_col, None)]
+        value_headers = [f"Year {year}" for year in years] + ["Total"]
+    else:
+        total_col = year_cols[0]
+        periods = [(total_col, None)]
+        value_headers = ["Amount"]
+    note_col = get_column_letter(2 + len(periods))
+    columns = ['A'] + [col for col, _ in periods] + [note_col]
+    
     # Set column widths
     sheet.column_dimensions['A'].width = 30
-    sheet.column_dimensions['B'].width = 20
-    sheet.column_dimensions['C'].width = 20
+    for col in columns[1:]:
+        sheet.column_dimensions[col].width = 20
     
     # Page Title
-    sheet.merge_cells('A1:C1')
+    sheet.merge_cells(f'A1:{note_col}1')
     sheet['A1'] = "ANNUAL CASH FLOW SUMMARY"
     sheet['A1'].font = TITLE_FONT
     sheet['A1'].fill = BLUE_FILL
     sheet['A1'].alignment = Alignment(horizontal='center', vertical='center')
     
     # Business info line
-    sheet.merge_cells('A2:C2')
+    sheet.merge_cells(f'A2:{note_col}2')
     sheet['A2'] = "=CONCATENATE(\"Business: \", Input!B3, \" - \", \"Industry: \", Input!B4)"
     sheet['A2'].font = Font(name='Arial', size=10, italic=True)
     sheet['A2'].alignment = Alignment(horizontal='center')
     
     # Date range
-    sheet.merge_cells('A3:C3')
-    sheet['A3'] = "=CONCATENATE(\"Period: \", TEXT(Input!B5, \"mmm yyyy\"), \" to \", TEXT(EDATE(Input!B5, 11), \"mmm yyyy\"))"
+    sheet.merge_cells(f'A3:{note_col}3')
+    sheet['A3'] = f"=CONCATENATE(\"Period: \", TEXT(Input!B5, \"mmm yyyy\"), \" to \", TEXT(EDATE(Input!B5, {layout.months - 1}), \"mmm yyyy\"))"
     sheet['A3'].font = Font(name='Arial', size=10, italic=True)
     sheet['A3'].alignment = Alignment(horizontal='center')
     
     # Key Financial Metrics Section
     row = 5
-    sheet.merge_cells(f'A{row}:C{row}')
+    sheet.merge_cells(f'A{row}:{note_col}{row}')
     sheet[f'A{row}'] = "KEY FINANCIAL METRICS"
     sheet[f'A{row}'].font = HEADER_FONT
     sheet[f'A{row}'].fill = CIF_GREEN
@@ -906,162 +969,119 @@ def setup_annual_summary(wb, sheet):
     
     # Headers
     row += 1
-    sheet[f'A{row}'] = "Metric"
-    sheet[f'B{row}'] = "Amount"
-    sheet[f'C{row}'] = "Notes"
-    
-    for col in ['A', 'B', 'C']:
+    for col, header in zip(columns, ["Metric"] + value_headers + ["Notes"]):
+        sheet[f'{col}{row}'] = header
         sheet[f'{col}{row}'].font = Font(name='Arial', size=10, bold=True)
         sheet[f'{col}{row}'].fill = GREY_FILL
     
-    # Key metrics
+    # Key metrics, in sheet order
     metrics = [
-        ("Starting Cash Balance", "=Input!B7", "Beginning cash on hand"),
-        ("Ending Cash Balance", "='Monthly Projection'!N47", "Projected final cash position"),
-        ("Total Cash Inflows", "=SUM('Monthly Projection'!C7:N7)", "Sum of all revenue and funding"),
-        ("Total Cash Outflows", "=SUM('Monthly Projection'!C32:N32)", "Sum of all expenses and capital expenditures"),
-        ("Net Annual Cash Flow", "=B9-B7", "Change in cash position over the period"),
-        ("Average Monthly Cash Flow", "=B11/12", "Average monthly net cash flow"),
-        ("Months with Positive Cash Flow", "=COUNTIF('Monthly Projection'!C46:N46,\">0\")", "Number of months with positive net flow"),
-        ("Months with Negative Cash Flow", "=COUNTIF('Monthly Projection'!C46:N46,\"<0\")", "Number of months with negative net flow"),
-        ("Lowest Monthly Cash Balance", "=MIN('Monthly Projection'!C47:N47)", "Lowest point in cash reserves"),
-        ("Peak Monthly Cash Balance", "=MAX('Monthly Projection'!C47:N47)", "Highest point in cash reserves")
+        ("Starting Cash Balance", "Beginning cash on hand"),
+        ("Ending Cash Balance", "Projected final cash position"),
+        ("Total Cash Inflows", "Sum of all revenue and funding"),
+        ("Total Cash Outflows", "Sum of all expenses and capital expenditures"),
+        ("Net Annual Cash Flow", "Change in cash position over the period"),
+        ("Average Monthly Cash Flow", "Average monthly net cash flow"),
+        ("Months with Positive Cash Flow", "Number of months with positive net flow"),
+        ("Months with Negative Cash Flow", "Number of months with negative net flow"),
+        ("Lowest Monthly Cash Balance", "Lowest point in cash reserves"),
+        ("Peak Monthly Cash Balance", "Highest point in cash reserves")
     ]
-    
-    for metric in metrics:
+    metric_rows = {title: row + 1 + i for i, (title, _) in enumerate(metrics)}
+    
+    def metric_formula(title, col, year):
+        """Formula for one metric over one year (or the whole horizon when year is None)"""
+        first, last = layout.year_months(year) if year else (1, layout.months)
+        if title == "Starting Cash Balance":
+            return "=Input!B7" if first == 1 else f"={layout.cell('Running Cash Balance', first - 1)}"
+        if title == "Ending Cash Balance":
+            return f"={layout.cell('Running Cash Balance', last)}"
+        if title in ("Total Cash Inflows", "Total Cash Outflows"):
+            return f"=SUM({layout.span(title, year)})"
+        if title == "Net Annual Cash Flow":
+            return f"={col}{metric_rows['Ending Cash Balance']}-{col}{metric_rows['Starting Cash Balance']}"
+        if title == "Average Monthly Cash Flow":
+            return f"={col}{metric_rows['Net Annual Cash Flow']}/{last - first + 1}"
+        if title == "Months with Positive Cash Flow":
+            return f"=COUNTIF({layout.span('Net Monthly Cash Flow', year)},\">0\")"
+        if title == "Months with Negative Cash Flow":
+            return f"=COUNTIF({layout.span('Net Monthly Cash Flow', year)},\"<0\")"
+        if title == "Lowest Monthly Cash Balance":
+            return f"=MIN({layout.span('Running Cash Balance', year)})"
+        return f"=MAX({layout.span('Running Cash Balance', year)})"
+    
+    for title, note in metrics:
         row += 1
-        title, formula, note = metric
         sheet[f'A{row}'] = title
         sheet[f'A{row}'].font = NORMAL_FONT
         sheet[f'A{row}'].alignment = Alignment(horizontal='left')
         
-        sheet[f'B{row}'] = formula
-        sheet[f'B{row}'].number_format = '_($* #,##0.00_);_($* (#,##0.00);_($* "-"??_);_(@_)'
+        for col, year in periods:
+            sheet[f'{col}{row}'] = metric_formula(title, col, year)
+            if not title.startswith("Months with"):
+                sheet[f'{col}{row}'].number_format = currency_format
         
-        sheet[f'C{row}'] = note
-        sheet[f'C{row}'].font = Font(name='Arial', size=9, italic=True)
+        sheet[f'{note_col}{row}'] = note
+        sheet[f'{note_col}{row}'].font = Font(name='Arial', size=9, italic=True)
     
     # Cash Flow Breakdown Section
     row += 3
-    sheet.merge_cells(f'A{row}:C{row}')
+    sheet.merge_cells(f'A{row}:{note_col}{row}')
     sheet[f'A{row}'] = "CASH FLOW BREAKDOWN"
     sheet[f'A{row}'].font = HEADER_FONT
     sheet[f'A{row}'].fill = LIGHT_GREEN_FILL
     sheet[f'A{row}'].alignment = Alignment(horizontal='center')
     
-    # Income Breakdown
-    row += 1
-    sheet[f'A{row}'] = "INCOME SUMMARY"
-    sheet[f'A{row}'].font = HEADER_FONT
-    sheet[f'A{row}'].fill = GREY_FILL
-    
-    # Headers
-    row += 1
-    sheet[f'A{row}'] = "Revenue Stream"
-    sheet[f'B{row}'] = "Annual Total"
-    sheet[f'C{row}'] = "% of Revenue"
-    
-    for col in ['A', 'B', 'C']:
-        sheet[f'{col}{row}'].font = Font(name='Arial', size=10, bold=True)
-    
-    # Revenue streams
-    revenue_streams = [
-        "Product Sales",
-        "Service Revenue", 
-        "Subscription Income",
-        "Other Revenue 1",
-        "Other Revenue 2"
-    ]
-    
-    first_revenue_row = row + 1
-    for stream in revenue_streams:
+    def breakdown(row, title, label_header, share_header, items, total_label):
+        """Per-year totals of Monthly Projection lines with their share of the horizon total"""
         row += 1
-        sheet[f'A{row}'] = stream
-        
-        # Find the corresponding rows in the monthly projection
-        for proj_row in range(10, 20):
-            if wb["Monthly Projection"].cell(row=proj_row, column=1).value == stream:
-                sheet[f'B{row}'] = f'=SUM(\'Monthly Projection\'!C{proj_row}:N{proj_row})'
-                break
+        sheet[f'A{row}'] = title
+        sheet[f'A{row}'].font = HEADER_FONT
+        sheet[f'A{row}'].fill = GREY_FILL
         
-        sheet[f'B{row}'].number_format = '_($* #,##0.00_);_($* (#,##0.00);_($* "-"??_);_(@_)'
-    
-    # Total Revenue row
-    last_revenue_row = row
-    row += 1
-    sheet[f'A{row}'] = "Total Revenue"
-    sheet[f'A{row}'].font = Font(name='Arial', size=10, bold=True)
-    sheet[f'B{row}'] = f'=SUM(B{first_revenue_row}:B{last_revenue_row})'
-    sheet[f'B{row}'].number_format = '_($* #,##0.00_);_($* (#,##0.00);_($* "-"??_);_(@_)'
-    sheet[f'B{row}'].font = Font(name='Arial', size=10, bold=True)
-    
-    # Calculate percentages of revenue
-    revenue_total_row = row
-    for r in range(first_revenue_row, last_revenue_row + 1):
-        sheet[f'C{r}'] = f'=IF(${revenue_total_row}=0,0,B{r}/B${revenue_total_row})'
-        sheet[f'C{r}'].number_format = '0.00%'
-    
-    # Expense Breakdown
-    row += 2
-    sheet[f'A{row}'] = "EXPENSE SUMMARY"
-    sheet[f'A{row}'].font = HEADER_FONT
-    sheet[f'A{row}'].fill = GREY_FILL
-    
-    # Headers
-    row += 1
-    sheet[f'A{row}'] = "Expense Category"
-    sheet[f'B{row}'] = "Annual Total"
-    sheet[f'C{row}'] = "% of Expenses"
-    
-    for col in ['A', 'B', 'C']:
-        sheet[f'{col}{row}'].font = Font(name='Arial', size=10, bold=True)
-    
-    # Expense categories
-    expense_categories = [
-        "Salaries & Wages",
-        "Rent/Mortgage",
-        "Utilities",
-        "Insurance",
-        "Supplies",
-        "Marketing & Advertising",
-        "Professional Services",
-        "Equipment & Maintenance",
-        "Loan Payments",
-        "Taxes",
-        "Other Expenses"
-    ]
-    
-    first_expense_row = row + 1
-    for category in expense_categories:
+        # Headers
         row += 1
-        sheet[f'A{row}'] = category
+        headers = [label_header] + (["Annual Total"] if len(periods) == 1 else value_headers) + [share_header]
+        for col, header in zip(columns, headers):
+            sheet[f'{col}{row}'] = header
+            sheet[f'{col}{row}'].font = Font(name='Arial', size=10, bold=True)
         
-        # Find the corresponding rows in the monthly projection
-        for proj_row in range(30, 45):
-            if wb["Monthly Projection"].cell(row=proj_row, column=1).value == category:
-                sheet[f'B{row}'] = f'=SUM(\'Monthly Projection\'!C{proj_row}:N{proj_row})'
-                break
+        first_item_row = row + 1
+        for item in items:
+            row += 1
+            sheet[f'A{row}'] = item
+            for col, year in periods:
+                sheet[f'{col}{row}'] = f'=SUM({layout.span(item, year)})'
+                sheet[f'{col}{row}'].number_format = currency_format
+        last_item_row = row
         
-        sheet[f'B{row}'].number_format = '_($* #,##0.00_);_($* (#,##0.00);_($* "-"??_);_(@_)'
+        # Total row
+        row += 1
+        sheet[f'A{row}'] = total_label
+        sheet[f'A{row}'].font = Font(name='Arial', size=10, bold=True)
+        for col, _ in periods:
+            sheet[f'{col}{row}'] = f'=SUM({col}{first_item_row}:{col}{last_item_row})'
+            sheet[f'{col}{row}'].number_format = currency_format
+            sheet[f'{col}{row}'].font = Font(name='Arial', size=10, bold=True)
+        
+        # Calculate percentages of the horizon total
+        for r in range(first_item_row, last_item_row + 1):
+            sheet[f'{note_col}{r}'] = f'=IF({total_col}${row}=0,0,{total_col}{r}/{total_col}${row})'
+            sheet[f'{note_col}{r}'].number_format = '0.00%'
+        return row
     
-    # Total Expenses row
-    last_expense_row = row
-    row += 1
-    sheet[f'A{row}'] = "Total Expenses"
-    sheet[f'A{row}'].font = Font(name='Arial', size=10, bold=True)
-    sheet[f'B{row}'] = f'=SUM(B{first_expense_row}:B{last_expense_row})'
-    sheet[f'B{row}'].number_format = '_($* #,##0.00_);_($* (#,##0.00);_($* "-"??_);_(@_)'
-    sheet[f'B{row}'].font = Font(name='Arial', size=10, bold=True)
+    # Income Breakdown
+    revenue_total_row = breakdown(row, "INCOME SUMMARY", "Revenue Stream", "% of Revenue",
+                                  REVENUE_STREAMS, "Total Revenue")
     
-    # Calculate percentages of expenses
-    expense_total_row = row
-    for r in range(first_expense_row, last_expense_row + 1):
-        sheet[f'C{r}'] = f'=IF(${expense_total_row}=0,0,B{r}/B${expense_total_row})'
-        sheet[f'C{r}'].number_format = '0.00%'
+    # Expense Breakdown
+    expense_total_row = breakdown(revenue_total_row + 1, "EXPENSE SUMMARY", "Expense Category", "% of Expenses",
+                                  EXPENSE_CATEGORIES, "Total Expenses")
+    row = expense_total_row
     
     # Cash Flow Summary Section
     row += 2
-    sheet.merge_cells(f'A{row}:C{row}')
+    sheet.merge_cells(f'A{row}:{note_col}{row}')
     sheet[f'A{row}'] = "CASH FLOW RATIO ANALYSIS"
     sheet[f'A{row}'].font = HEADER_FONT
     sheet[f'A{row}'].fill = LIGHT_BLUE_FILL
@@ -1070,64 +1090,68 @@ def setup_annual_summary(wb, sheet):
     # Headers
     row += 1
     sheet[f'A{row}'] = "Ratio"
-    sheet[f'B{row}'] = "Value"
-    sheet[f'C{row}'] = "Interpretation"
+    sheet[f'{total_col}{row}'] = "Value"
+    sheet[f'{note_col}{row}'] = "Interpretation"
     
-    for col in ['A', 'B', 'C']:
+    for col in columns:
         sheet[f'{col}{row}'].font = Font(name='Arial', size=10, bold=True)
         sheet[f'{col}{row}'].fill = GREY_FILL
     
-    # Cash flow ratios
+    # Cash flow ratios over the whole horizon
+    loan_payments = layout.span("Loan Payments")
+    net_cash_flow = f"{total_col}{metric_rows['Net Annual Cash Flow']}"
     ratios = [
-        ("Revenue to Expense Ratio", f"=B{revenue_total_row}/B{expense_total_row}", 
-         "=IF(B{row}<1,\"Spending exceeds income\",\"Income covers expenses\")"),
-        ("Operating Cash Flow Margin", f"=(B{revenue_total_row}-B{expense_total_row})/B{revenue_total_row}", 
-         "=IF(B{row}<0.1,\"Low margin - review costs\",\"Healthy operating margin\")"),
-        ("Cash Flow to Debt Ratio", "=IF(SUM('Monthly Projection'!C42:N42)=0,\"N/A\",B11/SUM('Monthly Projection'!C42:N42))", 
-         "=IF(B{row}<1,\"May struggle with debt service\",\"Can service debt comfortably\")")
+        ("Revenue to Expense Ratio", f"=IF({total_col}{expense_total_row}=0,\"N/A\",{total_col}{revenue_total_row}/{total_col}{expense_total_row})",
+         "=IF({value}<1,\"Spending exceeds income\",\"Income covers expenses\")"),
+        ("Operating Cash Flow Margin", f"=IF({total_col}{revenue_total_row}=0,\"N/A\",({total_col}{revenue_total_row}-{total_col}{expense_total_row})/{total_col}{revenue_total_row})",
+         "=IF({value}<0.1,\"Low margin - review costs\",\"Healthy operating margin\")"),
+        ("Cash Flow to Debt Ratio", f"=IF(SUM({loan_payments})=0,\"N/A\",{net_cash_flow}/SUM({loan_payments}))",
+         "=IF({value}<1,\"May struggle with debt service\",\"Can service debt comfortably\")")
     ]
     
-    for ratio in ratios:
+    for title, formula, interpretation in ratios:
         row += 1
-        title, formula, interpretation = ratio
         sheet[f'A{row}'] = title
         sheet[f'A{row}'].font = NORMAL_FONT
         
-        sheet[f'B{row}'] = formula.format(row=row+1)  # Adjust row reference for interpretation formula
-        if "Margin" in title or "Ratio" in title and "N/A" not in formula:
-            sheet[f'B{row}'].number_format = '0.00'
+        sheet[f'{total_col}{row}'] = formula
+        sheet[f'{total_col}{row}'].number_format = '0.00'
         
-        # Replace {row} with actual row number in interpretation formula
-        sheet[f'C{row}'] = interpretation.format(row=row)
-        sheet[f'C{row}'].font = Font(name='Arial', size=9, italic=True)
+        sheet[f'{note_col}{row}'] = interpretation.format(value=f'{total_col}{row}')
+        sheet[f'{note_col}{row}'].font = Font(name='Arial', size=9, italic=True)
     
     # Add borders to all filled cells
     max_row = row
     for row in range(1, max_row + 1):
-        for col in range(1, 4):  # Columns A-C
+        for col in range(1, len(columns) + 1):  # Columns A through Notes
             cell = sheet.cell(row=row, column=col)
             cell.border = THIN_BORDER
     
     # Add notes section
     row += 2
-    sheet.merge_cells(f'A{row}:C{row}')
+    sheet.merge_cells(f'A{row}:{note_col}{row}')
     sheet[f'A{row}'] = "NOTES AND RECOMMENDATIONS"
     sheet[f'A{row}'].font = HEADER_FONT
     sheet[f'A{row}'].fill = ORANGE_FILL
     sheet[f'A{row}'].alignment = Alignment(horizontal='center')
     
-    # Add some automatic recommendations based on the cash flow
+    # Add some automatic recommendations based on the cash flow over the whole horizon
+    net_cash_flow = f"{total_col}{metric_rows['Net Annual Cash Flow']}"
+    positive_months = f"{total_col}{metric_rows['Months with Positive Cash Flow']}"
+    lowest_balance = f"{total_col}{metric_rows['Lowest Monthly Cash Balance']}"
+    starting_balance = f"{total_col}{metric_rows['Starting Cash Balance']}"
+    
     row += 1
-    sheet.merge_cells(f'A{row}:C{row}')
-    sheet[f'A{row}'] = "=IF(B9<0,\"WARNING: Your annual cash flow is negative. Consider reducing expenses or increasing revenue sources.\",\"Your annual cash flow is positive.\")"
+    sheet.merge_cells(f'A{row}:{note_col}{row}')
+    sheet[f'A{row}'] = f"=IF({net_cash_flow}<0,\"WARNING: Your cash flow over the projection period is negative. Consider reducing expenses or increasing revenue sources.\",\"Your cash flow over the projection period is positive.\")"
     
     row += 1
-    sheet.merge_cells(f'A{row}:C{row}')
-    sheet[f'A{row}'] = "=IF(B13<6,\"Your business has negative cash flow in multiple months. Review your monthly projection for problem areas.\",\"Your business maintains positive cash flow in most months.\")"
+    sheet.merge_cells(f'A{row}:{note_col}{row}')
+    sheet[f'A{row}'] = f"=IF({positive_months}<{layout.months // 2},\"Your business has negative cash flow in multiple months. Review your monthly projection for problem areas.\",\"Your business maintains positive cash flow in most months.\")"
     
     row += 1
-    sheet.merge_cells(f'A{row}:C{row}')
-    sheet[f'A{row}'] = "=IF(B17<B7*0.5,\"Your lowest cash balance drops significantly below your starting position. Consider maintaining higher reserves or restructuring expenses.\",\"Your cash reserves remain at healthy levels throughout the projection period.\")"
+    sheet.merge_cells(f'A{row}:{note_col}{row}')
+    sheet[f'A{row}'] = f"=IF({lowest_balance}<{starting_balance}*0.5,\"Your lowest cash balance drops significantly below your starting position. Consider maintaining higher reserves or restructuring expenses.\",\"Your cash reserves remain at healthy levels throughout the projection period.\")"
     
     for r in range(row-2, row+1):
         sheet[f'A{r}'].font = Font(name='Arial', size=10)
@@ -1135,13 +1159,13 @@ def setup_annual_summary(wb, sheet):
     
     # Add company branding
     row += 2
-    sheet.merge_cells(f'A{row}:C{row}')
+    sheet.merge_cells(f'A{row}:{note_col}{row}')
     sheet[f'A{row}'] = "Prepared by Clarity Impact Finance"
     sheet[f'A{row}'].font = Font(name='Arial', size=10, bold=True)
     sheet[f'A{row}'].alignment = Alignment(horizontal='center')
     
     row += 1
-    sheet.merge_cells(f'A{row}:C{row}')
+    sheet.merge_cells(f'A{row}:{note_col}{row}')
     sheet[f'A{row}'] = "contact@clarityimpactfinance.com"
     sheet[f'A{row}'].font = Font(name='Arial', size=9)
     sheet[f'A{row}'].alignment = Alignment(horizontal='center')
@@ -1362,8 +1386,8 @@ def setup_guidance(wb, sheet):
         ("2. Enter Business Information", "Begin by entering your business information and starting cash balance in the Input tab. This includes your business name, industry, projection start date, and projection period."),
         ("3. Input Revenue Streams", "In the Input tab, enter your expected monthly revenue for each revenue stream. Add notes about growth or seasonality in the Growth/Change Assumptions column."),
         ("4. Input Expenses", "Enter your monthly expenses for each category in the Input tab. Be as accurate as possible, consulting historical data if available."),
-        ("5. Enter Capital Expenditures", "If you plan to make major purchases, enter them in the Capital Expenditures section. Specify which month (1-12) they will occur in."),
-        ("6. Enter Funding Sources", "If you expect loans, investments, or other funding, enter these in the Funding & Financing section. Specify which month (1-12) they will be received.")
+        ("5. Enter Capital Expenditures", "If you plan to make major purchases, enter them in the Capital Expenditures section. Specify which projection month (1 for the first) they will occur in."),
+        ("6. Enter Funding Sources", "If you expect loans, investments, or other funding, enter these in the Funding & Financing section. Specify which projection month (1 for the first) they will be received.")
     ]
     
     for step in getting_started:
@@ -1502,5 +1526,7 @@ def setup_guidance(wb, sheet):
     sheet[f'A{row}'].alignment = Alignment(horizontal='center')
 
 if __name__ == "__main__":
-    output_file = "cash_flow_projection_template.xlsx"
-    create_workbook(output_file)
+    # Optional first argument: projection horizon in months (12, 24, 36 or 60)
+    months = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+    output_file = "cash_flow_projection_template.xlsx" if months == 12 else f"cash_flow_projection_template_{months}m.xlsx"
+    create_workbook(output_file, months)
@@ -1,5 +1,6 @@
 import os
 import sys
+import weakref
 from datetime import datetime
 import pandas as pd
 from openpyxl import Workbook
@@ -11,7 +12,8 @@ from openpyxl.formatting.rule import Rule
 from openpyxl.drawing.image import Image
 from openpyxl.chart import BarChart, Reference, Series
 from openpyxl.worksheet.dimensions import ColumnDimension, DimensionHolder
-from openpyxl.utils import range_boundaries
+from openpyxl.utils.cell import coordinate_to_tuple
+from openpyxl.cell.cell import MergedCell
 
 # Constants for styling
 GREEN_FILL = PatternFill(start_color="1B4620", end_color="1B4620", fill_type="solid")  # Dark Green
@@ -1285,6 +1287,38 @@ def add_formulas(wb):
     # Example data toggle formula
     dashboard['B4'] = 'YES'  # Default to showing examples
 
+# Per-sheet index of merged cells: sheet -> (merged range count, {(row, col): merged range})
+_merged_cell_index = weakref.WeakKeyDictionary()
+
+def invalidate_merged_index(sheet):
+    """Drop a sheet's merged-cell index so the next lookup rebuilds it"""
+    _merged_cell_index.pop(sheet, None)
+
+def merged_anchor(sheet, row, col):
+    """
+    Return the (row, col) of the top-left cell of the merged range containing
+    (row, col), or None if the cell is not covered by a merged range.
+    
+    The index maps every cell inside a merged range to that range. It is
+    rebuilt when the number of merged ranges changes or the range it finds is
+    no longer merged, so each call is a dict lookup instead of a scan over
+    all merges. Call invalidate_merged_index after replacing one merge with
+    another.
+    """
+    ranges = sheet.merged_cells.ranges
+    entry = _merged_cell_index.get(sheet)
+    stale = entry is None or entry[0] != len(ranges)
+    merged_range = None if stale else entry[1].get((row, col))
+    if stale or (merged_range is not None and merged_range not in ranges):
+        index = {}
+        for merged_range in ranges:
+            for cell_row in range(merged_range.min_row, merged_range.max_row + 1):
+                for cell_col in range(merged_range.min_col, merged_range.max_col + 1):
+                    index[(cell_row, cell_col)] = merged_range
+        _merged_cell_index[sheet] = (len(ranges), index)
+        merged_range = index.get((row, col))
+    return None if merged_range is None else (merged_range.min_row, merged_range.min_col)
+
 def write_to_cell(sheet, cell_address, value, number_format=None):
     """
     Write to a cell, safely handling merged cells by writing to the top-left cell
@@ -1316,39 +1350,29 @@ def write_to_cell(sheet, cell_address, value, number_format=None):
                 # If conversion fails, keep original string value
                 pass
     
-    # Check if the cell is part of a merged range
-    for merged_range in sheet.merged_cells.ranges:
-        min_col, min_row, max_col, max_row = range_boundaries(str(merged_range))
-        cell_col, cell_row = range_boundaries(cell_address + ":" + cell_address)[0:2]
-        
-        # If the cell is in a merged range, write to the top-left cell instead
-        if (min_row <= cell_row <= max_row and min_col <= cell_col <= max_col):
-            top_left = get_column_letter(min_col) + str(min_row)
-            sheet[top_left] = value
-            
-            # Apply number format if provided
-            if number_format and isinstance(value, (int, float)):
-                sheet[top_left].number_format = number_format
-            elif isinstance(value, (int, float)):
-                # Default number formats based on value type
-                if isinstance(value, int):
-                    sheet[top_left].number_format = '#,##0'
-                else:  # float
-                    sheet[top_left].number_format = '#,##0.00'
-            return
-    
-    # If not in a merged range, write directly
-    sheet[cell_address] = value
+    # Cells inside a merged range (other than its top-left cell) are read-only
+    # MergedCells; write to the top-left cell of the range instead
+    row, col = coordinate_to_tuple(cell_address)
+    cell = sheet.cell(row=row, column=col)
+    if isinstance(cell, MergedCell):
+        anchor = merged_anchor(sheet, row, col)
+        if anchor is None:
+            # A merge was replaced since the index was built
+            invalidate_merged_index(sheet)
+            anchor = merged_anchor(sheet, row, col)
+        cell = sheet.cell(row=anchor[0], column=anchor[1])
+    
+    cell.value = value
     
     # Apply number format if provided
     if number_format and isinstance(value, (int, float)):
-        sheet[cell_address].number_format = number_format
+        cell.number_format = number_format
     elif isinstance(value, (int, float)):
         # Default number formats based on value type
         if isinstance(value, int):
-            sheet[cell_address].number_format = '#,##0'
+            cell.number_format = '#,##0'
         else:  # float
-            sheet[cell_address].number_format = '#,##0.00'
+            cell.number_format = '#,##0.00'
 
 def add_example_data(wb, include_examples=True):
     """Add example data to the workbook if requested"""
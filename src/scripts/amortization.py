@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Bulk Amortization Schedules
+
+Payment-by-payment schedules (payment, principal, interest, balance) for
+thousands of loans at once, as (loans x payments) NumPy arrays. Supported
+structures, in any combination:
+- Fixed-rate level payments, fully amortizing over the term
+- Interest-only months at the start of the term
+- Balloons: an amortization period longer than the term, repaid with the
+  final payment
+- A fixed extra principal payment with every amortizing payment, which pays
+  the loan off early
+- An irregular (short or long) first period, whose interest is scaled by
+  first_period_fraction; the final payment absorbs the difference
+
+Balances come from loan_schedule.py's closed-form amortization
+(amortized_balance, with periods from note_periods), evaluated for every
+loan and payment in one broadcast operation: the balance after k payments
+is B(1 + i)^k - A((1 + i)^k - 1) / i for the balance B when amortization
+starts and the level payment A. Payments after payoff are zero, and
+fiscal_year_totals reconciles a schedule with DebtSchedule.debt_service.
+
+Usage:
+    schedule = amortize(amounts, rates, term_years, extra_payment=100.0)
+    schedule.to_frame(loan_ids)          # long format: one row per payment
+    schedule.summary(loan_ids)           # one row per loan
+    amortize_notes(debt_schedule)        # a DebtSchedule's notes
+    check_debt_service(debt_schedule, years)
+
+Author: Clarity Impact Finance
+"""
+
+import numpy as np
+import pandas as pd
+
+from loan_schedule import amortized_balance, fiscal_years, level_payment, note_periods
+
+
+# Per-payment schedule arrays, in to_frame column order
+SCHEDULE_FIELDS = ('Payment', 'Principal', 'Interest', 'Balance')
+
+
+class AmortizationSchedule:
+    """
+    Schedules for a batch of loans as (loans x payments) arrays.
+
+    Column k holds payment number k + 1; loans with fewer payments than the
+    longest are zero-padded after their final payment.
+    """
+
+    __slots__ = ('payment', 'principal', 'interest', 'balance', 'payment_count', 'payments_per_year')
+
+    def __init__(self, payment, principal, interest, balance, payment_count, payments_per_year):
+        """
+        Parameters:
+        ----------
+        payment, principal, interest, balance : numpy.ndarray
+            (loans x payments) arrays
+        payment_count : numpy.ndarray
+            Payments due per loan; fewer than the term after prepayment
+        payments_per_year : numpy.ndarray
+            Payment frequency per loan
+        """
+        self.payment = payment
+        self.principal = principal
+        self.interest = interest
+        self.balance = balance
+        self.payment_count = payment_count
+        self.payments_per_year = payments_per_year
+
+    def __len__(self):
+        return self.payment.shape[0]
+
+    def __repr__(self):
+        return f"AmortizationSchedule(loans={len(self)}, max_payments={self.payment.shape[1]})"
+
+    def summary(self, loan_ids=None):
+        """
+        Totals per loan.
+
+        Returns:
+        -------
+        pandas.DataFrame
+            One row per loan with 'Payments', 'Total Payments', 'Total
+            Principal', 'Total Interest' and 'Final Payment'
+        """
+        count = self.payment_count
+        final = self.payment[np.arange(len(self)), np.maximum(count - 1, 0)]
+        return pd.DataFrame({
+            'Payments': count,
+            'Total Payments': self.payment.sum(axis=1),
+            'Total Principal': self.principal.sum(axis=1),
+            'Total Interest': self.interest.sum(axis=1),
+            'Final Payment': np.where(count > 0, final, 0.0),
+        }, index=pd.Index(np.arange(len(self)) if loan_ids is None else loan_ids, name='Loan ID'))
+
+    def to_frame(self, loan_ids=None, first_payment_dates=None):
+        """
+        Long-format schedule with one row per payment due.
+
+        Parameters:
+        ----------
+        loan_ids : array-like, optional
+            Id per loan; defaults to 0..n-1
+        first_payment_dates : array-like, optional
+            First payment date per loan; adds a 'Payment Date' column with
+            later payments spaced 12 / payments_per_year months apart
+            (payments_per_year must divide 12)
+
+        Returns:
+        -------
+        pandas.DataFrame
+            'Loan ID', 'Payment #', ['Payment Date'], then SCHEDULE_FIELDS
+        """
+        made = np.arange(self.payment.shape[1]) < self.payment_count[:, np.newaxis]
+        loan, column = np.nonzero(made)
+        ids = np.arange(len(self)) if loan_ids is None else np.asarray(loan_ids)
+        frame = {'Loan ID': ids[loan], 'Payment #': column + 1}
+
+        if first_payment_dates is not None:
+            months_between = 12 / np.broadcast_to(np.asarray(self.payments_per_year, dtype=np.float64),
+                                                  (len(self),))
+            if np.any(months_between != np.round(months_between)):
+                raise ValueError("Payment dates need payments per year that divide 12")
+            first = np.broadcast_to(np.asarray(first_payment_dates, dtype='datetime64[D]'), (len(self),))[loan]
+            # Step whole months from each loan's first payment, keeping its day of month where it exists
+            month = first.astype('datetime64[M]') + (column * months_between[loan]).astype(np.int64)
+            start = month.astype('datetime64[D]')
+            days_in_month = (month + 1).astype('datetime64[D]') - start
+            day = first - first.astype('datetime64[M]').astype('datetime64[D]')
+            frame['Payment Date'] = start + np.minimum(day, days_in_month - 1)
+
+        for name in SCHEDULE_FIELDS:
+            frame[name] = getattr(self, name.lower())[made]
+        return pd.DataFrame(frame)
+
+    def fiscal_year_totals(self, first_payment_year, years, first_payment_month=1):
+        """
+        Principal and interest across all loans per fiscal (calendar) year.
+
+        Payments are spaced 12 / payments_per_year months from each loan's
+        first payment, as in loan_schedule.annual_debt_service.
+
+        Parameters:
+        ----------
+        first_payment_year : array-like
+            Calendar year of each loan's first payment
+        years : array-like
+            Fiscal years to report, as integers
+        first_payment_month : array-like
+            Month (1-12) of each loan's first payment
+
+        Returns:
+        -------
+        dict
+            {'Principal Payments': array, 'Interest Expense': array}, each of
+            shape (len(years),), like DebtSchedule.debt_service
+        """
+        first_payment_year, first_payment_month, payments_per_year = (
+            np.broadcast_to(np.asarray(a, dtype=np.float64), (len(self),))[:, np.newaxis]
+            for a in (first_payment_year, first_payment_month, self.payments_per_year))
+        months = first_payment_month - 1 + np.arange(self.payment.shape[1]) * (12 / payments_per_year)
+        payment_year = first_payment_year + np.floor(months / 12)
+        years = np.asarray(years, dtype=np.float64)
+        principal = np.array([self.principal[payment_year == year].sum() for year in years])
+        interest = np.array([self.interest[payment_year == year].sum() for year in years])
+        return {'Principal Payments': principal, 'Interest Expense': interest}
+
+
+def amortize(amount, rate, term_years, payments_per_year=12, amortization_years=None, io_months=0,
+             extra_payment=0.0, first_period_fraction=1.0):
+    """
+    Build payment schedules for a batch of loans.
+
+    Loan arguments broadcast against each other (e.g. arrays of shape
+    (loans,)).
+
+    Parameters:
+    ----------
+    amount : array-like
+        Original principal
+    rate : array-like
+        Annual interest rate as a decimal
+    term_years : array-like
+        Years from the first payment period to maturity
+    payments_per_year : array-like
+        Payment frequency, e.g. 12 for monthly
+    amortization_years : array-like, optional
+        Amortization period after the interest-only period; longer than the
+        remaining term means a balloon at maturity. NaN or None means fully
+        amortizing over the remaining term.
+    io_months : array-like
+        Interest-only months at the start of the term
+    extra_payment : array-like
+        Extra principal paid with every amortizing payment
+    first_period_fraction : array-like
+        Length of the first period relative to a regular one, e.g. 45/30 for
+        a first payment 45 days after funding; scales the first interest
+        charge
+
+    Returns:
+    -------
+    AmortizationSchedule
+    """
+    columns = np.broadcast_arrays(*(np.atleast_1d(np.asarray(a, dtype=np.float64)) for a in (
+        amount, rate, term_years, payments_per_year,
+        np.nan if amortization_years is None else amortization_years,
+        io_months, extra_payment, first_period_fraction)))
+    amount, rate, term_years, payments_per_year, amortization_years, io_months, extra_payment, fraction = (
+        np.ravel(a)[:, np.newaxis] for a in columns)
+
+    total_periods, io_periods, amortizing_periods = note_periods(
+        term_years, payments_per_year, amortization_years, io_months)
+
+    periodic_rate = rate / payments_per_year
+    installment = level_payment(amount, periodic_rate, amortizing_periods) + extra_payment
+
+    # Amortization is anchored at the balance after the interest-only period,
+    # or after the (possibly irregular) first payment when there is none
+    anchor = np.where(io_periods > 0, io_periods, 1.0)
+    anchor_balance = np.where(io_periods > 0, amount,
+                              amount * (1 + periodic_rate * fraction) - installment)
+
+    payments = np.arange(1, int(total_periods.max(initial=0)) + 1, dtype=np.float64)
+    since_anchor = np.maximum(payments - anchor, 0)
+    balance = amortized_balance(anchor_balance, periodic_rate, installment, since_anchor)
+    balance = np.where(payments < anchor, amount, balance)
+    # Paid off early by extra payments, or the final payment clears any balloon or residual
+    balance = np.where((balance <= 0) | (payments >= total_periods), 0.0, balance)
+
+    previous = np.concatenate([amount, balance[:, :-1]], axis=1) if balance.shape[1] else balance
+    interest = previous * periodic_rate
+    interest[:, :1] *= fraction
+    principal = previous - balance
+    payment_count = np.count_nonzero((previous > 0) & (payments <= total_periods), axis=1)
+    return AmortizationSchedule(interest + principal, principal, interest, balance, payment_count,
+                                np.ravel(payments_per_year))
+
+
+def amortize_notes(debt_schedule):
+    """
+    Payment schedules for every note of a loan_schedule.DebtSchedule.
+
+    Returns:
+    -------
+    AmortizationSchedule
+        One row per note, in the schedule's order
+    """
+    c = debt_schedule.columns
+    return amortize(c['Amount'], c['Rate'], c['Term (Years)'], payments_per_year=c['Payments Per Year'],
+                    amortization_years=c['Amortization (Years)'], io_months=c['Interest Only (Months)'])
+
+
+def check_debt_service(debt_schedule, years, tolerance=0.01):
+    """
+    Whether a DebtSchedule's notes, amortized payment by payment and summed
+    by fiscal year, match DebtSchedule.debt_service.
+
+    Parameters:
+    ----------
+    debt_schedule : loan_schedule.DebtSchedule
+        Notes to reconcile
+    years : list
+        Fiscal year labels
+    tolerance : float
+        Largest absolute difference accepted in any year's total
+
+    Returns:
+    -------
+    bool
+        True if principal and interest agree in every year
+    """
+    c = debt_schedule.columns
+    totals = amortize_notes(debt_schedule).fiscal_year_totals(
+        c['First Payment Year'], fiscal_years(years), first_payment_month=c['First Payment Month'])
+    expected = debt_schedule.debt_service(years)
+    return all(np.allclose(totals[name], expected[name], rtol=0, atol=tolerance) for name in expected)
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cash Flow Analyzer Benchmark
+
+Times the per-borrower pipeline - load_from_excel, each calculate_* method,
+run_full_analysis and export_to_excel - across a ladder of portfolio sizes
+(borrowers) and statement lengths (years), using synthetic borrowers from
+synthetic_portfolio.py.
+
+For every operation and case it records the number of calls, throughput
+(calls per second), p50/p95/mean latency, the case's peak RSS and, for
+export_to_excel, the output file size. Input workbooks are generated in a
+separate process and each case runs in a fresh one, so peak RSS belongs to
+the measured pipeline alone. Results are written as JSON and can be
+compared against a stored baseline; the command exits with status 1 when
+any p50 latency or peak RSS regresses beyond the threshold.
+
+The full default ladder (1, 100, 1,000 and 10,000 borrowers x 3, 5 and 10
+years) runs every borrower through the whole pipeline and takes over an hour; pick
+a subset for routine checks:
+
+    python benchmark.py --borrowers 1 100 --years 3 --output bench.json
+    python benchmark.py --borrowers 1 100 --years 3 --baseline bench_baseline.json
+    python benchmark.py --borrowers 1 100 --years 3 --save-baseline bench_baseline.json
+
+Author: Clarity Impact Finance
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import datetime
+import tempfile
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import openpyxl
+
+from small_business_cash_flow_analysis import SmallBusinessCashFlowAnalyzer
+from synthetic_portfolio import generate_portfolio, write_statements_workbook
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; peak RSS is reported as None
+    resource = None
+
+
+BORROWER_LADDER = (1, 100, 1000, 10000)
+YEAR_LADDER = (3, 5, 10)
+
+# Operations in pipeline order, as (name, analyzer method)
+CALCULATIONS = (
+    ('calculate_uca_cash_flow', 'calculate_uca_cash_flow'),
+    ('calculate_ebitda', 'calculate_ebitda'),
+    ('calculate_debt_service_coverage', 'calculate_debt_service_coverage'),
+    ('calculate_financial_ratios', 'calculate_financial_ratios'),
+    ('run_full_analysis', 'run_full_analysis'),
+)
+OPERATIONS = ('load_from_excel',) + tuple(name for name, _ in CALCULATIONS) + ('export_to_excel',)
+
+# Result fields compared against the baseline (higher is worse for both)
+COMPARED_FIELDS = ('p50_seconds', 'peak_rss_bytes')
+DEFAULT_THRESHOLD = 0.2
+
+
+def _peak_rss_bytes():
+    """Peak resident set size of this process, or None where unavailable."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _summarize(operation, borrowers, years, latencies, peak_rss, output_bytes=None):
+    """One result row from the per-call latencies of an operation."""
+    latencies = np.asarray(latencies, dtype=np.float64)
+    total = float(latencies.sum())
+    return {
+        'operation': operation,
+        'borrowers': borrowers,
+        'years': years,
+        'calls': int(latencies.size),
+        'total_seconds': total,
+        'throughput_per_second': latencies.size / total if total > 0 else None,
+        'p50_seconds': float(np.percentile(latencies, 50)),
+        'p95_seconds': float(np.percentile(latencies, 95)),
+        'mean_seconds': float(latencies.mean()),
+        'peak_rss_bytes': peak_rss,
+        'output_bytes': output_bytes,
+    }
+
+
+def write_inputs(work_dir, borrowers, years, seed=0):
+    """
+    Generate a synthetic portfolio and write one statements workbook per borrower.
+
+    Run in its own process by run_benchmarks, so the memory used to build
+    the portfolio never counts towards a measured case's peak RSS.
+
+    Returns:
+    -------
+    list
+        Paths of the written workbooks, in borrower order
+    """
+    portfolio, _ = generate_portfolio(borrowers, years=years, seed=seed)
+    input_paths = []
+    for borrower_id, statements in portfolio.items():
+        file_path = os.path.join(work_dir, f"{borrower_id}.xlsx")
+        write_statements_workbook(statements, file_path)
+        input_paths.append(file_path)
+    return input_paths
+
+
+def run_case(input_paths, years, engine='pandas'):
+    """
+    Benchmark one (borrowers, years) case in the current process.
+
+    Each borrower workbook (see write_inputs) goes through load, every
+    calculation, the full analysis and the export in turn, so memory use
+    does not grow with the number of borrowers. Raises RuntimeError if any
+    step reports failure.
+
+    Returns:
+    -------
+    list
+        One result dict per operation (see OPERATIONS)
+    """
+    borrowers = len(input_paths)
+    latencies = {operation: [] for operation in OPERATIONS}
+    output_bytes = 0
+    output_path = os.path.join(os.path.dirname(input_paths[0]), 'analysis.xlsx')
+    # The analyzer reports progress on stdout; keep it out of the timings' way
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for input_path in input_paths:
+            analyzer = SmallBusinessCashFlowAnalyzer(engine=engine)
+
+            start = time.perf_counter()
+            loaded = analyzer.load_from_excel(input_path)
+            latencies['load_from_excel'].append(time.perf_counter() - start)
+            if not loaded:
+                raise RuntimeError(f"Could not load {input_path}")
+
+            for operation, method in CALCULATIONS:
+                start = time.perf_counter()
+                calculated = getattr(analyzer, method)()
+                latencies[operation].append(time.perf_counter() - start)
+                if not calculated:
+                    raise RuntimeError(f"{operation} failed for {input_path}")
+
+            # A stale workbook from the previous borrower must not count towards this one
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            start = time.perf_counter()
+            exported = analyzer.export_to_excel(output_path)
+            latencies['export_to_excel'].append(time.perf_counter() - start)
+            if not exported or not os.path.exists(output_path):
+                raise RuntimeError(f"export_to_excel failed for {input_path}")
+            output_bytes += os.path.getsize(output_path)
+
+    peak_rss = _peak_rss_bytes()
+    results = []
+    for operation in OPERATIONS:
+        size = output_bytes // borrowers if operation == 'export_to_excel' else None
+        results.append(_summarize(operation, borrowers, years, latencies[operation], peak_rss, size))
+    return results
+
+
+def run_benchmarks(borrower_ladder=BORROWER_LADDER, year_ladder=YEAR_LADDER, engine='pandas', seed=0):
+    """
+    Run every (borrowers, years) case.
+
+    Inputs for a case are written by one spawned process and the case is
+    timed in another, so peak RSS covers only the measured pipeline.
+
+    Returns:
+    -------
+    dict
+        {'metadata': {...}, 'results': [result dict, ...]}; output_bytes is
+        the mean workbook size per borrower
+    """
+    results = []
+    context = multiprocessing.get_context('spawn')
+    for borrowers in borrower_ladder:
+        for years in year_ladder:
+            print(f"Benchmarking {borrowers} borrowers x {years} years...")
+            work_dir = tempfile.mkdtemp(prefix='cash_flow_benchmark_')
+            try:
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                    input_paths = executor.submit(write_inputs, work_dir, borrowers, years, seed).result()
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                    results.extend(executor.submit(run_case, input_paths, years, engine).result())
+            finally:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+    metadata = {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'engine': engine,
+        'seed': seed,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'openpyxl': openpyxl.__version__,
+    }
+    return {'metadata': metadata, 'results': results}
+
+
+def compare_to_baseline(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare benchmark results with a baseline run.
+
+    Parameters:
+    ----------
+    current, baseline : dict
+        Outputs of run_benchmarks
+    threshold : float
+        Allowed relative increase, e.g. 0.2 for 20%
+
+    Returns:
+    -------
+    pandas.DataFrame
+        One row per operation, case and compared field present in both runs,
+        with 'Baseline', 'Current', 'Change (%)' and 'Regression' columns
+    """
+    def keyed(run):
+        return {(r['operation'], r['borrowers'], r['years']): r for r in run['results']}
+
+    baseline_rows = keyed(baseline)
+    rows = []
+    for key, result in keyed(current).items():
+        if key not in baseline_rows:
+            continue
+        for field in COMPARED_FIELDS:
+            before, after = baseline_rows[key][field], result[field]
+            if not before or after is None:
+                continue
+            change = after / before - 1
+            rows.append({
+                'Operation': key[0],
+                'Borrowers': key[1],
+                'Years': key[2],
+                'Field': field,
+                'Baseline': before,
+                'Current': after,
+                'Change (%)': change * 100,
+                'Regression': change > threshold,
+            })
+    return pd.DataFrame(rows, columns=['Operation', 'Borrowers', 'Years', 'Field', 'Baseline',
+                                       'Current', 'Change (%)', 'Regression'])
+
+
+def results_table(run):
+    """Human-readable table of a benchmark run."""
+    table = pd.DataFrame(run['results'])
+    table['p50 (ms)'] = table['p50_seconds'] * 1e3
+    table['p95 (ms)'] = table['p95_seconds'] * 1e3
+    table['Peak RSS (MB)'] = table['peak_rss_bytes'] / (1024 * 1024)
+    table['Output (KB)'] = table['output_bytes'] / 1024
+    return table[['operation', 'borrowers', 'years', 'calls', 'throughput_per_second',
+                  'p50 (ms)', 'p95 (ms)', 'Peak RSS (MB)', 'Output (KB)']]
+
+
+def main(argv=None):
+    """
+    Command line interface for running benchmarks and checking for regressions.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the cash flow analyzer and Excel export.")
+    parser.add_argument('--borrowers', type=int, nargs='+', default=list(BORROWER_LADDER),
+                        help="Borrower counts to run (default: %(default)s)")
+    parser.add_argument('--years', type=int, nargs='+', default=list(YEAR_LADDER),
+                        help="Years per borrower to run (default: %(default)s)")
+    parser.add_argument('--engine', default='pandas', help="Analyzer engine (default: %(default)s)")
+    parser.add_argument('--seed', type=int, default=0, help="Synthetic portfolio seed (default: %(default)s)")
+    parser.add_argument('--output', help="Write results to this JSON file")
+    parser.add_argument('--baseline', help="Compare against this baseline JSON file")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed relative regression (default: %(default)s)")
+    parser.add_argument('--save-baseline', help="Write results as the new baseline JSON file")
+    args = parser.parse_args(argv)
+
+    run = run_benchmarks(args.borrowers, args.years, engine=args.engine, seed=args.seed)
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(results_table(run).round(2).to_string(index=False))
+
+    for file_path in (args.output, args.save_baseline):
+        if file_path:
+            with open(file_path, 'w', encoding='utf-8') as f:
+                json.dump(run, f, indent=2)
+            print(f"Wrote results to {file_path}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        comparison = compare_to_baseline(run, baseline, args.threshold)
+        regressions = comparison[comparison['Regression']]
+        if regressions.empty:
+            print(f"No regressions beyond {args.threshold:.0%} of {args.baseline}")
+        else:
+            print(f"Regressions beyond {args.threshold:.0%} of {args.baseline}:")
+            print(regressions.round(4).to_string(index=False))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Vectorized Cash Flow Engine
+
+Array-based implementation of the SmallBusinessCashFlowAnalyzer metrics.
+Financial statements are packed into a single (accounts x years) float64
+matrix and every metric is computed with whole-array NumPy operations:
+- Uniform Credit Analysis (UCA) Cash Flow
+- EBITDA Analysis
+- Debt Service Coverage Ratio
+- Financial Ratios
+
+Each metric is a node in a dependency graph (METRIC_NODES) evaluated lazily
+and memoized by MetricGraph, so asking for one metric only computes the
+metrics it depends on.
+
+All functions index accounts on the second-to-last axis and years on the
+last axis, so leading dimensions (e.g. borrowers) broadcast unchanged.
+
+Author: Clarity Impact Finance
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# Income statement accounts read by the metric calculations
+INCOME_ACCOUNTS = (
+    'Revenue',
+    'Cost of Goods Sold',
+    'Operating Expenses',
+    'Depreciation',
+    'Amortization',
+    'Interest Expense',
+    'Income Taxes',
+    'Net Income',
+)
+
+# Balance sheet accounts read by the metric calculations
+BALANCE_ACCOUNTS = (
+    'Accounts Receivable',
+    'Inventory',
+    'Other Current Assets',
+    'Total Current Assets',
+    'Total Assets',
+    'Accounts Payable',
+    'Short-term Debt',
+    'Current Portion of Long-term Debt',
+    'Other Current Liabilities',
+    'Total Current Liabilities',
+    'Long-term Debt',
+    'Equity',
+)
+
+ACCOUNTS = INCOME_ACCOUNTS + BALANCE_ACCOUNTS
+ACCOUNT_INDEX = {account: i for i, account in enumerate(ACCOUNTS)}
+
+# Output row order for each analysis table (matches the pandas engine)
+UCA_ROWS = (
+    'Net Income',
+    'Depreciation',
+    'Amortization',
+    'Change in Accounts Receivable',
+    'Change in Inventory',
+    'Change in Accounts Payable',
+    'Change in Other Current Items',
+    'UCA Cash Flow',
+)
+
+EBITDA_ROWS = (
+    'Revenue',
+    'Gross Profit',
+    'Gross Margin (%)',
+    'Operating Income',
+    'Operating Margin (%)',
+    'EBIT',
+    'EBIT Margin (%)',
+    'EBITDA',
+    'EBITDA Margin (%)',
+    'Interest Expense',
+    'Income Taxes',
+)
+
+DSCR_ROWS = (
+    'EBITDA',
+    'Interest Expense',
+    'Principal Payments',
+    'Total Debt Service',
+    'Times Interest Earned',
+    'Debt Service Coverage Ratio (DSCR)',
+    'Short-term Debt',
+    'Long-term Debt',
+    'Total Debt',
+    'Debt to Assets Ratio',
+)
+
+RATIO_ROWS = (
+    'Return on Assets (%)',
+    'Return on Equity (%)',
+    'Net Profit Margin (%)',
+    'Current Ratio',
+    'Quick Ratio',
+    'Receivables Turnover',
+    'Days Receivables Outstanding',
+    'Inventory Turnover',
+    'Days Inventory Outstanding',
+    'Payables Turnover',
+    'Days Payables Outstanding',
+    'Cash Conversion Cycle (Days)',
+)
+
+
+def statements_to_matrix(income_statement, balance_sheet, years):
+    """
+    Pack the accounts used by the engine into an (accounts x years) matrix.
+
+    Parameters:
+    ----------
+    income_statement : pandas.DataFrame
+        Income statement indexed by account with one column per year
+    balance_sheet : pandas.DataFrame or None
+        Balance sheet indexed by account with one column per year; when
+        None the balance sheet rows are filled with NaN
+    years : list
+        Year columns to include, in chronological order; other columns
+        (e.g. notes) are ignored
+
+    Returns:
+    -------
+    numpy.ndarray
+        float64 array of shape (len(ACCOUNTS), len(years)), rows ordered
+        as ACCOUNTS. Accounts absent from the statements are NaN (see
+        missing_accounts); raises KeyError if a year is missing.
+    """
+    income = _select(income_statement, INCOME_ACCOUNTS, years)
+    if balance_sheet is None:
+        balance = np.full((len(BALANCE_ACCOUNTS), len(years)), np.nan)
+    else:
+        balance = _select(balance_sheet, BALANCE_ACCOUNTS, years)
+    return np.vstack([income, balance])
+
+
+def missing_accounts(income_statement, balance_sheet):
+    """Engine accounts absent from the statements, in ACCOUNTS order."""
+    present = set(income_statement.index)
+    if balance_sheet is not None:
+        present.update(balance_sheet.index)
+    return tuple(account for account in ACCOUNTS if account not in present)
+
+
+def _select(statement, accounts, years):
+    """
+    Positional equivalent of statement.loc[accounts, years] as float64.
+
+    Only the year columns are converted, and accounts absent from the
+    statement are NaN; KeyError lists any missing year.
+    """
+    values = np.full((len(accounts), len(years)), np.nan)
+    row_positions = {label: i for i, label in enumerate(statement.index)}
+    col_positions = {label: i for i, label in enumerate(statement.columns)}
+    missing = [label for label in years if label not in col_positions]
+    if missing:
+        raise KeyError(missing)
+    present = [i for i, account in enumerate(accounts) if account in row_positions]
+    rows = [row_positions[accounts[i]] for i in present]
+    cols = [col_positions[label] for label in years]
+    values[present] = statement.to_numpy()[np.ix_(rows, cols)].astype(np.float64)
+    return values
+
+
+def _row(matrix, account):
+    """Return the year vector(s) for an account."""
+    return matrix[..., ACCOUNT_INDEX[account], :]
+
+
+def safe_divide(numerator, denominator, fill):
+    """
+    Divide where the denominator is positive, using `fill` elsewhere.
+
+    Mirrors the `a / b if b > 0 else fill` guards of the pandas engine
+    with a single masked np.divide.
+    """
+    numerator, denominator = np.broadcast_arrays(
+        np.asarray(numerator, dtype=np.float64),
+        np.asarray(denominator, dtype=np.float64))
+    out = np.full(numerator.shape, fill, dtype=np.float64)
+    return np.divide(numerator, denominator, out=out, where=denominator > 0)
+
+
+def _year_over_year(values):
+    """Current minus prior year along the last axis; zero for the first year."""
+    return np.diff(values, axis=-1, prepend=values[..., :1])
+
+
+def _percent_of(numerator, denominator):
+    """Percentage of a positive denominator, zero otherwise."""
+    return safe_divide(numerator, denominator, 0.0) * 100
+
+
+def _ratio(numerator, denominator):
+    """Ratio to a positive denominator, infinite otherwise."""
+    return safe_divide(numerator, denominator, np.inf)
+
+
+def _days(turnover):
+    """Days outstanding implied by an annual turnover."""
+    return safe_divide(365.0, turnover, np.inf)
+
+
+def _cash_conversion_cycle(days_receivables, days_inventory, days_payables):
+    # inf - inf yields nan exactly as the scalar float arithmetic does
+    with np.errstate(invalid='ignore'):
+        return days_receivables + days_inventory - days_payables
+
+
+# Metric dependency graph: metric name -> (input names, function of the inputs).
+# Every account in ACCOUNTS is also a leaf node read straight from the matrix.
+METRIC_NODES = {
+    # EBITDA Analysis
+    'Gross Profit': (('Revenue', 'Cost of Goods Sold'), np.subtract),
+    'Gross Margin (%)': (('Gross Profit', 'Revenue'), _percent_of),
+    'Operating Income': (('Gross Profit', 'Operating Expenses'), np.subtract),
+    'Operating Margin (%)': (('Operating Income', 'Revenue'), _percent_of),
+    'EBIT': (('Operating Income',), lambda operating_income: operating_income),  # Same as EBIT in our structure
+    'EBIT Margin (%)': (('EBIT', 'Revenue'), _percent_of),
+    'EBITDA': (('EBIT', 'Depreciation', 'Amortization'), lambda ebit, dep, amort: ebit + dep + amort),
+    'EBITDA Margin (%)': (('EBITDA', 'Revenue'), _percent_of),
+
+    # UCA Cash Flow - decreases in current assets and increases in current liabilities are positive
+    'Change in Accounts Receivable': (('Accounts Receivable',), lambda ar: -_year_over_year(ar)),
+    'Change in Inventory': (('Inventory',), lambda inventory: -_year_over_year(inventory)),
+    'Change in Accounts Payable': (('Accounts Payable',), _year_over_year),
+    'Change in Other Current Items': (
+        ('Other Current Assets', 'Other Current Liabilities'),
+        lambda other_assets, other_liabilities: (-_year_over_year(other_assets) +
+                                                 _year_over_year(other_liabilities))),
+    'UCA Cash Flow': (
+        ('Net Income', 'Depreciation', 'Amortization', 'Change in Accounts Receivable',
+         'Change in Inventory', 'Change in Accounts Payable', 'Change in Other Current Items'),
+        lambda *components: sum(components[1:], components[0])),
+
+    # Debt Service Coverage
+    # This is simplified; a loaded debt schedule replaces it (and Interest Expense) via `known`
+    'Principal Payments': (('Current Portion of Long-term Debt',), lambda cpltd: cpltd),
+    'Total Debt Service': (('Interest Expense', 'Principal Payments'), np.add),
+    'Times Interest Earned': (('EBITDA', 'Interest Expense'), _ratio),
+    'Debt Service Coverage Ratio (DSCR)': (('EBITDA', 'Total Debt Service'), _ratio),
+    'Total Debt': (
+        ('Short-term Debt', 'Long-term Debt', 'Current Portion of Long-term Debt'),
+        lambda std, ltd, cpltd: std + ltd + cpltd),
+    'Debt to Assets Ratio': (('Total Debt', 'Total Assets'), _ratio),
+
+    # Financial Ratios
+    'Return on Assets (%)': (('Net Income', 'Total Assets'), _percent_of),
+    'Return on Equity (%)': (('Net Income', 'Equity'), _percent_of),
+    'Net Profit Margin (%)': (('Net Income', 'Revenue'), _percent_of),
+    'Current Ratio': (('Total Current Assets', 'Total Current Liabilities'), _ratio),
+    'Quick Ratio': (
+        ('Total Current Assets', 'Inventory', 'Total Current Liabilities'),
+        lambda current_assets, inventory, current_liabilities: _ratio(current_assets - inventory,
+                                                                      current_liabilities)),
+    'Receivables Turnover': (('Revenue', 'Accounts Receivable'), _ratio),
+    'Days Receivables Outstanding': (('Receivables Turnover',), _days),
+    'Inventory Turnover': (('Cost of Goods Sold', 'Inventory'), _ratio),
+    'Days Inventory Outstanding': (('Inventory Turnover',), _days),
+    'Payables Turnover': (('Cost of Goods Sold', 'Accounts Payable'), _ratio),
+    'Days Payables Outstanding': (('Payables Turnover',), _days),
+    'Cash Conversion Cycle (Days)': (
+        ('Days Receivables Outstanding', 'Days Inventory Outstanding', 'Days Payables Outstanding'),
+        _cash_conversion_cycle),
+}
+
+METRICS = tuple(ACCOUNTS) + tuple(METRIC_NODES)
+
+
+def metric_inputs(name):
+    """Direct inputs of a metric (empty for accounts)."""
+    if name in METRIC_NODES:
+        return METRIC_NODES[name][0]
+    if name in ACCOUNT_INDEX:
+        return ()
+    raise KeyError(name)
+
+
+def metric_ancestors(name):
+    """All metrics and accounts a metric depends on, directly or indirectly."""
+    ancestors = set()
+    pending = list(metric_inputs(name))
+    while pending:
+        parent = pending.pop()
+        if parent not in ancestors:
+            ancestors.add(parent)
+            pending.extend(metric_inputs(parent))
+    return ancestors
+
+
+class MetricGraph:
+    """
+    Lazily evaluated, memoized view of every metric for one account matrix.
+
+    A metric is computed on first access from its inputs, which are computed
+    (once) in turn, so requesting a single metric only evaluates its
+    ancestors in METRIC_NODES. Works for any (..., accounts, years) matrix.
+    """
+
+    def __init__(self, matrix, known=None, missing=()):
+        """
+        Parameters:
+        ----------
+        matrix : numpy.ndarray
+            Array of shape (..., accounts, years) ordered as ACCOUNTS
+        known : dict, optional
+            Metric name -> precomputed values that take the place of the
+            corresponding nodes (e.g. EBITDA from an earlier analysis)
+        missing : iterable
+            Accounts the statements do not have (see missing_accounts);
+            evaluating a metric that reads one raises KeyError
+        """
+        self.matrix = matrix
+        self.missing = frozenset(missing)
+        self._values = dict(known or {})
+
+    def __getitem__(self, name):
+        if name not in self._values:
+            if name in METRIC_NODES:
+                inputs, func = METRIC_NODES[name]
+                self._values[name] = func(*(self[parent] for parent in inputs))
+            elif name in self.missing:
+                raise KeyError(name)
+            elif name in ACCOUNT_INDEX:
+                self._values[name] = _row(self.matrix, name)
+            else:
+                raise KeyError(name)
+        return self._values[name]
+
+    def __contains__(self, name):
+        return name in METRIC_NODES or name in ACCOUNT_INDEX
+
+    @property
+    def evaluated(self):
+        """Names of the metrics and accounts evaluated so far."""
+        return set(self._values)
+
+    def evaluate(self, names):
+        """Return {name: values} for the requested metrics, in order."""
+        return {name: self[name] for name in names}
+
+
+def compute_uca_cash_flow(matrix):
+    """
+    Compute UCA Cash Flow rows from an account matrix.
+
+    Parameters:
+    ----------
+    matrix : numpy.ndarray
+        Array of shape (..., accounts, years) ordered as ACCOUNTS
+
+    Returns:
+    -------
+    dict
+        Metric name -> array of shape (..., years), ordered as UCA_ROWS
+    """
+    return MetricGraph(matrix).evaluate(UCA_ROWS)
+
+
+def compute_ebitda(matrix):
+    """
+    Compute EBITDA rows from an account matrix.
+
+    Parameters:
+    ----------
+    matrix : numpy.ndarray
+        Array of shape (..., accounts, years) ordered as ACCOUNTS
+
+    Returns:
+    -------
+    dict
+        Metric name -> array of shape (..., years), ordered as EBITDA_ROWS
+    """
+    return MetricGraph(matrix).evaluate(EBITDA_ROWS)
+
+
+def compute_debt_service_coverage(matrix, ebitda=None):
+    """
+    Compute Debt Service Coverage rows from an account matrix.
+
+    Parameters:
+    ----------
+    matrix : numpy.ndarray
+        Array of shape (..., accounts, years) ordered as ACCOUNTS
+    ebitda : numpy.ndarray, optional
+        Precomputed EBITDA; derived from the matrix when omitted
+
+    Returns:
+    -------
+    dict
+        Metric name -> array of shape (..., years), ordered as DSCR_ROWS
+    """
+    known = None if ebitda is None else {'EBITDA': ebitda}
+    return MetricGraph(matrix, known=known).evaluate(DSCR_ROWS)
+
+
+def compute_financial_ratios(matrix):
+    """
+    Compute profitability, liquidity and efficiency ratios from an account matrix.
+
+    Parameters:
+    ----------
+    matrix : numpy.ndarray
+        Array of shape (..., accounts, years) ordered as ACCOUNTS
+
+    Returns:
+    -------
+    dict
+        Metric name -> array of shape (..., years), ordered as RATIO_ROWS
+    """
+    return MetricGraph(matrix).evaluate(RATIO_ROWS)
+
+
+def metrics_to_frame(metrics, years):
+    """
+    Convert a single borrower's metric dict into an analysis DataFrame.
+
+    Parameters:
+    ----------
+    metrics : dict
+        Metric name -> array of shape (years,)
+    years : list
+        Column labels for the resulting DataFrame
+
+    Returns:
+    -------
+    pandas.DataFrame
+        Metrics as rows and years as columns, matching the pandas engine layout
+    """
+    return pd.DataFrame(np.vstack(list(metrics.values())),
+                        index=list(metrics.keys()), columns=list(years))
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Columnar Export of Analysis Results
+
+Writes the UCA Cash Flow, EBITDA, Debt Service Coverage and Financial Ratios
+tables in long format - one row per borrower, year, table and metric - for
+loading into a data mart without re-parsing formatted xlsx workbooks.
+
+Formats (chosen from the file extension or passed explicitly):
+- Parquet (.parquet) and Arrow IPC (.arrow, .feather, .ipc) - require pyarrow
+- JSON Lines (.jsonl, .ndjson) - no extra dependencies
+
+Every format uses the same schema:
+    Borrower ID (string), Year (string), Table (string), Metric (string),
+    Value (float64; null in JSON Lines where the value is infinite or NaN)
+
+Author: Clarity Impact Finance
+"""
+
+import os
+import json
+import math
+
+import numpy as np
+import pandas as pd
+
+from cash_flow_engine import UCA_ROWS, EBITDA_ROWS, DSCR_ROWS, RATIO_ROWS
+from portfolio_analysis import analyze_portfolio, PORTFOLIO_METRICS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    # Parquet and Arrow IPC export are optional; JSON Lines always works
+    pa = pq = None
+
+
+LONG_COLUMNS = ('Borrower ID', 'Year', 'Table', 'Metric', 'Value')
+
+# (table name, analyzer attribute, metric rows) - names match the xlsx sheets
+ANALYSIS_TABLES = (
+    ('UCA Cash Flow', 'uca_cash_flow', UCA_ROWS),
+    ('EBITDA Analysis', 'ebitda_analysis', EBITDA_ROWS),
+    ('Debt Service Coverage', 'dscr_analysis', DSCR_ROWS),
+    ('Financial Ratios', 'ratios', RATIO_ROWS),
+)
+
+FORMATS = {
+    '.parquet': 'parquet',
+    '.arrow': 'arrow',
+    '.feather': 'arrow',
+    '.ipc': 'arrow',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+}
+
+
+def _long_block(borrower_ids, years, table, metric, values):
+    """Long-format columns for one metric of shape (borrowers, years)."""
+    n_borrowers, n_years = values.shape
+    return {
+        'Borrower ID': np.repeat(borrower_ids, n_years),
+        'Year': np.tile(years, n_borrowers),
+        'Table': np.full(values.size, table, dtype=object),
+        'Metric': np.full(values.size, metric, dtype=object),
+        'Value': values.reshape(-1),
+    }
+
+
+def _concat_blocks(blocks):
+    """Stack long-format blocks into one DataFrame with LONG_COLUMNS."""
+    if not blocks:
+        return pd.DataFrame({column: pd.Series(dtype=np.float64 if column == 'Value' else object)
+                             for column in LONG_COLUMNS})
+    return pd.DataFrame({column: np.concatenate([block[column] for block in blocks])
+                         for column in LONG_COLUMNS})
+
+
+def analysis_to_long_frame(analyzer, borrower_id=None):
+    """
+    Flatten one analyzer's analysis tables into long format.
+
+    Parameters:
+    ----------
+    analyzer : SmallBusinessCashFlowAnalyzer
+        Analyzer with completed analysis (run_full_analysis)
+    borrower_id : str, optional
+        Value of the 'Borrower ID' column
+
+    Returns:
+    -------
+    pandas.DataFrame
+        LONG_COLUMNS, one row per table, metric and year
+    """
+    borrower_ids = np.array([None if borrower_id is None else str(borrower_id)], dtype=object)
+    blocks = []
+    for table, attribute, _ in ANALYSIS_TABLES:
+        df = getattr(analyzer, attribute)
+        if df is None:
+            raise ValueError("Analysis not complete. Run full analysis first.")
+        years = np.array([str(year) for year in df.columns], dtype=object)
+        values = df.to_numpy(dtype=np.float64)
+        for metric, row in zip(df.index, values):
+            blocks.append(_long_block(borrower_ids, years, table, str(metric), row[np.newaxis, :]))
+    return _concat_blocks(blocks)
+
+
+def tidy_to_long_frame(tidy):
+    """
+    Convert an analyze_portfolio result into long format.
+
+    Metrics are assigned to every analysis table that contains them (e.g.
+    EBITDA appears under both 'EBITDA Analysis' and 'Debt Service Coverage'),
+    matching analysis_to_long_frame.
+
+    Parameters:
+    ----------
+    tidy : pandas.DataFrame
+        One row per borrower and year with 'Borrower ID', 'Year' and one
+        column per metric, grouped by borrower (as analyze_portfolio returns)
+
+    Returns:
+    -------
+    pandas.DataFrame
+        LONG_COLUMNS, one row per borrower, table, metric and year
+    """
+    if tidy.empty:
+        return _concat_blocks([])
+
+    # analyze_portfolio emits each borrower's years as consecutive rows; split
+    # into (borrowers, years) blocks of equal length
+    blocks = []
+    borrower_column = tidy['Borrower ID'].to_numpy()
+    starts = np.flatnonzero(np.r_[True, borrower_column[1:] != borrower_column[:-1]])
+    lengths = np.diff(np.r_[starts, len(tidy)])
+    for n_years in np.unique(lengths):
+        group = np.concatenate([np.arange(start, start + n_years)
+                                for start in starts[lengths == n_years]])
+        rows = tidy.iloc[group]
+        borrower_ids = np.array([str(b) for b in rows['Borrower ID'].to_numpy()[::n_years]],
+                                dtype=object)
+        years = np.array([str(year) for year in rows['Year'].to_numpy()], dtype=object)
+        years = years.reshape(len(borrower_ids), n_years)
+        for table, _, table_rows in ANALYSIS_TABLES:
+            for metric in table_rows:
+                if metric not in rows.columns:
+                    continue
+                values = rows[metric].to_numpy(dtype=np.float64).reshape(len(borrower_ids), n_years)
+                block = _long_block(borrower_ids, years[0], table, metric, values)
+                # Borrowers in a group may have different year labels
+                block['Year'] = years.reshape(-1)
+                blocks.append(block)
+    return _concat_blocks(blocks)
+
+
+def _require_pyarrow(file_format):
+    if pa is None:
+        raise ImportError(f"{file_format} export requires pyarrow (pip install pyarrow); "
+                          "use a .jsonl file for a dependency-free export")
+
+
+def _arrow_schema():
+    return pa.schema([
+        ('Borrower ID', pa.string()),
+        ('Year', pa.string()),
+        ('Table', pa.string()),
+        ('Metric', pa.string()),
+        ('Value', pa.float64()),
+    ])
+
+
+def _json_value(value):
+    """Python value for a JSON Lines field (null for inf/nan)."""
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+class LongFormatWriter:
+    """
+    Incremental writer for long-format frames in any supported format.
+
+    Usage:
+        with LongFormatWriter('analysis.parquet') as writer:
+            for frame in frames:
+                writer.write(frame)
+    """
+
+    def __init__(self, file_path, file_format=None):
+        """
+        Parameters:
+        ----------
+        file_path : str
+            Output file
+        file_format : str, optional
+            'parquet', 'arrow' or 'jsonl'; inferred from the extension when omitted
+        """
+        if file_format is None:
+            extension = os.path.splitext(file_path)[1].lower()
+            if extension not in FORMATS:
+                raise ValueError(f"Cannot infer export format from '{extension}'. "
+                                 f"Expected one of: {', '.join(FORMATS)}")
+            file_format = FORMATS[extension]
+        if file_format not in set(FORMATS.values()):
+            raise ValueError(f"Unknown export format '{file_format}'")
+
+        self.file_path = file_path
+        self.file_format = file_format
+        self.rows = 0
+
+        if file_format == 'jsonl':
+            self._writer = open(file_path, 'w', encoding='utf-8')
+        else:
+            _require_pyarrow(file_format)
+            if file_format == 'parquet':
+                self._writer = pq.ParquetWriter(file_path, _arrow_schema())
+            else:
+                self._writer = pa.ipc.new_file(file_path, _arrow_schema())
+
+    def write(self, frame):
+        """Append a long-format DataFrame with LONG_COLUMNS."""
+        if self.file_format == 'jsonl':
+            columns = [frame[column].tolist() for column in LONG_COLUMNS]
+            lines = []
+            for row in zip(*columns):
+                record = dict(zip(LONG_COLUMNS, map(_json_value, row)))
+                lines.append(json.dumps(record, allow_nan=False))
+            if lines:
+                self._writer.write('\n'.join(lines) + '\n')
+        else:
+            table = pa.Table.from_pandas(frame.loc[:, list(LONG_COLUMNS)], schema=_arrow_schema(),
+                                         preserve_index=False)
+            self._writer.write_table(table)
+        self.rows += len(frame)
+
+    def close(self):
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def export_long_frame(frame, file_path, file_format=None):
+    """
+    Write a long-format DataFrame to Parquet, Arrow IPC or JSON Lines.
+
+    Returns:
+    -------
+    int
+        Number of rows written
+    """
+    with LongFormatWriter(file_path, file_format) as writer:
+        writer.write(frame)
+    return writer.rows
+
+
+def export_portfolio_columnar(borrowers, file_path, file_format=None, chunksize=1000,
+                              metrics=PORTFOLIO_METRICS, debt_schedule=None):
+    """
+    Analyze a portfolio in chunks and stream the long-format results to one file.
+
+    Parameters:
+    ----------
+    borrowers : dict
+        Borrower id -> SmallBusinessCashFlowAnalyzer with loaded data,
+        FinancialStatements container or (income_statement, balance_sheet) pair
+    file_path : str
+        Output file (.parquet, .arrow or .jsonl)
+    file_format : str, optional
+        'parquet', 'arrow' or 'jsonl'; inferred from the extension when omitted
+    chunksize : int
+        Borrowers analyzed and written per batch, bounding peak memory
+    metrics : iterable
+        Metrics to export (see analyze_portfolio)
+    debt_schedule : DebtSchedule, optional
+        Portfolio debt schedule (see analyze_portfolio); used for every chunk
+
+    Returns:
+    -------
+    int
+        Number of rows written
+    """
+    entries = list(borrowers.items())
+    with LongFormatWriter(file_path, file_format) as writer:
+        for start in range(0, len(entries), chunksize):
+            tidy = analyze_portfolio(dict(entries[start:start + chunksize]), metrics=metrics,
+                                     debt_schedule=debt_schedule)
+            writer.write(tidy_to_long_frame(tidy))
+    return writer.rows
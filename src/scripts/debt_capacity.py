@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Debt Capacity Solver
+
+Maximum supportable loan amount from net operating income (NOI), existing
+debt service, rate, term and a target Debt Service Coverage Ratio - the
+calculation behind the Loan Affordability Analyzer worksheet
+(financial_literacy_excel_calculators.create_affordability_analyzer), as
+array code that pre-qualifies a whole pipeline list at once.
+
+The largest new payment the target allows is NOI / target DSCR less the
+existing debt service. With a fixed rate the loan amount is that payment's
+present value, in closed form (Excel's PV). Every input broadcasts, so an
+array of borrowers against an array of rates - e.g. a rate curve by term -
+is one call.
+
+When the rate depends on the loan amount (a pricing curve), the amount is
+found by vectorized bisection: all rows are bracketed and halved together
+until every bracket is narrower than the tolerance.
+
+Usage:
+    max_loan_amount(noi, existing_debt_service, rate=0.07, term_years=10)
+    max_loan_amount(noi[:, None], existing[:, None], rate_curve[None, :], terms[None, :])
+    prequalify(pipeline_df, target_dscr=1.25)
+
+    python debt_capacity.py pipeline.csv --output prequalified.csv
+
+Author: Clarity Impact Finance
+"""
+
+import os
+import sys
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from loan_schedule import annuity_factor, level_payment
+
+
+DEFAULT_TARGET_DSCR = 1.25
+
+# Pipeline columns, with defaults for the optional ones (None = required).
+# NOI and debt service are annual; rates are decimals.
+PIPELINE_COLUMNS = {
+    'NOI': None,
+    'Existing Debt Service': 0.0,
+    'Rate': None,
+    'Term (Years)': None,
+    'Target DSCR': DEFAULT_TARGET_DSCR,
+    'Payments Per Year': 12,
+}
+
+
+def available_debt_service(noi, existing_debt_service=0.0, target_dscr=DEFAULT_TARGET_DSCR):
+    """
+    Annual debt service left for a new loan at the target DSCR.
+
+    NOI / target DSCR less existing debt service, floored at zero. All
+    arguments broadcast.
+    """
+    noi, existing_debt_service, target_dscr = (
+        np.asarray(a, dtype=np.float64) for a in (noi, existing_debt_service, target_dscr))
+    if np.any(target_dscr <= 0):
+        raise ValueError("Target DSCR must be positive")
+    return np.maximum(noi / target_dscr - existing_debt_service, 0.0)
+
+
+def max_loan_amount(noi, existing_debt_service, rate, term_years, target_dscr=DEFAULT_TARGET_DSCR,
+                    payments_per_year=12, tolerance=0.01, max_iterations=100):
+    """
+    Largest fully amortizing loan that keeps DSCR at or above the target.
+
+    Parameters:
+    ----------
+    noi : array-like
+        Annual net operating income (cash flow available for debt service)
+    existing_debt_service : array-like
+        Annual debt service on existing obligations
+    rate : array-like or callable
+        Annual interest rate as a decimal. A callable maps an array of loan
+        amounts to their rates (see pricing_curve) and is solved by bisection;
+        the annual payment must not fall as the amount rises.
+    term_years : array-like
+        Loan term in years
+    target_dscr : array-like
+        Minimum DSCR after the new loan
+    payments_per_year : array-like
+        Payment frequency, e.g. 12 for monthly
+    tolerance : float
+        Bisection only: dollar accuracy of the returned amounts
+    max_iterations : int
+        Bisection only: upper bound on halving steps
+
+    Returns:
+    -------
+    numpy.ndarray
+        Maximum loan amounts, shaped like the broadcast inputs
+    """
+    available = available_debt_service(noi, existing_debt_service, target_dscr)
+    payments_per_year = np.asarray(payments_per_year, dtype=np.float64)
+    periods = np.rint(np.asarray(term_years, dtype=np.float64) * payments_per_year)
+    payment = available / payments_per_year
+
+    if not callable(rate):
+        rate = np.asarray(rate, dtype=np.float64)
+        return payment * annuity_factor(rate / payments_per_year, periods)
+
+    # The amount repaid over the term is at least the principal at non-negative rates
+    payment, periods, payments_per_year = np.broadcast_arrays(payment, periods, payments_per_year)
+    low = np.zeros(payment.shape)
+    high = payment * periods
+    for _ in range(max_iterations):
+        if not np.any(high - low > tolerance):
+            break
+        middle = (low + high) / 2
+        rates = np.asarray(rate(middle), dtype=np.float64)
+        affordable = level_payment(middle, rates / payments_per_year, periods) <= payment
+        low = np.where(affordable, middle, low)
+        high = np.where(affordable, high, middle)
+    return low
+
+
+def pricing_curve(amounts, rates):
+    """
+    Rate as a function of loan amount, interpolated linearly between points.
+
+    Parameters:
+    ----------
+    amounts : array-like
+        Increasing loan amounts
+    rates : array-like
+        Annual rate at each amount; amounts outside the range take the
+        nearest end rate
+
+    Returns:
+    -------
+    callable
+        Maps an array of loan amounts to rates, for max_loan_amount
+    """
+    amounts = np.asarray(amounts, dtype=np.float64)
+    rates = np.asarray(rates, dtype=np.float64)
+    if np.any(np.diff(amounts) <= 0):
+        raise ValueError("Pricing curve amounts must be increasing")
+    return lambda loan_amounts: np.interp(loan_amounts, amounts, rates)
+
+
+def prequalify(pipeline, target_dscr=None, rate=None):
+    """
+    Maximum loan amount for every row of a pipeline list.
+
+    Parameters:
+    ----------
+    pipeline : pandas.DataFrame
+        One row per prospective borrower with PIPELINE_COLUMNS; an optional
+        'Requested Amount' column adds pro forma DSCR and a pass/fail flag
+    target_dscr : float, optional
+        Overrides the 'Target DSCR' column
+    rate : callable, optional
+        Pricing curve used instead of the 'Rate' column (see pricing_curve)
+
+    Returns:
+    -------
+    pandas.DataFrame
+        The pipeline with 'Available Debt Service' and 'Maximum Loan Amount'
+        columns, plus 'Pro Forma DSCR' and 'Qualifies' when amounts are
+        requested
+    """
+    required = [name for name, default in PIPELINE_COLUMNS.items()
+                if default is None and name not in pipeline.columns and not (name == 'Rate' and rate)]
+    if required:
+        raise KeyError(required)
+
+    columns = {}
+    for name, default in PIPELINE_COLUMNS.items():
+        if name in pipeline.columns:
+            values = pipeline[name].to_numpy(dtype=np.float64)
+            columns[name] = values if default is None else np.where(np.isnan(values), default, values)
+        else:
+            columns[name] = default
+    if target_dscr is not None:
+        columns['Target DSCR'] = target_dscr
+
+    result = pipeline.copy()
+    result['Available Debt Service'] = np.broadcast_to(
+        available_debt_service(columns['NOI'], columns['Existing Debt Service'], columns['Target DSCR']),
+        len(pipeline))
+    result['Maximum Loan Amount'] = np.broadcast_to(max_loan_amount(
+        columns['NOI'], columns['Existing Debt Service'], rate or columns['Rate'],
+        columns['Term (Years)'], columns['Target DSCR'], columns['Payments Per Year']), len(pipeline))
+
+    if 'Requested Amount' in pipeline.columns:
+        requested = pipeline['Requested Amount'].to_numpy(dtype=np.float64)
+        rates = rate(requested) if rate else columns['Rate']
+        payments_per_year = columns['Payments Per Year']
+        new_debt_service = payments_per_year * level_payment(
+            requested, rates / payments_per_year, np.rint(columns['Term (Years)'] * payments_per_year))
+        debt_service = columns['Existing Debt Service'] + new_debt_service
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dscr = np.where(debt_service > 0, columns['NOI'] / debt_service, np.inf)
+        result['Pro Forma DSCR'] = dscr
+        result['Qualifies'] = dscr >= columns['Target DSCR']
+    return result
+
+
+def _read_table(file_path):
+    """Read a pipeline list from .csv or .xlsx."""
+    if os.path.splitext(file_path)[1].lower() in ('.xlsx', '.xlsm', '.xls'):
+        return pd.read_excel(file_path)
+    return pd.read_csv(file_path)
+
+
+def main(argv=None):
+    """
+    Command line interface for pre-qualifying a pipeline list.
+    """
+    parser = argparse.ArgumentParser(description="Maximum supportable loan amount for a pipeline list.")
+    parser.add_argument('pipeline', help="CSV or Excel file with one row per prospective borrower")
+    parser.add_argument('--target-dscr', type=float,
+                        help="Target DSCR for every row (default: the 'Target DSCR' column, or "
+                             f"{DEFAULT_TARGET_DSCR})")
+    parser.add_argument('--output', help="Write the pre-qualified list to this CSV or Excel file")
+    args = parser.parse_args(argv)
+
+    result = prequalify(_read_table(args.pipeline), target_dscr=args.target_dscr)
+    if args.output:
+        if os.path.splitext(args.output)[1].lower() in ('.xlsx', '.xlsm'):
+            result.to_excel(args.output, index=False)
+        else:
+            result.to_csv(args.output, index=False)
+        print(f"Wrote {len(result)} rows to {args.output}")
+    else:
+        print(result.to_string(index=False))
+    if 'Qualifies' in result.columns:
+        print(f"{int(result['Qualifies'].sum())} of {len(result)} requests qualify")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
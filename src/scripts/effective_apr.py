@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Effective APR Solver
+
+All-in cost of loan offers: the internal rate of return of the borrower's
+cash flows when origination fees, other fees and closing costs are netted
+from the loan proceeds. Reported as an APR (periodic rate x payments per
+year) and as an effective annual rate.
+
+Payments come from amortization.py, so offers may be fully amortizing,
+interest-only for a period or carry a balloon. The IRR of every offer is
+solved together by a safeguarded Newton iteration: each Newton step that
+would leave the bracket around the root is replaced by a bisection step,
+so convergence is quadratic near the root and guaranteed far from it.
+Hundreds of term-sheet variants solve in milliseconds.
+
+The input columns follow the CDFI Comparison Tool worksheet
+(financial_literacy_excel_comparison.create_cdfi_comparison_tool), and
+fill_comparison_sheet pre-fills that worksheet with up to three offers and
+their solved APRs.
+
+Usage:
+    effective_apr(amount, rate, term_years, origination_fee=0.02, closing_costs=1500)
+    compare_offers(offers_df)
+    fill_comparison_sheet(workbook['CDFI Comparison'], offers_df)
+
+Author: Clarity Impact Finance
+"""
+
+import numpy as np
+import pandas as pd
+
+from amortization import amortize
+
+
+# Offer columns, with defaults for the optional ones (None = required).
+# Rates and the origination fee are decimals; fees and costs are dollars.
+OFFER_COLUMNS = {
+    'Loan Amount': None,
+    'Loan Term (Years)': None,
+    'Annual Interest Rate': None,
+    'Origination Fee': 0.0,
+    'Other Fees': 0.0,
+    'Closing Costs': 0.0,
+    'Payments Per Year': 12,
+    'Amortization (Years)': np.nan,
+    'Interest Only (Months)': 0,
+}
+
+# Comparison Tool rows (column B labels) filled from each offer, as (label, compare_offers column)
+COMPARISON_ROWS = (
+    ('CDFI Name', 'CDFI Name'),
+    ('Loan Amount ($)', 'Loan Amount'),
+    ('Loan Term (Years)', 'Loan Term (Years)'),
+    ('Annual Interest Rate (%)', 'Annual Interest Rate'),
+    ('Origination Fee (%)', 'Origination Fee'),
+    ('Other Fees ($)', 'Other Fees'),
+    ('Closing Costs ($)', 'Closing Costs'),
+    ('Monthly Payment ($)', 'Payment'),
+    ('Total Principal ($)', 'Loan Amount'),
+    ('Total Interest ($)', 'Total Interest'),
+    ('Total Fees and Costs ($)', 'Total Fees and Costs'),
+    ('Total Cost of Borrowing ($)', 'Total Cost of Borrowing'),
+    ('Annual Percentage Rate (APR) (%)', 'APR'),
+)
+COMPARISON_COLUMNS = (3, 4, 5)  # CDFI Option 1-3
+
+
+def periodic_irr(net_proceeds, payments, guess=None, tolerance=1e-12, max_iterations=100):
+    """
+    Periodic rate that discounts each row of payments to its net proceeds.
+
+    Solves sum_k payments[:, k] / (1 + i)^(k + 1) = net_proceeds for every
+    row at once with a safeguarded Newton iteration.
+
+    Parameters:
+    ----------
+    net_proceeds : array-like
+        Cash received by the borrower per offer, shape (offers,)
+    payments : numpy.ndarray
+        Payments per offer and period, shape (offers, periods); zero-padded
+        after the final payment
+    guess : array-like, optional
+        Starting rates, e.g. the contract periodic rates
+    tolerance : float
+        Convergence tolerance on the rate
+    max_iterations : int
+        Upper bound on iterations
+
+    Returns:
+    -------
+    numpy.ndarray
+        Periodic rates, NaN where there is no root (e.g. no proceeds)
+    """
+    net_proceeds = np.asarray(net_proceeds, dtype=np.float64)
+    payments = np.asarray(payments, dtype=np.float64)
+    k = np.arange(1, payments.shape[1] + 1, dtype=np.float64)
+
+    def residual(rate):
+        # Present value of the payments less the proceeds, and its derivative
+        with np.errstate(over='ignore', invalid='ignore'):
+            discount = np.exp(-k * np.log1p(rate[:, np.newaxis]))
+            present_value = (payments * discount).sum(axis=1)
+            slope = -(payments * discount * k).sum(axis=1) / (1 + rate)
+        return present_value - net_proceeds, slope
+
+    # The present value falls as the rate rises, so the root is bracketed
+    # between a rate where it exceeds the proceeds and one where it does not.
+    # Fees make the IRR at least zero unless payments total less than the proceeds.
+    low = np.zeros(net_proceeds.shape)
+    low_value = residual(low)[0]
+    while np.any((low_value < 0) & (low > -0.99)):
+        low = np.where(low_value < 0, (low - 1) / 2, low)
+        low_value = residual(low)[0]
+    high = np.ones(net_proceeds.shape)
+    high_value = residual(high)[0]
+    while np.any((high_value > 0) & (high < 1e6)):
+        high = np.where(high_value > 0, high * 10, high)
+        high_value = residual(high)[0]
+    solvable = (net_proceeds > 0) & (low_value >= 0) & (high_value <= 0)
+
+    rate = np.zeros(net_proceeds.shape) if guess is None else np.broadcast_to(
+        np.asarray(guess, dtype=np.float64), net_proceeds.shape).copy()
+    rate = np.clip(rate, low, high)
+    for _ in range(max_iterations):
+        value, slope = residual(rate)
+        low = np.where(value > 0, rate, low)
+        high = np.where(value > 0, high, rate)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = value / slope
+        newton = rate - step
+        inside = np.isfinite(newton) & (newton > low) & (newton < high)
+        updated = np.where(inside, newton, (low + high) / 2)
+        done = np.abs(updated - rate) <= tolerance * np.maximum(1.0, np.abs(rate))
+        rate = updated
+        if np.all(done | ~solvable):
+            break
+    return np.where(solvable, rate, np.nan)
+
+
+def _offer_columns(offers):
+    """Offer arrays keyed by OFFER_COLUMNS name, with defaults filled in."""
+    missing = [name for name, default in OFFER_COLUMNS.items()
+               if default is None and name not in offers.columns]
+    if missing:
+        raise KeyError(missing)
+    columns = {}
+    for name, default in OFFER_COLUMNS.items():
+        if name in offers.columns:
+            values = offers[name].to_numpy(dtype=np.float64)
+            columns[name] = values if default is None else np.where(np.isnan(values), default, values)
+        else:
+            columns[name] = np.full(len(offers), default, dtype=np.float64)
+    return columns
+
+
+def compare_offers(offers):
+    """
+    Payment, total cost and all-in APR for each loan offer.
+
+    Parameters:
+    ----------
+    offers : pandas.DataFrame
+        One row per offer with OFFER_COLUMNS
+
+    Returns:
+    -------
+    pandas.DataFrame
+        The offers with 'Payment', 'Net Proceeds', 'Total Interest', 'Total
+        Fees and Costs', 'Total Cost of Borrowing', 'APR' and 'Effective
+        Annual Rate' columns. Payment is the first amortizing payment and,
+        as on the comparison sheet, Total Cost of Borrowing is principal
+        plus interest plus fees and costs.
+    """
+    c = _offer_columns(offers)
+    amount = c['Loan Amount']
+    schedule = amortize(amount, c['Annual Interest Rate'], c['Loan Term (Years)'],
+                        payments_per_year=c['Payments Per Year'],
+                        amortization_years=c['Amortization (Years)'],
+                        io_months=c['Interest Only (Months)'])
+
+    fees = amount * c['Origination Fee'] + c['Other Fees'] + c['Closing Costs']
+    net_proceeds = amount - fees
+    payments_per_year = c['Payments Per Year']
+    rate = periodic_irr(net_proceeds, schedule.payment, guess=c['Annual Interest Rate'] / payments_per_year)
+
+    io_periods = np.rint(c['Interest Only (Months)'] * payments_per_year / 12).astype(np.int64)
+    first_amortizing = np.minimum(io_periods, np.maximum(schedule.payment_count - 1, 0))
+    interest = schedule.interest.sum(axis=1)
+
+    result = offers.copy()
+    result['Payment'] = schedule.payment[np.arange(len(offers)), first_amortizing]
+    result['Net Proceeds'] = net_proceeds
+    result['Total Interest'] = interest
+    result['Total Fees and Costs'] = fees
+    result['Total Cost of Borrowing'] = amount + interest + fees
+    result['APR'] = rate * payments_per_year
+    result['Effective Annual Rate'] = np.expm1(payments_per_year * np.log1p(rate))
+    return result
+
+
+def effective_apr(amount, rate, term_years, origination_fee=0.0, other_fees=0.0, closing_costs=0.0,
+                  payments_per_year=12, amortization_years=None, io_months=0):
+    """
+    All-in APR of loans with fees netted from proceeds.
+
+    All arguments broadcast (see compare_offers for the meaning of each).
+
+    Returns:
+    -------
+    numpy.ndarray
+        APR as a decimal: the periodic IRR x payments per year
+    """
+    values = {
+        'Loan Amount': amount,
+        'Loan Term (Years)': term_years,
+        'Annual Interest Rate': rate,
+        'Origination Fee': origination_fee,
+        'Other Fees': other_fees,
+        'Closing Costs': closing_costs,
+        'Payments Per Year': payments_per_year,
+        'Amortization (Years)': np.nan if amortization_years is None else amortization_years,
+        'Interest Only (Months)': io_months,
+    }
+    columns = np.broadcast_arrays(*(np.atleast_1d(np.asarray(v, dtype=np.float64)) for v in values.values()))
+    offers = pd.DataFrame({name: np.ravel(column) for name, column in zip(values, columns)})
+    return compare_offers(offers)['APR'].to_numpy().reshape(columns[0].shape)
+
+
+def fill_comparison_sheet(sheet, offers):
+    """
+    Pre-fill the CDFI Comparison Tool worksheet with up to three offers.
+
+    Rows are found by their column B labels (see COMPARISON_ROWS). The
+    offer terms go in the input cells, and the payment, cost totals and
+    solved all-in APR replace the sheet's formulas for those offers.
+
+    Parameters:
+    ----------
+    sheet : openpyxl.worksheet.worksheet.Worksheet
+        Sheet built by create_cdfi_comparison_tool
+    offers : pandas.DataFrame
+        Offers with OFFER_COLUMNS and an optional 'CDFI Name' column
+
+    Returns:
+    -------
+    pandas.DataFrame
+        compare_offers output for the offers written
+    """
+    if len(offers) > len(COMPARISON_COLUMNS):
+        raise ValueError(f"The comparison sheet holds at most {len(COMPARISON_COLUMNS)} offers")
+    result = compare_offers(offers)
+
+    rows = {}
+    for row, (label,) in enumerate(sheet.iter_rows(min_col=2, max_col=2, values_only=True), start=1):
+        if isinstance(label, str):
+            rows.setdefault(label.strip(), row)
+    missing = [label for label, _ in COMPARISON_ROWS if label not in rows]
+    if missing:
+        raise KeyError(missing)
+
+    for column, (_, offer) in zip(COMPARISON_COLUMNS, result.iterrows()):
+        for label, source in COMPARISON_ROWS:
+            if source in offer.index and not pd.isna(offer[source]):
+                value = offer[source]
+                sheet.cell(row=rows[label], column=column, value=value.item() if hasattr(value, 'item') else value)
+    return result
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Streaming Excel Ingestion
+
+Read-only loader for borrower workbooks. Instead of parsing whole sheets
+through pandas, each statement sheet is opened with openpyxl in read_only
+mode and scanned with iter_rows(values_only=True); scanning stops as soon as
+every account the analyzer needs has been found. Other sheets in the
+workbook (GL detail, notes, supporting schedules) are never parsed, so load
+time and peak memory stay flat regardless of workbook size.
+
+Note: openpyxl sizes each read-only sheet from its <dimension> element when
+the workbook is opened. Excel always writes one; files produced by tools
+that omit it (e.g. openpyxl write-only mode) are scanned once per sheet.
+
+Author: Clarity Impact Finance
+"""
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from cash_flow_engine import INCOME_ACCOUNTS, BALANCE_ACCOUNTS
+
+
+def _label(value):
+    """Normalize an account label cell for matching."""
+    return value.strip() if isinstance(value, str) else value
+
+
+def read_statement_rows(rows, accounts=None):
+    """
+    Collect statement rows from an iterator of row value tuples.
+
+    The first row is the header: an account label cell followed by one cell
+    per year. Each later row is an account label followed by its values.
+
+    Parameters:
+    ----------
+    rows : iterator
+        Row value tuples, e.g. from Worksheet.iter_rows(values_only=True)
+    accounts : iterable, optional
+        Accounts to collect. Iteration stops once all of them are found.
+        When omitted every labelled row is collected.
+
+    Returns:
+    -------
+    pandas.DataFrame
+        Accounts as rows and years as columns, in sheet order. Accounts not
+        present in the sheet are simply absent.
+    """
+    rows = iter(rows)
+    header = next(rows, None)
+    if header is None:
+        return pd.DataFrame()
+
+    # Keep only year columns with a header; trailing blank columns are common
+    year_positions = [i for i, value in enumerate(header) if i > 0 and value is not None]
+    years = [_label(header[i]) for i in year_positions]
+
+    wanted = None if accounts is None else set(accounts)
+    labels = []
+    seen = set()
+    data = []
+    for row in rows:
+        if not row:
+            continue
+        label = _label(row[0])
+        if label is None or label in seen:
+            continue
+        if wanted is not None and label not in wanted:
+            continue
+
+        labels.append(label)
+        seen.add(label)
+        data.append([row[i] if i < len(row) else None for i in year_positions])
+
+        if wanted is not None and len(labels) == len(wanted):
+            break
+
+    return pd.DataFrame(data, index=pd.Index(labels, name=_label(header[0])), columns=years)
+
+
+def read_statements(file_path, income_sheet='Income Statement', balance_sheet='Balance Sheet',
+                    income_accounts=INCOME_ACCOUNTS, balance_accounts=BALANCE_ACCOUNTS):
+    """
+    Stream the income statement and balance sheet out of a workbook.
+
+    Parameters:
+    ----------
+    file_path : str
+        Path to the Excel file
+    income_sheet : str
+        Name of the sheet containing income statement data
+    balance_sheet : str
+        Name of the sheet containing balance sheet data
+    income_accounts, balance_accounts : iterable or None
+        Accounts to read from each sheet; defaults to those the analyzer
+        uses. Pass None to read every row.
+
+    Returns:
+    -------
+    tuple
+        (income_statement, balance_sheet) DataFrames
+    """
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        income = read_statement_rows(wb[income_sheet].iter_rows(values_only=True),
+                                     income_accounts)
+        balance = read_statement_rows(wb[balance_sheet].iter_rows(values_only=True),
+                                      balance_accounts)
+    finally:
+        # Read-only workbooks keep the file open until closed
+        wb.close()
+    return income, balance
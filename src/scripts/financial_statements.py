@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compact Financial Statements
+
+Fixed account schema and an array-backed container for one borrower's
+income statement and balance sheet. Instead of two label-indexed pandas
+DataFrames, a borrower is a single float64 (accounts x years) array whose
+rows follow ACCOUNT_SCHEMA, plus a tuple of year labels. DataFrames are only
+built at the edges (loading from and exporting to Excel), so portfolio runs
+hold a few hundred bytes per borrower and never do pandas index lookups in
+their inner loops.
+
+The schema starts with the accounts the cash flow engine reads (ACCOUNTS),
+so the leading rows of a FinancialStatements array are the engine's account
+matrix without any copying. The remaining presentation lines (Cash, Gross
+Profit, Net PP&E, ...) follow.
+
+Author: Clarity Impact Finance
+"""
+
+import numpy as np
+import pandas as pd
+
+from cash_flow_engine import ACCOUNTS, ACCOUNT_INDEX
+
+
+# Statement line items in presentation order
+INCOME_SCHEMA = (
+    'Revenue',
+    'Cost of Goods Sold',
+    'Gross Profit',
+    'Operating Expenses',
+    'Depreciation',
+    'Amortization',
+    'EBIT',
+    'Interest Expense',
+    'Income Before Taxes',
+    'Income Taxes',
+    'Net Income',
+)
+
+BALANCE_SCHEMA = (
+    'Cash',
+    'Accounts Receivable',
+    'Inventory',
+    'Other Current Assets',
+    'Total Current Assets',
+    'Property, Plant & Equipment',
+    'Accumulated Depreciation',
+    'Net PP&E',
+    'Intangible Assets',
+    'Other Long-term Assets',
+    'Total Assets',
+    'Accounts Payable',
+    'Short-term Debt',
+    'Current Portion of Long-term Debt',
+    'Other Current Liabilities',
+    'Total Current Liabilities',
+    'Long-term Debt',
+    'Other Long-term Liabilities',
+    'Total Liabilities',
+    'Equity',
+    'Total Liabilities & Equity',
+)
+
+# Row order of the array: engine accounts first, then the remaining lines
+ACCOUNT_SCHEMA = ACCOUNTS + tuple(account for account in INCOME_SCHEMA + BALANCE_SCHEMA
+                                  if account not in ACCOUNT_INDEX)
+SCHEMA_INDEX = {account: i for i, account in enumerate(ACCOUNT_SCHEMA)}
+
+
+def _schema_rows(statement, accounts, years, required):
+    """
+    Positional read of `accounts` x `years` from a statement DataFrame.
+
+    Only the year columns are converted, and accounts absent from the
+    statement are NaN; KeyError lists any missing year or any missing
+    account in `required`.
+    """
+    values = np.full((len(accounts), len(years)), np.nan)
+    if statement is None:
+        return values
+
+    row_positions = {label: i for i, label in enumerate(statement.index)}
+    col_positions = {label: i for i, label in enumerate(statement.columns)}
+    missing = [label for label in required if label not in row_positions]
+    missing += [label for label in years if label not in col_positions]
+    if missing:
+        raise KeyError(missing)
+
+    present = [i for i, account in enumerate(accounts) if account in row_positions]
+    rows = [row_positions[accounts[i]] for i in present]
+    cols = [col_positions[label] for label in years]
+    values[present] = statement.to_numpy()[np.ix_(rows, cols)].astype(np.float64)
+    return values
+
+
+class FinancialStatements:
+    """
+    One borrower's statements as a float64 (ACCOUNT_SCHEMA x years) array.
+    """
+
+    __slots__ = ('values', 'years')
+
+    def __init__(self, values, years):
+        """
+        Parameters:
+        ----------
+        values : array-like
+            Array of shape (len(ACCOUNT_SCHEMA), len(years)) ordered as
+            ACCOUNT_SCHEMA; unknown lines are NaN
+        years : iterable
+            Year labels in chronological order
+        """
+        self.years = tuple(years)
+        self.values = np.ascontiguousarray(values, dtype=np.float64)
+        if self.values.shape != (len(ACCOUNT_SCHEMA), len(self.years)):
+            raise ValueError(f"Expected values of shape {(len(ACCOUNT_SCHEMA), len(self.years))}, "
+                             f"got {self.values.shape}")
+
+    @classmethod
+    def from_frames(cls, income_statement, balance_sheet, years=None):
+        """
+        Build from income statement and balance sheet DataFrames.
+
+        Parameters:
+        ----------
+        income_statement : pandas.DataFrame
+            Income statement indexed by account with one column per year
+        balance_sheet : pandas.DataFrame or None
+            Balance sheet indexed by account with one column per year; when
+            None the balance sheet lines are NaN
+        years : list, optional
+            Year columns to include; defaults to the income statement columns
+
+        Returns:
+        -------
+        FinancialStatements
+            Lines outside ACCOUNT_SCHEMA are dropped. Raises KeyError if an
+            account used by the cash flow engine is missing.
+        """
+        years = list(income_statement.columns) if years is None else list(years)
+        income_required = [a for a in INCOME_SCHEMA if a in ACCOUNT_INDEX]
+        balance_required = [a for a in BALANCE_SCHEMA if a in ACCOUNT_INDEX]
+
+        values = np.empty((len(ACCOUNT_SCHEMA), len(years)))
+        values[[SCHEMA_INDEX[a] for a in INCOME_SCHEMA]] = _schema_rows(
+            income_statement, INCOME_SCHEMA, years, income_required)
+        values[[SCHEMA_INDEX[a] for a in BALANCE_SCHEMA]] = _schema_rows(
+            balance_sheet, BALANCE_SCHEMA, years, balance_required)
+        return cls(values, years)
+
+    @classmethod
+    def from_accounts(cls, accounts, years):
+        """
+        Build from a mapping of account name -> values per year.
+
+        Accounts not in ACCOUNT_SCHEMA raise KeyError; schema lines not
+        given are NaN.
+        """
+        values = np.full((len(ACCOUNT_SCHEMA), len(years)), np.nan)
+        for account, account_values in accounts.items():
+            values[SCHEMA_INDEX[account]] = account_values
+        return cls(values, years)
+
+    def to_frames(self):
+        """
+        Convert to (income_statement, balance_sheet) DataFrames.
+
+        Engine accounts are always included; other lines are omitted when
+        they are NaN in every year (i.e. were never provided).
+        """
+        return self._frame(INCOME_SCHEMA), self._frame(BALANCE_SCHEMA)
+
+    def _frame(self, accounts):
+        known = [account for account in accounts
+                 if account in ACCOUNT_INDEX or not np.isnan(self[account]).all()]
+        return pd.DataFrame(self.values[[SCHEMA_INDEX[account] for account in known]],
+                            index=known, columns=list(self.years))
+
+    @property
+    def matrix(self):
+        """The cash flow engine's (ACCOUNTS x years) matrix, as a view."""
+        return self.values[:len(ACCOUNTS)]
+
+    @property
+    def nbytes(self):
+        """Bytes held by the values array."""
+        return self.values.nbytes
+
+    def __getitem__(self, account):
+        """Values of one account across years, as a view."""
+        return self.values[SCHEMA_INDEX[account]]
+
+    def __contains__(self, account):
+        return account in SCHEMA_INDEX
+
+    def __repr__(self):
+        return f"FinancialStatements(years={list(self.years)})"
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Parsed Financials Cache
+
+On-disk cache of the income statement and balance sheet parsed by
+SmallBusinessCashFlowAnalyzer.load_from_excel. Entries are keyed by the
+SHA-256 of the workbook's contents plus the sheet names, so re-analyzing an
+unchanged borrower file skips Excel parsing entirely, while any edit to the
+file produces a new key.
+
+Entries are stored as NumPy .npz files (float64 values plus JSON-encoded row
+and column labels). The cache is bounded by total size and evicts the least
+recently used entries first.
+
+Usage:
+    python financials_cache.py stats
+    python financials_cache.py clear
+    python financials_cache.py invalidate borrower_financials.xlsx
+
+Author: Clarity Impact Finance
+"""
+
+import os
+import sys
+import json
+import hashlib
+import argparse
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache',
+                                 'clarity_impact_finance', 'financials')
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+ENTRY_SUFFIX = '.npz'
+
+
+def file_sha256(file_path, block_size=1024 * 1024):
+    """Return the hex SHA-256 digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _encodable(labels):
+    """True if labels round-trip through JSON unchanged (str or int only)."""
+    return all(isinstance(label, str) or
+               (isinstance(label, (int, np.integer)) and not isinstance(label, bool))
+               for label in labels)
+
+
+def frame_to_arrays(prefix, df):
+    """Encode a numeric DataFrame as npz arrays, or None if it can't be cached."""
+    if not (_encodable(df.index) and _encodable(df.columns)):
+        return None
+    if any(dtype.kind not in 'biuf' for dtype in df.dtypes):
+        return None
+    try:
+        values = df.to_numpy(dtype=np.float64)
+    except (TypeError, ValueError):
+        return None
+    labels = {
+        'index': [label if isinstance(label, str) else int(label) for label in df.index],
+        'columns': [label if isinstance(label, str) else int(label) for label in df.columns],
+        'index_name': df.index.name if isinstance(df.index.name, str) else None,
+        'dtypes': [str(dtype) for dtype in df.dtypes],
+    }
+    return {
+        f'{prefix}_values': values,
+        f'{prefix}_labels': np.array(json.dumps(labels)),
+    }
+
+
+def arrays_to_frame(prefix, arrays):
+    """Rebuild a DataFrame written by frame_to_arrays."""
+    labels = json.loads(str(arrays[f'{prefix}_labels']))
+    values = arrays[f'{prefix}_values']
+    # Build by position so duplicate column labels survive, restoring each dtype
+    frame = pd.DataFrame({i: values[:, i].astype(dtype)
+                          for i, dtype in enumerate(labels['dtypes'])},
+                         index=pd.Index(labels['index'], name=labels['index_name']))
+    frame.columns = labels['columns']
+    return frame
+
+
+class FinancialsCache:
+    """
+    Size-bounded LRU cache of parsed borrower financial statements.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Parameters:
+        ----------
+        cache_dir : str
+            Directory holding the cache entries
+        max_bytes : int
+            Total size above which least recently used entries are evicted
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, file_path, *read_options):
+        """
+        Cache key for a workbook's contents and how it was read.
+
+        `read_options` are JSON-serializable values such as the sheet names;
+        entries for the same file read differently never collide.
+        """
+        options = hashlib.sha256(json.dumps(list(read_options)).encode('utf-8'))
+        return f"{file_sha256(file_path)}_{options.hexdigest()[:16]}"
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + ENTRY_SUFFIX)
+
+    def _entries(self):
+        """List (path, size, last_used) for every cache entry."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(ENTRY_SUFFIX):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def get(self, key):
+        """
+        Return the cached (income_statement, balance_sheet) or None on a miss.
+        """
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as arrays:
+                income_statement = arrays_to_frame('income', arrays)
+                balance_sheet = arrays_to_frame('balance', arrays)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Corrupt or partially written entry - drop it and re-parse
+            self._remove(path)
+            return None
+
+        # Record the access for LRU eviction
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return income_statement, balance_sheet
+
+    def put(self, key, income_statement, balance_sheet):
+        """
+        Store parsed statements under `key` and evict entries over the size limit.
+
+        Returns False without storing anything if the statements contain
+        non-numeric values or labels that cannot be stored losslessly.
+        """
+        income = frame_to_arrays('income', income_statement)
+        balance = frame_to_arrays('balance', balance_sheet)
+        if income is None or balance is None:
+            return False
+
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **income, **balance)
+        os.replace(tmp_path, path)
+
+        self.evict()
+        return True
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def invalidate(self, file_path):
+        """Remove every cached entry for the current contents of a workbook."""
+        prefix = file_sha256(file_path) + '_'
+        removed = 0
+        for path, _, _ in self._entries():
+            if os.path.basename(path).startswith(prefix):
+                removed += self._remove(path)
+        return removed
+
+    def clear(self):
+        """Remove all cache entries."""
+        return sum(self._remove(path) for path, _, _ in self._entries())
+
+    def stats(self):
+        """Return the number of entries and their total size in bytes."""
+        entries = self._entries()
+        return {
+            'entries': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+            'max_bytes': self.max_bytes,
+            'cache_dir': self.cache_dir,
+        }
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+            return 1
+        except FileNotFoundError:
+            return 0
+
+
+def main(argv=None):
+    """
+    Command line interface for inspecting and invalidating the cache.
+    """
+    parser = argparse.ArgumentParser(description="Manage the parsed borrower financials cache.")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help="Cache directory (default: %(default)s)")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('stats', help="Show the number of entries and total size")
+    subparsers.add_parser('clear', help="Remove all cache entries")
+    invalidate_parser = subparsers.add_parser(
+        'invalidate', help="Remove cached entries for one or more workbooks")
+    invalidate_parser.add_argument('files', nargs='+', help="Workbook paths")
+    args = parser.parse_args(argv)
+
+    cache = FinancialsCache(cache_dir=args.cache_dir)
+    if args.command == 'stats':
+        stats = cache.stats()
+        print(f"Cache directory: {stats['cache_dir']}")
+        print(f"Entries: {stats['entries']}")
+        print(f"Size: {stats['bytes'] / (1024 * 1024):,.2f} MB "
+              f"of {stats['max_bytes'] / (1024 * 1024):,.0f} MB")
+    elif args.command == 'clear':
+        print(f"Removed {cache.clear()} cache entries")
+    elif args.command == 'invalidate':
+        for file_path in args.files:
+            if not os.path.exists(file_path):
+                print(f"Error: {file_path} not found")
+                return 1
+            print(f"Removed {cache.invalidate(file_path)} cache entries for {file_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
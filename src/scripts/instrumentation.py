@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Stage Instrumentation
+
+Lightweight per-stage profiler for the analyzer pipeline. Each stage records
+wall time, CPU time and the peak memory traced while it ran (via
+tracemalloc). Stages may be nested; results are available as a list of
+dicts, as JSON, or as a Chrome trace-event file that opens in
+chrome://tracing or https://ui.perfetto.dev.
+
+Usage:
+    profiler = StageProfiler()
+    analyzer = SmallBusinessCashFlowAnalyzer(profiler=profiler)
+    analyzer.load_from_excel('borrower.xlsx')
+    analyzer.run_full_analysis()
+    analyzer.export_to_excel('borrower_analysis.xlsx')
+    profiler.close()
+    print(profiler.to_json())
+    profiler.write_chrome_trace('borrower_trace.json')
+
+Note that tracemalloc slows allocation-heavy code; pass trace_memory=False
+when only timings are needed.
+
+Author: Clarity Impact Finance
+"""
+
+import os
+import json
+import time
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+
+class StageProfiler:
+    """
+    Records wall time, CPU time and peak traced memory for named stages.
+    """
+
+    def __init__(self, trace_memory=True):
+        """
+        Parameters:
+        ----------
+        trace_memory : bool
+            Measure each stage's peak memory with tracemalloc. Tracing is
+            started here if it is not already running and stopped by close().
+        """
+        self.trace_memory = trace_memory
+        self.stages = []
+        self._origin = time.perf_counter()
+        self._open = []
+        self._started_tracing = False
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Context manager timing one stage.
+
+        Parameters:
+        ----------
+        name : str
+            Stage name, e.g. 'load' or 'uca'
+        """
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        frame = {'peak': 0, 'start_memory': 0}
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._open:
+                # Keep the enclosing stage's peak before resetting it for this one
+                self._open[-1]['peak'] = max(self._open[-1]['peak'], peak)
+            if hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
+            frame['start_memory'] = current
+        self._open.append(frame)
+
+        record = {
+            'stage': name,
+            'depth': len(self._open) - 1,
+            'start': time.perf_counter() - self._origin,
+        }
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield record
+        finally:
+            record['wall_time'] = time.perf_counter() - wall_start
+            record['cpu_time'] = time.process_time() - cpu_start
+            self._open.pop()
+            if tracing:
+                peak = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+                record['peak_memory'] = peak
+                record['peak_increase'] = peak - frame['start_memory']
+                if self._open:
+                    self._open[-1]['peak'] = max(self._open[-1]['peak'], peak)
+            else:
+                record['peak_memory'] = record['peak_increase'] = None
+            self.stages.append(record)
+
+    def close(self):
+        """Stop tracemalloc if this profiler started it."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def to_dict(self):
+        """
+        Stage records in start order.
+
+        Returns:
+        -------
+        dict
+            {'stages': [{'stage', 'depth', 'start', 'wall_time', 'cpu_time',
+            'peak_memory', 'peak_increase'}, ...]}. Times are in seconds.
+            peak_memory is the highest traced memory while the stage ran and
+            peak_increase its rise over the memory traced when the stage
+            started, both in bytes (None when memory is not traced).
+        """
+        return {'stages': sorted(self.stages, key=lambda record: record['start'])}
+
+    def to_json(self, file_path=None):
+        """
+        Serialize the stage records as JSON, optionally writing them to a file.
+
+        Returns:
+        -------
+        str
+            JSON document
+        """
+        document = json.dumps(self.to_dict(), indent=2)
+        if file_path is not None:
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write(document)
+        return document
+
+    def write_chrome_trace(self, file_path):
+        """
+        Write the stages as Chrome trace-event complete ('X') events.
+
+        Parameters:
+        ----------
+        file_path : str
+            Output JSON file, viewable in chrome://tracing or Perfetto
+        """
+        pid = os.getpid()
+        tid = threading.get_ident()
+        events = []
+        for record in self.to_dict()['stages']:
+            args = {'cpu_time_ms': record['cpu_time'] * 1e3}
+            if record['peak_memory'] is not None:
+                args['peak_memory_kb'] = record['peak_memory'] / 1024
+                args['peak_increase_kb'] = record['peak_increase'] / 1024
+            events.append({
+                'name': record['stage'],
+                'cat': 'analysis',
+                'ph': 'X',
+                'ts': record['start'] * 1e6,
+                'dur': record['wall_time'] * 1e6,
+                'pid': pid,
+                'tid': tid,
+                'args': args,
+            })
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
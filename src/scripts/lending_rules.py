@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lending Rules
+
+Declarative, versioned rule table for the Summary sheet's debt service,
+liquidity and profitability comments and the lending recommendation.
+
+Each output is an ordered list of rules; a rule's conditions are
+(metric, operator, threshold) triples that must all hold, and the first
+matching rule wins. Values that match no rule (including missing or NaN
+metrics) get the output's 'otherwise' label. A table compiles to np.select
+calls, so one evaluation scores a single borrower or an entire portfolio.
+
+Credit policy changes are made by editing a rule table, e.g. a JSON file
+loaded with LendingRules.from_json, and bumping its version:
+
+    {
+      "version": "2025-01",
+      "outputs": {
+        "Debt Service": {
+          "rules": [
+            {"when": [["Debt Service Coverage Ratio (DSCR)", ">=", 1.5]],
+             "then": "Strong debt service capacity"}
+          ],
+          "otherwise": "Weak debt service capacity - high risk"
+        }
+      }
+    }
+
+Author: Clarity Impact Finance
+"""
+
+import json
+import operator
+
+import numpy as np
+
+
+OPERATORS = {
+    '>=': operator.ge,
+    '>': operator.gt,
+    '<=': operator.le,
+    '<': operator.lt,
+    '==': operator.eq,
+    '!=': operator.ne,
+}
+
+DSCR = 'Debt Service Coverage Ratio (DSCR)'
+CURRENT_RATIO = 'Current Ratio'
+ROE = 'Return on Equity (%)'
+
+# Output shown as the overall recommendation rather than a metric comment
+RECOMMENDATION = 'Lending Recommendation'
+
+# Credit policy used by the analyzer's Summary sheet and the portfolio summary
+DEFAULT_RULE_TABLE = {
+    'version': '1.0',
+    'outputs': {
+        'Debt Service': {
+            'rules': [
+                {'when': [[DSCR, '>=', 1.5]], 'then': "Strong debt service capacity"},
+                {'when': [[DSCR, '>=', 1.25]], 'then': "Adequate debt service capacity"},
+                {'when': [[DSCR, '>=', 1.1]], 'then': "Marginal debt service capacity"},
+            ],
+            'otherwise': "Weak debt service capacity - high risk",
+        },
+        'Liquidity': {
+            'rules': [
+                {'when': [[CURRENT_RATIO, '>=', 2.0]], 'then': "Strong liquidity position"},
+                {'when': [[CURRENT_RATIO, '>=', 1.5]], 'then': "Adequate liquidity"},
+                {'when': [[CURRENT_RATIO, '>=', 1.0]], 'then': "Tight liquidity - monitor closely"},
+            ],
+            'otherwise': "Liquidity concern - potential cash flow issues",
+        },
+        'Profitability': {
+            'rules': [
+                {'when': [[ROE, '>=', 20]], 'then': "Excellent profitability"},
+                {'when': [[ROE, '>=', 15]], 'then': "Good profitability"},
+                {'when': [[ROE, '>=', 10]], 'then': "Average profitability"},
+            ],
+            'otherwise': "Below average profitability - review business model",
+        },
+        RECOMMENDATION: {
+            'rules': [
+                {'when': [[DSCR, '>=', 1.25], [CURRENT_RATIO, '>=', 1.5], [ROE, '>=', 12]],
+                 'then': "Strong candidate for lending - low risk profile"},
+                {'when': [[DSCR, '>=', 1.1], [CURRENT_RATIO, '>=', 1.0], [ROE, '>=', 8]],
+                 'then': "Acceptable candidate for lending - moderate risk profile"},
+            ],
+            'otherwise': "Caution advised - higher risk profile, consider additional collateral or guarantees",
+        },
+    },
+}
+
+
+class LendingRules:
+    """
+    Compiled lending rule table.
+    """
+
+    def __init__(self, table=DEFAULT_RULE_TABLE):
+        """
+        Parameters:
+        ----------
+        table : dict
+            Rule table with 'version' and 'outputs' (see DEFAULT_RULE_TABLE).
+            Raises ValueError if the table is malformed.
+        """
+        if 'version' not in table or 'outputs' not in table:
+            raise ValueError("Rule table needs 'version' and 'outputs'")
+        self.table = table
+        self.version = str(table['version'])
+
+        # Output -> ([(conditions, label), ...], otherwise), conditions as
+        # (metric, comparison function, threshold)
+        self._compiled = {}
+        for output, spec in table['outputs'].items():
+            rules = []
+            for rule in spec['rules']:
+                conditions = []
+                for metric, op, threshold in rule['when']:
+                    if op not in OPERATORS:
+                        raise ValueError(f"Unknown operator '{op}' in rule for {output}")
+                    conditions.append((metric, OPERATORS[op], float(threshold)))
+                if not conditions:
+                    raise ValueError(f"Rule for {output} has no conditions")
+                rules.append((conditions, rule['then']))
+            self._compiled[output] = (rules, spec['otherwise'])
+
+    @classmethod
+    def from_json(cls, file_path):
+        """Load a rule table from a JSON file."""
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def to_json(self, file_path):
+        """Write the rule table to a JSON file."""
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(self.table, f, indent=2)
+
+    @property
+    def outputs(self):
+        """Output names in table order."""
+        return tuple(self._compiled)
+
+    @property
+    def metrics(self):
+        """Metric names the rules read, in first-use order."""
+        names = {}
+        for rules, _ in self._compiled.values():
+            for conditions, _ in rules:
+                for metric, _, _ in conditions:
+                    names[metric] = None
+        return tuple(names)
+
+    def output_metrics(self, output):
+        """Metric names one output's rules read, in first-use order."""
+        rules, _ = self._compiled[output]
+        return tuple(dict.fromkeys(metric for conditions, _ in rules for metric, _, _ in conditions))
+
+    def bands(self, metric):
+        """
+        Lowest and highest threshold of the first output graded on one metric alone.
+
+        An output qualifies when every rule is a single '>=' or '>' condition
+        on the metric, like the default Debt Service and Liquidity tiers:
+        values at or above the highest threshold get its best label and
+        values below the lowest get 'otherwise'.
+
+        Returns:
+        -------
+        tuple or None
+            (low, high) thresholds, or None if no output qualifies
+        """
+        for rules, _ in self._compiled.values():
+            if rules and all(len(conditions) == 1 and conditions[0][0] == metric
+                             and conditions[0][1] in (operator.ge, operator.gt)
+                             for conditions, _ in rules):
+                thresholds = [conditions[0][2] for conditions, _ in rules]
+                return min(thresholds), max(thresholds)
+        return None
+
+    def labels(self, output):
+        """Every label an output can take, rule order first and 'otherwise' last."""
+        rules, otherwise = self._compiled[output]
+        return tuple(label for _, label in rules) + (otherwise,)
+
+    def evaluate(self, values):
+        """
+        Evaluate every output for arrays of metric values.
+
+        Parameters:
+        ----------
+        values : mapping
+            Metric name -> array-like (or scalar) of values; e.g. a DataFrame
+            with one column per metric
+
+        Returns:
+        -------
+        dict
+            Output name -> numpy array of labels
+        """
+        arrays = {metric: np.asarray(values[metric], dtype=np.float64) for metric in self.metrics}
+        shape = np.broadcast_shapes(*(array.shape for array in arrays.values()))
+
+        results = {}
+        # NaN compares False everywhere, so missing metrics fall through to 'otherwise'
+        with np.errstate(invalid='ignore'):
+            for output, (rules, otherwise) in self._compiled.items():
+                predicates = []
+                for conditions, _ in rules:
+                    predicate = np.ones(shape, dtype=bool)
+                    for metric, compare, threshold in conditions:
+                        predicate &= compare(arrays[metric], threshold)
+                    predicates.append(predicate)
+                if not predicates:
+                    results[output] = np.full(shape, otherwise)
+                    continue
+                results[output] = np.select(predicates, [label for _, label in rules],
+                                            default=otherwise)
+        return results
+
+    def evaluate_one(self, values):
+        """
+        Evaluate every output for a single borrower.
+
+        Returns:
+        -------
+        dict
+            Output name -> label
+        """
+        return {output: str(labels) for output, labels in self.evaluate(values).items()}
+
+
+DEFAULT_RULES = LendingRules()
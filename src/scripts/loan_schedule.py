@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Loan Schedules
+
+Exact annual principal and interest from a borrower's debt schedule, used in
+place of the balance sheet's Current Portion of Long-term Debt when
+calculating debt service coverage.
+
+Each note is described by its amount, annual rate, term, amortization
+period, interest-only period and first payment date. Payments are level
+after the interest-only period; an amortization period longer than the
+remaining term leaves a balloon that is repaid with the final payment.
+
+Balances come from the closed-form amortization formula, so principal paid
+in a fiscal year is the drop in balance across that year and interest is
+the year's payments less that principal. Every note and year is computed as
+one broadcast array operation - no per-payment loops - so hundreds of notes
+per borrower or a whole portfolio's notes are handled in a single call.
+
+The same primitives price a proposed new loan over an amount x rate x term
+grid for pro forma DSCR (see pro_forma_dscr).
+
+Author: Clarity Impact Finance
+"""
+
+import numpy as np
+import pandas as pd
+
+from cash_flow_engine import safe_divide
+
+
+# Debt schedule columns, with defaults for the optional ones (None = required)
+NOTE_COLUMNS = {
+    'Amount': None,
+    'Rate': None,                   # Annual rate as a decimal, e.g. 0.07
+    'Term (Years)': None,
+    'Amortization (Years)': np.nan,  # Default: remaining term after interest-only
+    'Interest Only (Months)': 0,
+    'First Payment Year': None,
+    'First Payment Month': 1,
+    'Payments Per Year': 12,
+}
+
+
+def annuity_factor(periodic_rate, periods):
+    """
+    Present value of 1 paid at the end of each of `periods` periods.
+
+    (1 - (1 + i)^-n) / i, or n at a zero rate; all arguments broadcast.
+    """
+    periodic_rate, periods = (np.asarray(a, dtype=np.float64) for a in (periodic_rate, periods))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(periodic_rate == 0, periods,
+                        -np.expm1(-periods * np.log1p(periodic_rate)) / periodic_rate)
+
+
+def level_payment(principal, periodic_rate, periods):
+    """
+    Level payment that fully amortizes `principal` over `periods` payments.
+
+    All arguments broadcast; a zero rate repays principal in equal parts.
+    """
+    principal, periods = np.asarray(principal, dtype=np.float64), np.asarray(periods, dtype=np.float64)
+    annuity = annuity_factor(periodic_rate, periods)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(periods > 0, principal / annuity, 0.0)
+
+
+def note_periods(term_years, payments_per_year, amortization_years=None, io_months=0):
+    """
+    Total, interest-only and amortizing payment counts of notes.
+
+    All arguments broadcast. Amortization years of NaN or None mean fully
+    amortizing over the term remaining after the interest-only period.
+    Raises ValueError when the amortization period is shorter than that
+    remaining term or the interest-only period is longer than the term.
+
+    Returns:
+    -------
+    tuple
+        (total_periods, io_periods, amortizing_periods)
+    """
+    term_years, payments_per_year, io_months = (
+        np.asarray(a, dtype=np.float64) for a in (term_years, payments_per_year, io_months))
+    amortization_years = np.asarray(np.nan if amortization_years is None else amortization_years,
+                                    dtype=np.float64)
+
+    total_periods = np.rint(term_years * payments_per_year)
+    io_periods = np.rint(io_months * payments_per_year / 12)
+    amortizing_periods = np.where(np.isnan(amortization_years), total_periods - io_periods,
+                                  np.rint(amortization_years * payments_per_year))
+    if np.any(amortizing_periods < total_periods - io_periods):
+        raise ValueError("Amortization period is shorter than the term after interest-only months")
+    if np.any(io_periods > total_periods):
+        raise ValueError("Interest-only period is longer than the term")
+    return total_periods, io_periods, amortizing_periods
+
+
+def amortized_balance(balance, periodic_rate, payment, periods):
+    """
+    Balance after `periods` level payments starting from `balance`.
+
+    B(1 + i)^k - A((1 + i)^k - 1) / i, or B - Ak at a zero rate; all
+    arguments broadcast. Shared by the annual schedules here and the
+    payment-by-payment schedules in amortization.py.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth = np.expm1(periods * np.log1p(periodic_rate))  # (1 + i)^k - 1
+        return np.where(periodic_rate == 0, balance - payment * periods,
+                        balance + balance * growth - payment * growth / periodic_rate)
+
+
+def _balance(principal, periodic_rate, payment, amortizing_periods, io_periods, payments):
+    """Closed-form balance after `payments` payments for a known level payment."""
+    k = np.clip(payments - io_periods, 0, amortizing_periods)
+    return amortized_balance(principal, periodic_rate, payment, k)
+
+
+def scheduled_balance(principal, periodic_rate, amortizing_periods, io_periods, payments):
+    """
+    Scheduled balance after `payments` payments, ignoring any balloon.
+
+    The balance stays at `principal` through the interest-only payments and
+    then follows a level-payment amortization over `amortizing_periods`.
+    All arguments broadcast.
+    """
+    principal, periodic_rate, amortizing_periods, io_periods, payments = (
+        np.asarray(a, dtype=np.float64)
+        for a in (principal, periodic_rate, amortizing_periods, io_periods, payments))
+    payment = level_payment(principal, periodic_rate, amortizing_periods)
+    return _balance(principal, periodic_rate, payment, amortizing_periods, io_periods, payments)
+
+
+def annual_debt_service(amount, rate, term_years, first_payment_year, years,
+                        amortization_years=None, io_months=0, first_payment_month=1,
+                        payments_per_year=12):
+    """
+    Principal and interest paid on each note in each fiscal (calendar) year.
+
+    Note arguments broadcast against each other (e.g. arrays of shape
+    (notes,)); `years` adds a trailing axis.
+
+    Parameters:
+    ----------
+    amount : array-like
+        Original principal
+    rate : array-like
+        Annual interest rate as a decimal
+    term_years : array-like
+        Years from the first payment period to maturity
+    first_payment_year : array-like
+        Calendar year of the first payment
+    years : array-like
+        Fiscal years to report, as integers
+    amortization_years : array-like, optional
+        Amortization period after the interest-only period; longer than the
+        remaining term means a balloon at maturity. NaN or None means fully
+        amortizing over the remaining term.
+    io_months : array-like
+        Interest-only months at the start of the term
+    first_payment_month : array-like
+        Month (1-12) of the first payment
+    payments_per_year : array-like
+        Payment frequency, e.g. 12 for monthly
+
+    Returns:
+    -------
+    tuple
+        (principal, interest), each of shape broadcast(notes) + (len(years),)
+    """
+    amount, rate, term_years, first_payment_year, io_months, first_payment_month, payments_per_year = (
+        np.asarray(a, dtype=np.float64)[..., np.newaxis]
+        for a in (amount, rate, term_years, first_payment_year, io_months,
+                  first_payment_month, payments_per_year))
+    years = np.asarray(years, dtype=np.float64)
+
+    if amortization_years is None:
+        amortization_years = np.nan
+    amortization_years = np.asarray(amortization_years, dtype=np.float64)[..., np.newaxis]
+    total_periods, io_periods, amortizing_periods = note_periods(
+        term_years, payments_per_year, amortization_years, io_months)
+
+    periodic_rate = rate / payments_per_year
+    months_between = 12 / payments_per_year
+
+    def payments_by_end_of(year):
+        # Months from the first payment to December of `year`; payments fall every months_between
+        months = 12 * (year - first_payment_year) + 12 - first_payment_month
+        made = np.where(months >= 0, np.floor(months / months_between) + 1, 0)
+        return np.minimum(made, total_periods)
+
+    payment = level_payment(amount, periodic_rate, amortizing_periods)
+
+    def balance(payments):
+        scheduled = _balance(amount, periodic_rate, payment, amortizing_periods, io_periods, payments)
+        return np.where(payments >= total_periods, 0.0, scheduled)
+
+    before = payments_by_end_of(years - 1)
+    after = payments_by_end_of(years)
+    principal = balance(before) - balance(after)
+
+    # Interest is what was paid in the year less the principal it retired
+    io_payments = np.clip(after, 0, io_periods) - np.clip(before, 0, io_periods)
+    amortizing_payments = (np.clip(after, io_periods, total_periods)
+                           - np.clip(before, io_periods, total_periods))
+    matures = (before < total_periods) & (after >= total_periods)
+    balloon = np.where(matures, _balance(amount, periodic_rate, payment, amortizing_periods,
+                                         io_periods, total_periods), 0.0)
+    paid = io_payments * amount * periodic_rate + amortizing_payments * payment + balloon
+    return principal, paid - principal
+
+
+def fiscal_years(years):
+    """Integer fiscal years from year labels; ValueError for labels such as 'TTM'."""
+    try:
+        return np.array([int(year) for year in years], dtype=np.int64)
+    except (TypeError, ValueError):
+        raise ValueError(f"Debt schedules need numeric year labels, got {list(years)}")
+
+
+class DebtSchedule:
+    """
+    One or more borrowers' notes as column arrays (see NOTE_COLUMNS).
+    """
+
+    __slots__ = ('columns', 'borrower_ids')
+
+    def __init__(self, columns, borrower_ids=None):
+        """
+        Parameters:
+        ----------
+        columns : dict
+            NOTE_COLUMNS name -> array of per-note values; optional columns
+            take their defaults when omitted
+        borrower_ids : array-like, optional
+            Borrower id per note, for schedules covering a portfolio
+        """
+        missing = [name for name, default in NOTE_COLUMNS.items()
+                   if default is None and name not in columns]
+        if missing:
+            raise KeyError(missing)
+        size = len(np.atleast_1d(columns['Amount']))
+        self.columns = {}
+        for name, default in NOTE_COLUMNS.items():
+            values = columns.get(name, default)
+            self.columns[name] = np.broadcast_to(np.asarray(values, dtype=np.float64), (size,))
+        self.borrower_ids = None if borrower_ids is None else np.asarray(borrower_ids, dtype=object)
+
+    @classmethod
+    def from_frame(cls, notes):
+        """
+        Build from a DataFrame with one row per note.
+
+        Columns follow NOTE_COLUMNS; an optional 'Borrower ID' column assigns
+        notes to borrowers. Missing optional values take their defaults.
+        """
+        columns = {}
+        for name, default in NOTE_COLUMNS.items():
+            if name in notes.columns:
+                values = notes[name].to_numpy(dtype=np.float64)
+                if default is not None:
+                    values = np.where(np.isnan(values), default, values)
+                columns[name] = values
+        borrower_ids = notes['Borrower ID'].to_numpy() if 'Borrower ID' in notes.columns else None
+        return cls(columns, borrower_ids)
+
+    @classmethod
+    def from_excel(cls, file_path, sheet_name='Debt Schedule'):
+        """Read a debt schedule sheet with one row per note (see from_frame)."""
+        return cls.from_frame(pd.read_excel(file_path, sheet_name=sheet_name))
+
+    def to_frame(self):
+        """The notes as a DataFrame with NOTE_COLUMNS (and 'Borrower ID')."""
+        frame = pd.DataFrame(self.columns)
+        if self.borrower_ids is not None:
+            frame.insert(0, 'Borrower ID', self.borrower_ids)
+        return frame
+
+    def __len__(self):
+        return len(self.columns['Amount'])
+
+    def __repr__(self):
+        return f"DebtSchedule(notes={len(self)})"
+
+    def note_debt_service(self, years):
+        """
+        Principal and interest per note and year.
+
+        Returns:
+        -------
+        tuple
+            (principal, interest), each of shape (notes, len(years))
+        """
+        c = self.columns
+        return annual_debt_service(
+            c['Amount'], c['Rate'], c['Term (Years)'], c['First Payment Year'], fiscal_years(years),
+            amortization_years=c['Amortization (Years)'], io_months=c['Interest Only (Months)'],
+            first_payment_month=c['First Payment Month'], payments_per_year=c['Payments Per Year'])
+
+    def debt_service(self, years):
+        """
+        Total principal and interest across all notes per year.
+
+        Returns:
+        -------
+        dict
+            {'Principal Payments': array, 'Interest Expense': array}, each of
+            shape (len(years),)
+        """
+        principal, interest = self.note_debt_service(years)
+        return {'Principal Payments': principal.sum(axis=0), 'Interest Expense': interest.sum(axis=0)}
+
+    def debt_service_by_borrower(self, borrower_ids, years):
+        """
+        Principal and interest per borrower and year.
+
+        Parameters:
+        ----------
+        borrower_ids : list
+            Borrowers to report, in output order; notes of other borrowers
+            are ignored
+        years : list
+            Fiscal year labels
+
+        Returns:
+        -------
+        tuple
+            ({'Principal Payments': array, 'Interest Expense': array}, has_notes):
+            arrays of shape (len(borrower_ids), len(years)) and a boolean
+            array marking borrowers with at least one note
+        """
+        if self.borrower_ids is None:
+            raise ValueError("Debt schedule has no 'Borrower ID' column")
+        index = pd.Index(borrower_ids).get_indexer(self.borrower_ids)
+        selected = index >= 0
+        principal, interest = (self.note_debt_service(years) if selected.all() else
+                               DebtSchedule({name: values[selected] for name, values in self.columns.items()})
+                               .note_debt_service(years))
+        index = index[selected]
+
+        totals = {}
+        for name, values in (('Principal Payments', principal), ('Interest Expense', interest)):
+            total = np.zeros((len(borrower_ids), len(years)))
+            np.add.at(total, index, values)
+            totals[name] = total
+        has_notes = np.bincount(index, minlength=len(borrower_ids)) > 0
+        return totals, has_notes
+
+    def split_by_borrower(self):
+        """
+        One schedule per borrower, e.g. to load into each borrower's analyzer.
+
+        Returns:
+        -------
+        dict
+            Borrower id -> DebtSchedule of that borrower's notes, in note order
+        """
+        if self.borrower_ids is None:
+            raise ValueError("Debt schedule has no 'Borrower ID' column")
+        positions = pd.Series(np.arange(len(self))).groupby(self.borrower_ids, sort=False).indices
+        return {borrower_id: DebtSchedule({name: values[rows] for name, values in self.columns.items()},
+                                          self.borrower_ids[rows])
+                for borrower_id, rows in positions.items()}
+
+
+def proposed_loan_debt_service(amounts, rates, terms, payments_per_year=12):
+    """
+    Annual debt service of a proposed level-payment loan for every
+    amount x rate x term combination.
+
+    Parameters:
+    ----------
+    amounts : array-like
+        Loan amounts, shape (A,)
+    rates : array-like
+        Annual interest rates as decimals, shape (R,)
+    terms : array-like
+        Fully amortizing terms in years, shape (T,)
+    payments_per_year : int
+        Payment frequency, e.g. 12 for monthly
+
+    Returns:
+    -------
+    numpy.ndarray
+        Annual payments of shape (A, R, T)
+    """
+    amounts = np.asarray(amounts, dtype=np.float64).reshape(-1, 1, 1)
+    rates = np.asarray(rates, dtype=np.float64).reshape(1, -1, 1)
+    terms = np.asarray(terms, dtype=np.float64).reshape(1, 1, -1)
+    periods = np.rint(terms * payments_per_year)
+    return payments_per_year * level_payment(amounts, rates / payments_per_year, periods)
+
+
+def pro_forma_dscr(cash_available, debt_service, amounts, rates, terms, payments_per_year=12):
+    """
+    DSCR after adding a proposed loan to existing debt service.
+
+    Parameters:
+    ----------
+    cash_available : float
+        Cash flow available for debt service, e.g. the latest year's EBITDA
+    debt_service : float
+        Existing annual debt service (interest plus principal)
+    amounts, rates, terms, payments_per_year
+        Proposed loan grid (see proposed_loan_debt_service)
+
+    Returns:
+    -------
+    numpy.ndarray
+        DSCR of shape (A, R, T); inf where there is no debt service
+    """
+    new_debt_service = proposed_loan_debt_service(amounts, rates, terms, payments_per_year)
+    return safe_divide(cash_available, debt_service + new_debt_service, np.inf)
+
+
+def pro_forma_to_frame(grid, amounts, rates, terms):
+    """
+    Label a pro forma DSCR grid as a DataFrame.
+
+    Returns:
+    -------
+    pandas.DataFrame
+        Rows indexed by (Term (Years), Loan Amount), one column per rate
+    """
+    amounts, rates, terms = (np.asarray(a, dtype=np.float64) for a in (amounts, rates, terms))
+    index = pd.MultiIndex.from_product([terms, amounts], names=['Term (Years)', 'Loan Amount'])
+    # (A, R, T) -> (T, A, R) so each term's block of amounts is contiguous
+    values = np.moveaxis(grid, 2, 0).reshape(len(terms) * len(amounts), len(rates))
+    return pd.DataFrame(values, index=index, columns=pd.Index(rates, name='Rate'))
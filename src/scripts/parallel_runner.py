@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Parallel Portfolio Runner
+
+Spreads borrower analysis and Excel export across a ProcessPoolExecutor.
+Most of the export time is CPU-bound openpyxl cell writes and workbook saves,
+so running one borrower workbook per process scales with the number of cores.
+
+Features:
+- Configurable worker count and chunking
+- Per-task timeouts
+- Results collected in input order, one result per task
+
+Author: Clarity Impact Finance
+"""
+
+import os
+import time
+import signal
+import contextlib
+import functools
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+
+import pandas as pd
+
+from small_business_cash_flow_analysis import SmallBusinessCashFlowAnalyzer
+from portfolio_analysis import analyze_portfolio, borrower_statements, PORTFOLIO_METRICS
+
+
+@contextlib.contextmanager
+def _time_limit(seconds):
+    """
+    Raise TimeoutError if the enclosed block runs longer than `seconds`.
+
+    Uses SIGALRM where the platform provides it; elsewhere the limit is
+    enforced only by the parent process while collecting results.
+    """
+    if not seconds or not hasattr(signal, 'SIGALRM'):
+        yield
+        return
+
+    def _on_alarm(signum, frame):
+        raise TimeoutError(f"Task exceeded {seconds} seconds")
+
+    previous = signal.signal(signal.SIGALRM, _on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _run_chunk(func, chunk, timeout):
+    """Run `func` over one chunk of items inside a worker process."""
+    results = []
+    for item in chunk:
+        start = time.perf_counter()
+        try:
+            with _time_limit(timeout):
+                value = func(item)
+            error = None
+        except Exception as e:
+            value = None
+            error = f"{type(e).__name__}: {e}"
+        results.append({
+            'result': value,
+            'error': error,
+            'seconds': time.perf_counter() - start,
+        })
+    return results
+
+
+def run_parallel(func, items, max_workers=None, chunksize=1, timeout=None):
+    """
+    Apply `func` to every item in a process pool and return ordered results.
+
+    Parameters:
+    ----------
+    func : callable
+        Module-level (picklable) function taking one item
+    items : iterable
+        Work items; each must be picklable
+    max_workers : int, optional
+        Number of worker processes (defaults to os.cpu_count())
+    chunksize : int
+        Number of items sent to a worker per submission
+    timeout : float, optional
+        Maximum seconds allowed per item
+
+    Returns:
+    -------
+    list
+        One dict per item, in input order, with 'result', 'error' (None on
+        success) and 'seconds'
+    """
+    items = list(items)
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+    chunks = [items[i:i + chunksize] for i in range(0, len(items), chunksize)]
+
+    results = []
+    timed_out = False
+    executor = ProcessPoolExecutor(max_workers=max_workers or os.cpu_count())
+    try:
+        futures = [executor.submit(_run_chunk, func, chunk, timeout) for chunk in chunks]
+        for chunk, future in zip(chunks, futures):
+            # Chunks are dispatched in submission order, so by the time we wait on
+            # this one every earlier chunk has finished and it has already started.
+            # The parent-side limit is a backstop for tasks the worker cannot
+            # interrupt itself (no SIGALRM, or blocked inside C code).
+            wait_limit = None if timeout is None else timeout * len(chunk) + 1
+            try:
+                results.extend(future.result(timeout=wait_limit))
+            except FutureTimeoutError:
+                timed_out = True
+                future.cancel()
+                results.extend({'result': None,
+                                'error': f"TimeoutError: Task exceeded {timeout} seconds",
+                                'seconds': wait_limit}
+                               for _ in chunk)
+            except Exception as e:
+                # The worker process died (e.g. BrokenProcessPool) or the result
+                # could not be unpickled
+                results.extend({'result': None,
+                                'error': f"{type(e).__name__}: {e}",
+                                'seconds': None}
+                               for _ in chunk)
+    finally:
+        # Don't block on a worker that is still stuck in a timed-out task
+        executor.shutdown(wait=not timed_out, cancel_futures=True)
+    return results
+
+
+def export_borrower_workbook(task):
+    """
+    Analyze one borrower and export its workbook (runs in a worker process).
+
+    Parameters:
+    ----------
+    task : tuple
+        (borrower, output_file, engine, write_only, debt_schedule, lending_rules)
+        where borrower is a loaded SmallBusinessCashFlowAnalyzer, a
+        FinancialStatements container or an (income_statement, balance_sheet)
+        pair; debt_schedule (the borrower's notes) and lending_rules may be None
+
+    Returns:
+    -------
+    str
+        Path of the written workbook
+    """
+    borrower, output_file, engine, write_only, debt_schedule, lending_rules = task
+    income_statement, balance_sheet, years = borrower_statements(borrower)
+
+    analyzer = SmallBusinessCashFlowAnalyzer(engine=engine, lending_rules=lending_rules)
+    analyzer.income_statement = income_statement
+    analyzer.balance_sheet = balance_sheet
+    analyzer.years = years
+    if debt_schedule is not None and not analyzer.load_debt_schedule(debt_schedule):
+        raise RuntimeError("Debt schedule could not be loaded")
+
+    if not analyzer.run_full_analysis():
+        raise RuntimeError("Analysis failed")
+    if not analyzer.export_to_excel(output_file, write_only=write_only):
+        raise RuntimeError(f"Export to {output_file} failed")
+    return output_file
+
+
+def export_portfolio_parallel(borrowers, output_dir, max_workers=None, chunksize=1,
+                              timeout=None, engine='vectorized', write_only=False, debt_schedule=None):
+    """
+    Export one analysis workbook per borrower using a process pool.
+
+    Parameters:
+    ----------
+    borrowers : dict
+        Borrower id -> SmallBusinessCashFlowAnalyzer with loaded data,
+        FinancialStatements container or (income_statement, balance_sheet) pair
+    output_dir : str
+        Directory that receives '<borrower id>_cash_flow_analysis.xlsx' files
+    max_workers : int, optional
+        Number of worker processes (defaults to os.cpu_count())
+    chunksize : int
+        Number of borrowers sent to a worker per submission
+    timeout : float, optional
+        Maximum seconds allowed per borrower
+    engine : str
+        Analyzer calculation engine used in the workers
+    write_only : bool
+        Stream each workbook through an openpyxl write-only workbook
+        (see SmallBusinessCashFlowAnalyzer.export_to_excel)
+    debt_schedule : DebtSchedule, optional
+        Portfolio debt schedule with a 'Borrower ID' column; each borrower's
+        notes are loaded into its analyzer. As in analyze_portfolio, an
+        analyzer's own loaded schedule takes precedence. Analyzers also keep
+        their lending rules.
+
+    Returns:
+    -------
+    pandas.DataFrame
+        One row per borrower, in input order, with 'Borrower ID',
+        'Output File', 'Success', 'Error' and 'Seconds'
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    schedules = {} if debt_schedule is None else debt_schedule.split_by_borrower()
+    tasks = []
+    for borrower_id, borrower in borrowers.items():
+        schedule, rules = schedules.get(borrower_id), None
+        if isinstance(borrower, SmallBusinessCashFlowAnalyzer):
+            schedule = borrower.debt_schedule if borrower.debt_schedule is not None else schedule
+            rules = borrower.lending_rules
+        tasks.append((borrower, os.path.join(output_dir, f"{borrower_id}_cash_flow_analysis.xlsx"),
+                      engine, write_only, schedule, rules))
+    results = run_parallel(export_borrower_workbook, tasks, max_workers=max_workers,
+                           chunksize=chunksize, timeout=timeout)
+
+    return pd.DataFrame({
+        'Borrower ID': list(borrowers.keys()),
+        'Output File': [task[1] for task in tasks],
+        'Success': [r['error'] is None for r in results],
+        'Error': [r['error'] for r in results],
+        'Seconds': [r['seconds'] for r in results],
+    })
+
+
+def analyze_portfolio_parallel(borrowers, max_workers=None, chunksize=500, timeout=None,
+                               metrics=PORTFOLIO_METRICS, debt_schedule=None):
+    """
+    Run analyze_portfolio over chunks of borrowers in a process pool.
+
+    Each worker analyzes `chunksize` borrowers in one vectorized pass; the
+    chunk tables are concatenated in input order.
+
+    Parameters:
+    ----------
+    borrowers : dict
+        Borrower id -> SmallBusinessCashFlowAnalyzer with loaded data,
+        FinancialStatements container or (income_statement, balance_sheet) pair
+    max_workers : int, optional
+        Number of worker processes (defaults to os.cpu_count())
+    chunksize : int
+        Number of borrowers analyzed per task
+    timeout : float, optional
+        Maximum seconds allowed per chunk
+    metrics : iterable
+        Metric columns to compute (see analyze_portfolio)
+    debt_schedule : DebtSchedule, optional
+        Portfolio debt schedule (see analyze_portfolio); sent to every worker
+
+    Returns:
+    -------
+    pandas.DataFrame
+        The same tidy table analyze_portfolio returns. Raises RuntimeError
+        listing the failed chunks if any chunk fails or times out.
+    """
+    entries = list(borrowers.items())
+    chunks = [dict(entries[i:i + chunksize]) for i in range(0, len(entries), chunksize)]
+    task = functools.partial(analyze_portfolio, metrics=tuple(metrics), debt_schedule=debt_schedule)
+    results = run_parallel(task, chunks, max_workers=max_workers, chunksize=1, timeout=timeout)
+
+    errors = [f"chunk {i}: {r['error']}" for i, r in enumerate(results) if r['error']]
+    if errors:
+        raise RuntimeError("Portfolio analysis failed for " + "; ".join(errors))
+    if not results:
+        return analyze_portfolio({}, metrics=metrics, debt_schedule=debt_schedule)
+    return pd.concat([r['result'] for r in results], ignore_index=True)
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Portfolio Cash Flow Analysis
+
+Batch mode for the Small Business Cash Flow Analysis Tool. Instead of running
+one SmallBusinessCashFlowAnalyzer per borrower, the statements of a whole
+portfolio are stacked into a 3-D (borrower x account x year) array and the
+vectorized engine computes every metric for every borrower in one pass.
+
+The result is a tidy table with one row per borrower and year containing
+UCA Cash Flow, EBITDA, DSCR and financial ratio metrics.
+
+Author: Clarity Impact Finance
+"""
+
+import numpy as np
+import pandas as pd
+
+from cash_flow_engine import (
+    ACCOUNTS, ACCOUNT_INDEX, MetricGraph, statements_to_matrix, missing_accounts,
+    UCA_ROWS, EBITDA_ROWS, DSCR_ROWS, RATIO_ROWS
+)
+from financial_statements import FinancialStatements
+from small_business_cash_flow_analysis import SmallBusinessCashFlowAnalyzer
+
+
+def borrower_statements(borrower):
+    """
+    Return (income_statement, balance_sheet, years) for a portfolio entry.
+
+    An entry is a SmallBusinessCashFlowAnalyzer with loaded data, a
+    FinancialStatements container or an (income_statement, balance_sheet)
+    pair of DataFrames.
+    """
+    if isinstance(borrower, FinancialStatements):
+        return borrower.to_frames() + (list(borrower.years),)
+    if isinstance(borrower, SmallBusinessCashFlowAnalyzer):
+        return borrower.income_statement, borrower.balance_sheet, list(borrower.years)
+    income_statement, balance_sheet = borrower
+    return income_statement, balance_sheet, list(income_statement.columns)
+
+
+def build_portfolio_cube(borrowers, years):
+    """
+    Stack borrower statements into a (borrower x account x year) array.
+
+    Parameters:
+    ----------
+    borrowers : dict
+        Borrower id -> FinancialStatements or (income_statement, balance_sheet) pair
+    years : list
+        Year columns shared by every borrower, in chronological order
+
+    Returns:
+    -------
+    numpy.ndarray
+        float64 array of shape (len(borrowers), len(ACCOUNTS), len(years))
+    """
+    cube = np.empty((len(borrowers), len(ACCOUNTS), len(years)), dtype=np.float64)
+    for i, borrower in enumerate(borrowers.values()):
+        if isinstance(borrower, FinancialStatements) and list(borrower.years) == list(years):
+            # Already in engine row order; no pandas lookups
+            cube[i] = borrower.matrix
+        elif isinstance(borrower, FinancialStatements):
+            cube[i] = borrower.matrix[:, [borrower.years.index(year) for year in years]]
+        else:
+            cube[i] = statements_to_matrix(*borrower, years)
+    return cube
+
+
+# Default result columns: every analysis table row, each metric once
+PORTFOLIO_METRICS = tuple(dict.fromkeys(UCA_ROWS + EBITDA_ROWS + DSCR_ROWS + RATIO_ROWS))
+
+
+def compute_portfolio_metrics(cube, metrics=PORTFOLIO_METRICS, known=None, missing=()):
+    """
+    Compute analysis metrics for a portfolio cube in one vectorized pass.
+
+    Parameters:
+    ----------
+    cube : numpy.ndarray
+        Array of shape (borrowers, accounts, years) ordered as ACCOUNTS
+    metrics : iterable
+        Metric names to compute; only these and the metrics they depend on
+        are evaluated
+    known : dict, optional
+        Metric name -> (borrowers, years) values replacing those nodes, e.g.
+        scheduled debt service from portfolio_debt_service
+    missing : iterable
+        Accounts absent from any borrower's statements; a requested metric
+        that reads one raises KeyError
+
+    Returns:
+    -------
+    dict
+        Metric name -> array of shape (borrowers, years)
+    """
+    return MetricGraph(cube, known=known, missing=missing).evaluate(metrics)
+
+
+def portfolio_debt_service(cube, borrower_ids, years, debt_schedule=None, schedules=None):
+    """
+    Scheduled Interest Expense and Principal Payments for a portfolio cube.
+
+    Borrowers with notes in `debt_schedule` (or an entry in `schedules`) get
+    the exact amounts due on those notes; the others keep their reported
+    interest and the Current Portion of Long-term Debt proxy.
+
+    Parameters:
+    ----------
+    cube : numpy.ndarray
+        Array of shape (borrowers, accounts, years) ordered as ACCOUNTS
+    borrower_ids : list
+        Borrower ids in cube order
+    years : list
+        Year labels in cube order (numeric)
+    debt_schedule : DebtSchedule, optional
+        Notes of many borrowers, with a 'Borrower ID' column
+    schedules : dict, optional
+        Borrower id -> that borrower's own DebtSchedule
+
+    Returns:
+    -------
+    dict or None
+        {'Interest Expense': array, 'Principal Payments': array} of shape
+        (borrowers, years), or None when no schedule applies
+    """
+    if debt_schedule is None and not schedules:
+        return None
+    interest = cube[:, ACCOUNT_INDEX['Interest Expense']].copy()
+    principal = cube[:, ACCOUNT_INDEX['Current Portion of Long-term Debt']].copy()
+
+    if debt_schedule is not None:
+        totals, has_notes = debt_schedule.debt_service_by_borrower(borrower_ids, years)
+        interest[has_notes] = totals['Interest Expense'][has_notes]
+        principal[has_notes] = totals['Principal Payments'][has_notes]
+
+    for i, borrower_id in enumerate(borrower_ids):
+        schedule = (schedules or {}).get(borrower_id)
+        if schedule is not None:
+            debt_service = schedule.debt_service(years)
+            interest[i] = debt_service['Interest Expense']
+            principal[i] = debt_service['Principal Payments']
+
+    return {'Interest Expense': interest, 'Principal Payments': principal}
+
+
+def metrics_to_tidy_frame(borrower_ids, years, metrics):
+    """
+    Flatten portfolio metrics into a tidy DataFrame.
+
+    Parameters:
+    ----------
+    borrower_ids : list
+        Borrower ids in cube order
+    years : list
+        Year labels in cube order
+    metrics : dict
+        Metric name -> array of shape (borrowers, years)
+
+    Returns:
+    -------
+    pandas.DataFrame
+        One row per borrower and year with 'Borrower ID', 'Year' and one
+        column per metric
+    """
+    columns = {
+        'Borrower ID': np.repeat(np.asarray(borrower_ids, dtype=object), len(years)),
+        'Year': np.tile(np.asarray(years, dtype=object), len(borrower_ids)),
+    }
+    for metric, values in metrics.items():
+        columns[metric] = values.reshape(-1)
+    return pd.DataFrame(columns)
+
+
+def analyze_portfolio(borrowers, metrics=PORTFOLIO_METRICS, debt_schedule=None):
+    """
+    Analyze a collection of borrowers and return one tidy result table.
+
+    Borrowers are grouped by their fiscal years so each group is a single
+    rectangular (borrower x account x year) array; in the common case of a
+    portfolio reviewed on the same fiscal years there is exactly one group
+    and one vectorized pass.
+
+    Parameters:
+    ----------
+    borrowers : dict
+        Borrower id -> SmallBusinessCashFlowAnalyzer with loaded data,
+        FinancialStatements container or (income_statement, balance_sheet) pair
+    metrics : iterable
+        Metric columns to compute; defaults to every UCA Cash Flow, EBITDA,
+        DSCR and financial ratio row. A screening pass can request e.g. only
+        'Debt Service Coverage Ratio (DSCR)'.
+    debt_schedule : DebtSchedule, optional
+        Notes for many borrowers, keyed by 'Borrower ID'. Borrowers with
+        notes (or analyzers with their own loaded schedule) use scheduled
+        principal and interest for debt service; see portfolio_debt_service.
+
+    Returns:
+    -------
+    pandas.DataFrame
+        One row per borrower and year, in input order, with one column per
+        requested metric. Raises KeyError if a borrower is missing an
+        account a requested metric reads.
+    """
+    groups = {}
+    schedules = {}
+    for borrower_id, borrower in borrowers.items():
+        if isinstance(borrower, SmallBusinessCashFlowAnalyzer) and borrower.debt_schedule is not None:
+            schedules[borrower_id] = borrower.debt_schedule
+        if isinstance(borrower, FinancialStatements):
+            groups.setdefault(borrower.years, {})[borrower_id] = borrower
+            continue
+        income_statement, balance_sheet, years = borrower_statements(borrower)
+        if income_statement is None or balance_sheet is None:
+            raise ValueError(f"Financial data not loaded for borrower {borrower_id}")
+        group = groups.setdefault(tuple(years), {})
+        group[borrower_id] = (income_statement, balance_sheet)
+
+    frames = []
+    for years, group in groups.items():
+        cube = build_portfolio_cube(group, list(years))
+        known = portfolio_debt_service(cube, list(group.keys()), list(years), debt_schedule, schedules)
+        missing = {account for borrower in group.values() if not isinstance(borrower, FinancialStatements)
+                   for account in missing_accounts(*borrower)}
+        values = compute_portfolio_metrics(cube, metrics, known=known, missing=missing)
+        frames.append(metrics_to_tidy_frame(list(group.keys()), list(years), values))
+
+    if not frames:
+        return pd.DataFrame(columns=['Borrower ID', 'Year'])
+
+    result = pd.concat(frames, ignore_index=True)
+    if len(frames) > 1:
+        # Restore input borrower order across year groups
+        order = {borrower_id: i for i, borrower_id in enumerate(borrowers)}
+        result = (result.assign(_order=result['Borrower ID'].map(order))
+                        .sort_values('_order', kind='stable')
+                        .drop(columns='_order')
+                        .reset_index(drop=True))
+    return result
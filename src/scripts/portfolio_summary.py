@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Portfolio Summary Workbook
+
+Consolidated version of the analyzer's Summary sheet for a whole book: one
+row per borrower with the key metrics for its most recent period, the debt
+service, liquidity and profitability comments and the lending
+recommendation.
+
+Metrics come from one vectorized portfolio pass and the comments from one
+evaluation of the lending rule table (see lending_rules.py), so no
+per-borrower analyzer or workbook is needed and re-scoring the book under a
+new credit policy takes seconds. The sheet is
+written through an openpyxl write-only workbook with frozen headers, an
+autofilter and conditional formatting defined once per column range, so
+100k borrowers stream straight to disk.
+
+Author: Clarity Impact Finance
+"""
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.formatting.rule import CellIsRule, FormulaRule
+from openpyxl.styles import PatternFill
+from openpyxl.utils import get_column_letter
+
+from lending_rules import DEFAULT_RULES, RECOMMENDATION
+from portfolio_analysis import analyze_portfolio
+from small_business_cash_flow_analysis import CELL_STYLES
+
+
+# Summary column label -> metric name (as on the analyzer's Summary sheet)
+SUMMARY_METRICS = (
+    ('EBITDA', 'EBITDA'),
+    ('EBITDA Margin (%)', 'EBITDA Margin (%)'),
+    ('UCA Cash Flow', 'UCA Cash Flow'),
+    ('Debt Service Coverage Ratio', 'Debt Service Coverage Ratio (DSCR)'),
+    ('Current Ratio', 'Current Ratio'),
+    ('Return on Equity (%)', 'Return on Equity (%)'),
+)
+
+# Number format per summary column; '(%)' metrics are already in percent units
+COLUMN_FORMATS = {
+    'EBITDA': '#,##0.00',
+    'EBITDA Margin (%)': '0.00"%"',
+    'UCA Cash Flow': '#,##0.00',
+    'Debt Service Coverage Ratio': '#,##0.00',
+    'Current Ratio': '#,##0.00',
+    'Return on Equity (%)': '0.00"%"',
+}
+
+RED_FILL = PatternFill(start_color="F8CBAD", end_color="F8CBAD", fill_type="solid")
+YELLOW_FILL = PatternFill(start_color="FFE699", end_color="FFE699", fill_type="solid")
+GREEN_FILL = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
+
+
+def summarize_portfolio(borrowers, period=None, rules=DEFAULT_RULES, debt_schedule=None):
+    """
+    Build the one-row-per-borrower portfolio summary.
+
+    Parameters:
+    ----------
+    borrowers : dict
+        Borrower id -> SmallBusinessCashFlowAnalyzer with loaded data,
+        FinancialStatements container or (income_statement, balance_sheet) pair
+    period : str or int, optional
+        Period to summarize; defaults to each borrower's most recent period
+    rules : LendingRules
+        Rule table producing the comment and recommendation columns
+    debt_schedule : DebtSchedule, optional
+        Portfolio debt schedule for scheduled debt service (see analyze_portfolio)
+
+    Returns:
+    -------
+    pandas.DataFrame
+        'Borrower ID', 'Year', the SUMMARY_METRICS columns, one column per
+        rule table output and 'Rules Version', in input order
+    """
+    needed = dict.fromkeys([metric for _, metric in SUMMARY_METRICS] + list(rules.metrics))
+    metrics = analyze_portfolio(borrowers, metrics=list(needed), debt_schedule=debt_schedule)
+    if period is None:
+        latest = metrics.groupby('Borrower ID', sort=False).tail(1)
+    else:
+        latest = metrics[metrics['Year'] == period]
+
+    summary = pd.DataFrame({'Borrower ID': latest['Borrower ID'].to_numpy(),
+                            'Year': latest['Year'].to_numpy()})
+    for label, metric in SUMMARY_METRICS:
+        summary[label] = latest[metric].to_numpy()
+
+    for output, labels in rules.evaluate(latest).items():
+        summary[output] = labels
+    summary['Rules Version'] = rules.version
+    return summary
+
+
+def _column_width(label, values):
+    """Width that fits the header and every formatted value in a column."""
+    if values.dtype.kind == 'f':
+        finite = np.abs(values[np.isfinite(values)])
+        longest = len(f"{-finite.max():,.2f}") if len(finite) else 0
+    else:
+        longest = int(pd.Series(values, dtype=object).astype(str).str.len().max() or 0)
+    return max(len(str(label)), longest) + 2
+
+
+def _conditional_formats(ws, columns, last_row, rules):
+    """Add the metric tier and recommendation highlights, once per column range."""
+    letters = {label: get_column_letter(i) for i, label in enumerate(columns, start=1)}
+
+    for label, metric in SUMMARY_METRICS:
+        bands = rules.bands(metric)
+        if label not in letters or bands is None:
+            continue
+        low, high = (f"{threshold:g}" for threshold in bands)
+        cells = f"{letters[label]}2:{letters[label]}{last_row}"
+        # Earlier rules take priority, so the tier boundaries match the comments
+        ws.conditional_formatting.add(cells, CellIsRule(operator='greaterThanOrEqual',
+                                                        formula=[high], fill=GREEN_FILL))
+        ws.conditional_formatting.add(cells, CellIsRule(operator='between', formula=[low, high],
+                                                        fill=YELLOW_FILL))
+        ws.conditional_formatting.add(cells, CellIsRule(operator='lessThan', formula=[low],
+                                                        fill=RED_FILL))
+
+    if RECOMMENDATION in letters and RECOMMENDATION in rules.outputs:
+        # Best recommendation green, the fallback red, anything in between yellow
+        labels = rules.labels(RECOMMENDATION)
+        letter = letters[RECOMMENDATION]
+        cells = f"{letter}2:{letter}{last_row}"
+        for i, label in enumerate(labels):
+            fill = GREEN_FILL if i == 0 else RED_FILL if i == len(labels) - 1 else YELLOW_FILL
+            quoted = label.replace('"', '""')
+            ws.conditional_formatting.add(cells, FormulaRule(formula=[f'${letter}2="{quoted}"'],
+                                                             fill=fill))
+
+
+def export_portfolio_summary(summary, output_file='portfolio_summary.xlsx', rules=DEFAULT_RULES):
+    """
+    Export a portfolio summary to a single streamed worksheet.
+
+    Parameters:
+    ----------
+    summary : pandas.DataFrame
+        Output of summarize_portfolio (optionally filtered or sorted)
+    output_file : str
+        Path for the output Excel file
+    rules : LendingRules
+        Rule table the summary was scored with; its recommendation labels
+        drive the recommendation column highlighting
+
+    Returns:
+    -------
+    bool
+        True if the workbook was saved
+    """
+    columns = list(summary.columns)
+    column_values = [summary[label].to_numpy() for label in columns]
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Portfolio Summary")
+
+    # Widths must be set before the first row is streamed
+    for i, (label, values) in enumerate(zip(columns, column_values), start=1):
+        ws.column_dimensions[get_column_letter(i)].width = _column_width(label, values)
+    ws.freeze_panes = 'C2'
+    last_row = len(summary) + 1
+    ws.auto_filter.ref = f"A1:{get_column_letter(len(columns))}{last_row}"
+    _conditional_formats(ws, columns, last_row, rules)
+
+    header = []
+    for label in columns:
+        cell = WriteOnlyCell(ws, label)
+        for attribute, style_value in CELL_STYLES['header'].items():
+            setattr(cell, attribute, style_value)
+        header.append(cell)
+    ws.append(header)
+
+    # One styled cell per formatted column, reused for every row (each row is
+    # serialized as soon as it is appended); other columns are appended as values
+    templates = []
+    for label in columns:
+        cell = None
+        if label in COLUMN_FORMATS:
+            cell = WriteOnlyCell(ws)
+            cell.number_format = COLUMN_FORMATS[label]
+        templates.append(cell)
+
+    for row in zip(*(values.tolist() for values in column_values)):
+        cells = []
+        for cell, value in zip(templates, row):
+            if isinstance(value, float) and not np.isfinite(value):
+                # Excel has no inf/nan; leave the cell blank
+                value = None
+            elif cell is not None:
+                cell.value = value
+                value = cell
+            cells.append(value)
+        ws.append(cells)
+
+    try:
+        wb.save(output_file)
+        print(f"Successfully exported portfolio summary to {output_file}")
+        return True
+    except Exception as e:
+        print(f"Error saving Excel file: {e}")
+        return False
@@ -23,11 +23,82 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.utils import get_column_letter, range_boundaries
 from openpyxl.utils.dataframe import dataframe_to_rows
 from openpyxl.chart import LineChart, Reference
+from openpyxl.formatting.rule import ColorScaleRule
 import os
 import datetime
+from contextlib import nullcontext
+
+from excel_ingest import read_statements
+from financials_cache import frame_to_arrays, arrays_to_frame
+from financial_statements import FinancialStatements
+from lending_rules import DEFAULT_RULES, RECOMMENDATION
+from loan_schedule import DebtSchedule, pro_forma_dscr, pro_forma_to_frame
+from cash_flow_engine import (
+    MetricGraph, statements_to_matrix, missing_accounts, metrics_to_frame,
+    UCA_ROWS, EBITDA_ROWS, DSCR_ROWS, RATIO_ROWS, INCOME_ACCOUNTS, BALANCE_ACCOUNTS
+)
+
+# Calculation engines supported by the analyzer
+ENGINES = ('pandas', 'vectorized')
+
+# Analyzer attributes saved by save_state, with the metric rows of each analysis table
+STATE_STATEMENTS = ('income_statement', 'balance_sheet')
+STATE_TABLES = (
+    ('uca_cash_flow', UCA_ROWS),
+    ('ebitda_analysis', EBITDA_ROWS),
+    ('dscr_analysis', DSCR_ROWS),
+    ('ratios', RATIO_ROWS),
+)
+
+# Analysis tables that depend on debt service, discarded when the debt schedule changes
+DEBT_SERVICE_TABLES = ('ebitda_analysis', 'dscr_analysis', 'pro_forma_dscr')
+
+# Cell styles used by the Excel export. The style objects are shared by every
+# cell that uses them instead of being created per cell.
+TITLE_MERGE = 'A1:F1'
+CELL_STYLES = {
+    None: {},
+    'title': {'font': Font(bold=True, size=14), 'alignment': Alignment(horizontal='center')},
+    'summary_title': {'font': Font(bold=True, size=16), 'alignment': Alignment(horizontal='center')},
+    'section': {'font': Font(bold=True, size=12)},
+    'header': {'font': Font(bold=True),
+               'fill': PatternFill(start_color="DDEBF7", end_color="DDEBF7", fill_type="solid"),
+               'alignment': Alignment(horizontal='center')},
+    'label': {'font': Font(bold=True)},
+    'percent': {'number_format': '0.00%'},
+    'number': {'number_format': '#,##0.00'},
+    'amount': {'font': Font(bold=True), 'number_format': '#,##0'},
+}
+
+# Short names for rule metrics quoted in the Summary sheet comments
+SUMMARY_ABBREVIATIONS = {
+    'Debt Service Coverage Ratio (DSCR)': 'DSCR',
+    'Return on Equity (%)': 'ROE',
+}
+
+# Cash flow bases for pro forma DSCR
+PRO_FORMA_BASES = ('EBITDA', 'UCA Cash Flow')
+
+
+def _period_span(label):
+    """(start, end) timestamps of a period label such as '2026' or '2026Q1', or None."""
+    try:
+        period = pd.Period(str(label))
+    except (ValueError, TypeError):
+        return None
+    return period.start_time, period.end_time
+
+
+def dscr_color_scale():
+    """Red-yellow-green color scale for DSCR cells (1.00x / 1.25x / 2.00x)."""
+    return ColorScaleRule(start_type='num', start_value=1.0, start_color='F8696B',
+                          mid_type='num', mid_value=1.25, mid_color='FFEB84',
+                          end_type='num', end_value=2.0, end_color='63BE7B')
 
 
 class SmallBusinessCashFlowAnalyzer:
@@ -35,8 +106,29 @@ class SmallBusinessCashFlowAnalyzer:
     A comprehensive cash flow analysis tool for small business lending.
     """
     
-    def __init__(self):
-        """Initialize the analyzer with empty data structures."""
+    def __init__(self, engine='pandas', lending_rules=None, profiler=None):
+        """
+        Initialize the analyzer with empty data structures.
+        
+        Parameters:
+        ----------
+        engine : str
+            'pandas' computes metrics year by year from the DataFrames;
+            'vectorized' computes them as whole-array NumPy operations
+            over an (accounts x years) matrix (see cash_flow_engine.py)
+        lending_rules : LendingRules, optional
+            Rule table for the Summary sheet comments and lending
+            recommendation; defaults to lending_rules.DEFAULT_RULES
+        profiler : StageProfiler, optional
+            Records wall time, CPU time and peak memory for each stage of
+            load_from_excel, run_full_analysis and export_to_excel (see
+            instrumentation.py)
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}'. Expected one of: {', '.join(ENGINES)}")
+        self.engine = engine
+        self.lending_rules = lending_rules or DEFAULT_RULES
+        self.profiler = profiler
         self.income_statement = None
         self.balance_sheet = None
         self.years = []
@@ -44,9 +136,17 @@ class SmallBusinessCashFlowAnalyzer:
         self.ebitda_analysis = None
         self.dscr_analysis = None
         self.ratios = None
+        self.pro_forma_dscr = None
+        self.debt_schedule = None
+        self._metric_graph = None
+        self._metric_graph_source = None
         
+    def _stage(self, name):
+        """Profiler stage context, or a no-op when no profiler is attached."""
+        return self.profiler.stage(name) if self.profiler is not None else nullcontext()
+    
     def load_from_excel(self, file_path, income_sheet='Income Statement', 
-                        balance_sheet='Balance Sheet'):
+                        balance_sheet='Balance Sheet', cache=None, streaming=False):
         """
         Load financial data from an Excel file with specific sheets.
         
@@ -58,12 +158,36 @@ class SmallBusinessCashFlowAnalyzer:
             Name of the sheet containing income statement data
         balance_sheet : str
             Name of the sheet containing balance sheet data
+        cache : FinancialsCache, optional
+            Cache of parsed statements keyed by file contents; on a hit the
+            Excel parse is skipped entirely (see financials_cache.py)
+        streaming : bool
+            Read the two statement sheets with openpyxl in read-only mode,
+            stopping once the accounts used by the analysis are found. Other
+            sheets and rows are never parsed (see excel_ingest.py).
         """
         try:
-            # Load income statement
-            self.income_statement = pd.read_excel(file_path, sheet_name=income_sheet, index_col=0)
-            # Load balance sheet
-            self.balance_sheet = pd.read_excel(file_path, sheet_name=balance_sheet, index_col=0)
+            with self._stage('load'):
+                cache_key = cached = None
+                if cache is not None:
+                    read_options = [income_sheet, balance_sheet] + (['streaming'] if streaming else [])
+                    cache_key = cache.key(file_path, *read_options)
+                    cached = cache.get(cache_key)
+            
+                if cached is not None:
+                    self.income_statement, self.balance_sheet = cached
+                else:
+                    if streaming:
+                        self.income_statement, self.balance_sheet = read_statements(
+                            file_path, income_sheet=income_sheet, balance_sheet=balance_sheet)
+                    else:
+                        # Load income statement
+                        self.income_statement = pd.read_excel(file_path, sheet_name=income_sheet, index_col=0)
+                        # Load balance sheet
+                        self.balance_sheet = pd.read_excel(file_path, sheet_name=balance_sheet, index_col=0)
+                
+                    if cache is not None:
+                        cache.put(cache_key, self.income_statement, self.balance_sheet)
             
             # Extract years from columns
             self.years = list(self.income_statement.columns)
@@ -89,86 +213,143 @@ class SmallBusinessCashFlowAnalyzer:
         current_year = datetime.datetime.now().year
         self.years = [str(current_year - i) for i in range(years)][::-1]
         
-        # Create sample income statement
-        self.income_statement = pd.DataFrame({
-            self.years[0]: {
-                'Revenue': 500000,
-                'Cost of Goods Sold': 300000,
-                'Gross Profit': 200000,
-                'Operating Expenses': 120000,
-                'Depreciation': 15000,
-                'Amortization': 5000,
-                'EBIT': 60000,
-                'Interest Expense': 8000,
-                'Income Before Taxes': 52000,
-                'Income Taxes': 15600,
-                'Net Income': 36400
-            }
-        })
-        
-        # Add some growth for subsequent years
-        for i in range(1, years):
-            growth_factor = 1.1 + (i * 0.05)  # Increasing growth
-            self.income_statement[self.years[i]] = self.income_statement[self.years[0]] * growth_factor
-        
-        # Create sample balance sheet
-        self.balance_sheet = pd.DataFrame({
-            self.years[0]: {
-                'Cash': 45000,
-                'Accounts Receivable': 60000,
-                'Inventory': 75000,
-                'Other Current Assets': 10000,
-                'Total Current Assets': 190000,
-                'Property, Plant & Equipment': 250000,
-                'Accumulated Depreciation': -65000,
-                'Net PP&E': 185000,
-                'Intangible Assets': 25000,
-                'Other Long-term Assets': 15000,
-                'Total Assets': 415000,
-                'Accounts Payable': 35000,
-                'Short-term Debt': 15000,
-                'Current Portion of Long-term Debt': 12000,
-                'Other Current Liabilities': 18000,
-                'Total Current Liabilities': 80000,
-                'Long-term Debt': 120000,
-                'Other Long-term Liabilities': 20000,
-                'Total Liabilities': 220000,
-                'Equity': 195000,
-                'Total Liabilities & Equity': 415000
-            }
-        })
-        
-        # Add some changes for subsequent years
-        for i in range(1, years):
-            asset_growth = 1.08 + (i * 0.04)
-            liability_growth = 1.05 + (i * 0.03)
-            
-            new_balance = {}
-            for account, value in self.balance_sheet[self.years[0]].items():
-                if 'Asset' in account or account in ['Cash', 'Inventory', 'Receivable', 'PP&E']:
-                    new_balance[account] = value * asset_growth
-                elif 'Liabilit' in account or 'Debt' in account or 'Payable' in account:
-                    new_balance[account] = value * liability_growth
-                else:
-                    # For equity and other calculated fields, just use a placeholder
-                    new_balance[account] = value * asset_growth
-            
-            # Fix the balance sheet to balance
-            total_assets = (new_balance['Total Current Assets'] 
-                           + new_balance['Net PP&E'] 
-                           + new_balance['Intangible Assets'] 
-                           + new_balance['Other Long-term Assets'])
-            new_balance['Total Assets'] = total_assets
-            
-            total_liabilities = new_balance['Total Liabilities']
-            new_balance['Equity'] = total_assets - total_liabilities
-            new_balance['Total Liabilities & Equity'] = total_liabilities + new_balance['Equity']
-            
-            self.balance_sheet[self.years[i]] = pd.Series(new_balance)
+        # Base-year statements; later years are derived for every account at once
+        base_income = {
+            'Revenue': 500000,
+            'Cost of Goods Sold': 300000,
+            'Gross Profit': 200000,
+            'Operating Expenses': 120000,
+            'Depreciation': 15000,
+            'Amortization': 5000,
+            'EBIT': 60000,
+            'Interest Expense': 8000,
+            'Income Before Taxes': 52000,
+            'Income Taxes': 15600,
+            'Net Income': 36400
+        }
+        base_balance = {
+            'Cash': 45000,
+            'Accounts Receivable': 60000,
+            'Inventory': 75000,
+            'Other Current Assets': 10000,
+            'Total Current Assets': 190000,
+            'Property, Plant & Equipment': 250000,
+            'Accumulated Depreciation': -65000,
+            'Net PP&E': 185000,
+            'Intangible Assets': 25000,
+            'Other Long-term Assets': 15000,
+            'Total Assets': 415000,
+            'Accounts Payable': 35000,
+            'Short-term Debt': 15000,
+            'Current Portion of Long-term Debt': 12000,
+            'Other Current Liabilities': 18000,
+            'Total Current Liabilities': 80000,
+            'Long-term Debt': 120000,
+            'Other Long-term Liabilities': 20000,
+            'Total Liabilities': 220000,
+            'Equity': 195000,
+            'Total Liabilities & Equity': 415000
+        }
+        
+        # Growth factors per year (1.0 for the base year)
+        offsets = np.arange(years)
+        income_growth = np.where(offsets == 0, 1.0, 1.1 + offsets * 0.05)  # Increasing growth
+        asset_growth = np.where(offsets == 0, 1.0, 1.08 + offsets * 0.04)
+        liability_growth = np.where(offsets == 0, 1.0, 1.05 + offsets * 0.03)
+        
+        accounts = {account: value * income_growth for account, value in base_income.items()}
+        for account, value in base_balance.items():
+            if 'Asset' not in account and ('Liabilit' in account or 'Debt' in account or 'Payable' in account):
+                accounts[account] = value * liability_growth
+            else:
+                # Assets, plus equity and other calculated fields as a placeholder
+                accounts[account] = value * asset_growth
+        
+        statements = FinancialStatements.from_accounts(accounts, self.years)
+        
+        # Fix the balance sheet to balance (the base year is already balanced)
+        later = slice(1, None)
+        total_assets = (statements['Total Current Assets'][later]
+                        + statements['Net PP&E'][later]
+                        + statements['Intangible Assets'][later]
+                        + statements['Other Long-term Assets'][later])
+        statements['Total Assets'][later] = total_assets
+        total_liabilities = statements['Total Liabilities'][later]
+        statements['Equity'][later] = total_assets - total_liabilities
+        statements['Total Liabilities & Equity'][later] = total_liabilities + statements['Equity'][later]
+        
+        self.load_statements(statements)
         
         print("Created sample financial data for demonstration")
         return True
     
+    def load_statements(self, statements):
+        """
+        Load financial data from a compact FinancialStatements container.
+        
+        Parameters:
+        ----------
+        statements : FinancialStatements
+            Array-backed statements (see financial_statements.py)
+        """
+        self.income_statement, self.balance_sheet = statements.to_frames()
+        self.years = list(statements.years)
+        return True
+    
+    def to_statements(self):
+        """
+        Return the loaded statements as a compact FinancialStatements container.
+        
+        Lines outside the fixed account schema are dropped. Raises
+        ValueError if no financial data is loaded.
+        """
+        if self.income_statement is None:
+            raise ValueError("Financial data not loaded")
+        return FinancialStatements.from_frames(self.income_statement, self.balance_sheet, self.years)
+    
+    def load_debt_schedule(self, schedule):
+        """
+        Use a debt schedule for principal and interest instead of the
+        balance sheet's Current Portion of Long-term Debt.
+        
+        Once loaded, Interest Expense and Principal Payments in the EBITDA
+        and Debt Service Coverage analyses (and every metric built on them,
+        such as DSCR) are the exact amounts due on the borrower's notes in
+        each fiscal year (see loan_schedule.py). Year labels must be numeric.
+        
+        The EBITDA, Debt Service Coverage and pro forma DSCR tables already
+        calculated are discarded, since they used the previous debt service;
+        recalculate them (e.g. run_full_analysis) before exporting.
+        
+        Parameters:
+        ----------
+        schedule : DebtSchedule, pandas.DataFrame or None
+            The borrower's notes, one row per note; None reverts to the
+            balance sheet approximation. Schedules covering several
+            borrowers are rejected (see portfolio_analysis.py).
+        """
+        try:
+            if isinstance(schedule, pd.DataFrame):
+                schedule = DebtSchedule.from_frame(schedule)
+        except KeyError as e:
+            print(f"Missing column in debt schedule: {e}")
+            return False
+        
+        if schedule is not None and schedule.borrower_ids is not None and len(set(schedule.borrower_ids)) > 1:
+            print("Error: Debt schedule covers several borrowers; load only this borrower's notes")
+            return False
+        
+        self.debt_schedule = schedule
+        for attribute in DEBT_SERVICE_TABLES:
+            setattr(self, attribute, None)
+        return True
+    
+    def _scheduled_debt_service(self):
+        """Principal Payments and Interest Expense by year from the debt schedule, or None."""
+        if self.debt_schedule is None:
+            return None
+        return self.debt_schedule.debt_service(self.years)
+    
     def calculate_uca_cash_flow(self):
         """
         Calculate Uniform Credit Analysis (UCA) Cash Flow.
@@ -180,6 +361,9 @@ class SmallBusinessCashFlowAnalyzer:
             print("Error: Financial data not loaded")
             return False
         
+        if self.engine == 'vectorized':
+            return self._calculate_vectorized('uca_cash_flow', UCA_ROWS, "UCA Cash Flow")
+        
         data = {}
         for year in self.years:
             # Get values from income statement
@@ -261,8 +445,17 @@ class SmallBusinessCashFlowAnalyzer:
             print("Error: Income statement data not loaded")
             return False
         
+        if self.engine == 'vectorized':
+            return self._calculate_vectorized('ebitda_analysis', EBITDA_ROWS, "EBITDA")
+        
+        try:
+            debt_service = self._scheduled_debt_service()
+        except ValueError as e:
+            print(f"Error calculating EBITDA: {e}")
+            return False
+        
         data = {}
-        for year in self.years:
+        for j, year in enumerate(self.years):
             try:
                 # Direct EBITDA calculation from income statement
                 revenue = self.income_statement.loc['Revenue', year]
@@ -271,6 +464,8 @@ class SmallBusinessCashFlowAnalyzer:
                 depreciation = self.income_statement.loc['Depreciation', year]
                 amortization = self.income_statement.loc['Amortization', year]
                 interest = self.income_statement.loc['Interest Expense', year]
+                if debt_service is not None:
+                    interest = debt_service['Interest Expense'][j]
                 taxes = self.income_statement.loc['Income Taxes', year]
                 
                 # Calculate EBITDA components
@@ -305,21 +500,56 @@ class SmallBusinessCashFlowAnalyzer:
         self.ebitda_analysis = pd.DataFrame(data)
         return True
     
-    def calculate_debt_service_coverage(self):
+    def calculate_debt_service_coverage(self, loan_amounts=None, loan_rates=None, loan_terms=None,
+                                        basis='EBITDA', period=None, payments_per_year=12):
         """
         Calculate Debt Service Coverage Ratio (DSCR) and related debt metrics.
+        
+        Pro forma mode: when a proposed loan grid is given, the DSCR with the
+        new loan added is also computed for every amount x rate x term
+        combination (see calculate_pro_forma_dscr).
+        
+        Parameters:
+        ----------
+        loan_amounts, loan_rates, loan_terms : array-like, optional
+            Proposed loan amounts, annual rates (decimals) and fully
+            amortizing terms in years
+        basis, period, payments_per_year
+            Pro forma options (see calculate_pro_forma_dscr)
         """
         if self.income_statement is None or self.balance_sheet is None:
             print("Error: Financial data not loaded")
             return False
         
+        if not self._calculate_debt_service_coverage():
+            return False
+        if loan_amounts is None and loan_rates is None and loan_terms is None:
+            return True
+        return self.calculate_pro_forma_dscr(loan_amounts, loan_rates, loan_terms,
+                                             basis=basis, period=period,
+                                             payments_per_year=payments_per_year)
+    
+    def _calculate_debt_service_coverage(self):
+        """
+        Historical DSCR table for the loaded years.
+        """
+        if self.engine == 'vectorized':
+            # EBITDA is an input node of the metric graph; no separate pass needed
+            return self._calculate_vectorized('dscr_analysis', DSCR_ROWS, "Debt Service Coverage")
+        
         if self.ebitda_analysis is None:
             success = self.calculate_ebitda()
             if not success:
                 return False
         
+        try:
+            debt_service = self._scheduled_debt_service()
+        except ValueError as e:
+            print(f"Error calculating Debt Service Coverage: {e}")
+            return False
+        
         data = {}
-        for year in self.years:
+        for j, year in enumerate(self.years):
             try:
                 # Get necessary values
                 ebitda = self.ebitda_analysis.loc['EBITDA', year]
@@ -329,7 +559,12 @@ class SmallBusinessCashFlowAnalyzer:
                 current_portion_ltd = self.balance_sheet.loc['Current Portion of Long-term Debt', year]
                 
                 # Calculate total debt service
-                principal_payments = current_portion_ltd  # This is simplified
+                if debt_service is not None:
+                    # Exact amounts due on the borrower's notes
+                    interest = debt_service['Interest Expense'][j]
+                    principal_payments = debt_service['Principal Payments'][j]
+                else:
+                    principal_payments = current_portion_ltd  # This is simplified
                 total_debt_service = interest + principal_payments
                 
                 # Calculate coverage ratios
@@ -369,6 +604,63 @@ class SmallBusinessCashFlowAnalyzer:
         self.dscr_analysis = pd.DataFrame(data)
         return True
     
+    def calculate_pro_forma_dscr(self, loan_amounts, loan_rates, loan_terms, basis='EBITDA',
+                                 period=None, payments_per_year=12):
+        """
+        DSCR with a proposed new loan added to existing debt service.
+        
+        A level-payment loan's annual debt service is computed for every
+        amount x rate x term combination in one broadcast operation and added
+        to the period's existing debt service (scheduled when a debt schedule
+        is loaded). The result is stored in self.pro_forma_dscr and exported
+        as the 'Pro Forma DSCR' sheet.
+        
+        Parameters:
+        ----------
+        loan_amounts : array-like
+            Proposed loan amounts
+        loan_rates : array-like
+            Annual interest rates as decimals, e.g. [0.06, 0.07]
+        loan_terms : array-like
+            Fully amortizing terms in years
+        basis : str
+            Cash flow available for debt service: 'EBITDA', or 'UCA Cash
+            Flow' with the reported interest expense added back
+        period : optional
+            Year whose cash flow and debt service are used; defaults to the
+            most recent year
+        payments_per_year : int
+            Payment frequency of the proposed loan
+        """
+        if self.income_statement is None or self.balance_sheet is None:
+            print("Error: Financial data not loaded")
+            return False
+        if loan_amounts is None or loan_rates is None or loan_terms is None:
+            print("Error: Pro forma DSCR needs loan amounts, rates and terms")
+            return False
+        if basis not in PRO_FORMA_BASES:
+            print(f"Error: Unknown pro forma basis '{basis}'. Expected one of: {', '.join(PRO_FORMA_BASES)}")
+            return False
+        
+        period = self.years[-1] if period is None else period
+        if period not in self.years:
+            print(f"Error: Period {period} not in the loaded years")
+            return False
+        
+        values = self.get_metrics([basis, 'Total Debt Service'])
+        if values is None:
+            return False
+        cash_available = values.loc[basis, period]
+        if basis == 'UCA Cash Flow':
+            # Net income is after the existing interest, which is part of the debt service below
+            cash_available += self.income_statement.loc['Interest Expense', period]
+        
+        grid = pro_forma_dscr(cash_available, values.loc['Total Debt Service', period],
+                              loan_amounts, loan_rates, loan_terms, payments_per_year)
+        self.pro_forma_dscr = pro_forma_to_frame(grid, loan_amounts, loan_rates, loan_terms)
+        self.pro_forma_dscr.attrs.update({'basis': basis, 'period': period})
+        return True
+    
     def calculate_financial_ratios(self):
         """
         Calculate key financial ratios for small business lending analysis.
@@ -377,6 +669,9 @@ class SmallBusinessCashFlowAnalyzer:
             print("Error: Financial data not loaded")
             return False
         
+        if self.engine == 'vectorized':
+            return self._calculate_vectorized('ratios', RATIO_ROWS, "Financial Ratios")
+        
         data = {}
         for year in self.years:
             try:
@@ -447,17 +742,275 @@ class SmallBusinessCashFlowAnalyzer:
         self.ratios = pd.DataFrame(data)
         return True
     
+    def metric_graph(self):
+        """
+        Return the memoized metric graph for the loaded statements.
+        
+        The graph is rebuilt whenever the statement DataFrames, years or debt
+        schedule are replaced. Call reset_metrics() after editing a statement
+        in place.
+        """
+        # Compare the statements by identity; holding them also keeps their ids unique
+        source = (self.income_statement, self.balance_sheet, self.debt_schedule, tuple(self.years))
+        if (self._metric_graph is None or self._metric_graph_source[3] != source[3] or
+                any(a is not b for a, b in zip(self._metric_graph_source[:3], source[:3]))):
+            matrix = statements_to_matrix(self.income_statement, self.balance_sheet, self.years)
+            # Scheduled debt service takes the place of the reported interest and CPLTD proxy
+            self._metric_graph = MetricGraph(matrix, known=self._scheduled_debt_service(),
+                                             missing=missing_accounts(self.income_statement,
+                                                                      self.balance_sheet))
+            self._metric_graph_source = source
+        return self._metric_graph
+    
+    def reset_metrics(self):
+        """Discard memoized metric values so they are recomputed on next access."""
+        self._metric_graph = None
+        self._metric_graph_source = None
+    
+    def get_metrics(self, metrics):
+        """
+        Evaluate only the requested metrics and the metrics they depend on.
+        
+        Values are memoized, so screening passes that ask for e.g. just
+        'Debt Service Coverage Ratio (DSCR)' skip every unrelated calculation.
+        
+        Parameters:
+        ----------
+        metrics : list
+            Metric or account names (any row label of the analysis tables)
+        
+        Returns:
+        -------
+        pandas.DataFrame or None
+            Requested metrics as rows and years as columns, or None on error
+        """
+        if self.income_statement is None:
+            print("Error: Financial data not loaded")
+            return None
+        
+        try:
+            values = self.metric_graph().evaluate(metrics)
+        except KeyError as e:
+            print(f"Missing key in financial data: {e}")
+            return None
+        except ValueError as e:
+            print(f"Error: {e}")
+            return None
+        
+        return metrics_to_frame(values, self.years)
+    
+    def get_metric(self, metric):
+        """
+        Evaluate a single metric by year (see get_metrics).
+        
+        Returns:
+        -------
+        pandas.Series or None
+        """
+        result = self.get_metrics([metric])
+        return None if result is None else result.loc[metric]
+    
+    def _calculate_vectorized(self, attribute, rows, label):
+        """
+        Compute one analysis table with the vectorized engine.
+        
+        Parameters:
+        ----------
+        attribute : str
+            Analyzer attribute that receives the resulting DataFrame
+        rows : tuple
+            Metric names making up the table, in display order
+        label : str
+            Analysis name used in error messages
+        """
+        try:
+            metrics = self.metric_graph().evaluate(rows)
+        except KeyError as e:
+            print(f"Missing key in financial data: {e}")
+            return False
+        except Exception as e:
+            print(f"Error calculating {label}: {e}")
+            return False
+        
+        setattr(self, attribute, metrics_to_frame(metrics, self.years))
+        return True
+    
+    def append_period(self, period, income_values, balance_values):
+        """
+        Add a new fiscal year or interim period and update the analysis incrementally.
+        
+        Working capital changes depend only on adjacent periods, so only the
+        new period (and its change from the prior period) is computed; the
+        existing columns of uca_cash_flow, ebitda_analysis, dscr_analysis and
+        ratios are left untouched. Tables that have not been calculated yet
+        are skipped and will cover every period when calculated.
+        
+        Parameters:
+        ----------
+        period : str or int
+            Column label for the new period, e.g. '2027' or '2027Q1'; it must
+            start after the most recent loaded period ends
+        income_values : dict or pandas.Series
+            Income statement account -> value for the new period; every
+            account the analysis reads that the loaded statement has is required
+        balance_values : dict or pandas.Series
+            Balance sheet account -> value for the new period, likewise
+        """
+        if self.income_statement is None or self.balance_sheet is None:
+            print("Error: Financial data not loaded")
+            return False
+        
+        if period in self.years:
+            print(f"Error: Period {period} is already loaded")
+            return False
+        
+        # Working capital changes are taken against the last column, so the new period must follow it
+        previous, new = _period_span(self.years[-1]), _period_span(period)
+        if previous is None or new is None:
+            print(f"Error: Cannot determine whether period {period} follows {self.years[-1]}")
+            return False
+        if new[0] <= previous[1]:
+            print(f"Error: Period {period} does not come after the most recent period {self.years[-1]}")
+            return False
+        
+        income_values = pd.Series(income_values, name=period, dtype=np.float64)
+        balance_values = pd.Series(balance_values, name=period, dtype=np.float64)
+        missing = [account for accounts, statement, values in (
+                       (INCOME_ACCOUNTS, self.income_statement, income_values),
+                       (BALANCE_ACCOUNTS, self.balance_sheet, balance_values))
+                   for account in accounts
+                   if account in statement.index and pd.isna(values.get(account, np.nan))]
+        if missing:
+            print(f"Error: Period {period} is missing values for: {', '.join(missing)}")
+            return False
+        
+        income_statement = pd.concat([self.income_statement, income_values], axis=1)
+        balance_sheet = pd.concat([self.balance_sheet, balance_values], axis=1)
+        
+        # Only the prior period is needed for the new period's working capital changes
+        window = self.years[-1:] + [period]
+        try:
+            known = None if self.debt_schedule is None else self.debt_schedule.debt_service(window)
+            graph = MetricGraph(statements_to_matrix(income_statement, balance_sheet, window), known=known,
+                                missing=missing_accounts(income_statement, balance_sheet))
+            new_columns = {}
+            for attribute, rows in STATE_TABLES:
+                if getattr(self, attribute) is not None:
+                    new_columns[attribute] = [values[-1] for values in graph.evaluate(rows).values()]
+        except KeyError as e:
+            print(f"Missing key in financial data: {e}")
+            return False
+        except Exception as e:
+            print(f"Error appending period {period}: {e}")
+            return False
+        
+        self.income_statement = income_statement
+        self.balance_sheet = balance_sheet
+        self.years = self.years + [period]
+        for attribute, values in new_columns.items():
+            getattr(self, attribute)[period] = values
+        self.reset_metrics()
+        
+        print(f"Appended period {period}")
+        return True
+    
+    def save_state(self, file_path):
+        """
+        Persist the borrower's statements, debt schedule and analysis tables to a .npz file.
+        
+        Together with load_state and append_period this lets periodic
+        monitoring work only on new periods instead of re-running the
+        full analysis.
+        
+        Parameters:
+        ----------
+        file_path : str
+            Output path (conventionally ending in .npz)
+        """
+        if self.income_statement is None or self.balance_sheet is None:
+            print("Error: Financial data not loaded")
+            return False
+        
+        arrays = {}
+        for attribute in STATE_STATEMENTS + tuple(attribute for attribute, _ in STATE_TABLES):
+            frame = getattr(self, attribute)
+            if frame is None:
+                continue
+            encoded = frame_to_arrays(attribute, frame)
+            if encoded is None:
+                print(f"Error: {attribute} contains values or labels that cannot be saved")
+                return False
+            arrays.update(encoded)
+        
+        if self.debt_schedule is not None:
+            arrays.update(frame_to_arrays('debt_schedule', pd.DataFrame(self.debt_schedule.columns)))
+        
+        try:
+            with open(file_path, 'wb') as f:
+                np.savez(f, **arrays)
+            return True
+        except Exception as e:
+            print(f"Error saving state: {e}")
+            return False
+    
+    def load_state(self, file_path):
+        """
+        Restore statements, debt schedule and analysis tables written by save_state.
+        
+        Replaces any debt schedule already loaded, and discards the pro forma
+        DSCR table, which is not saved.
+        
+        Parameters:
+        ----------
+        file_path : str
+            Path of the saved state
+        """
+        try:
+            with np.load(file_path, allow_pickle=False) as arrays:
+                frames = {}
+                for attribute in STATE_STATEMENTS + tuple(attribute for attribute, _ in STATE_TABLES):
+                    if f'{attribute}_values' in arrays:
+                        frames[attribute] = arrays_to_frame(attribute, arrays)
+                notes = arrays_to_frame('debt_schedule', arrays) if 'debt_schedule_values' in arrays else None
+        except Exception as e:
+            print(f"Error loading state: {e}")
+            return False
+        
+        missing = [attribute for attribute in STATE_STATEMENTS if attribute not in frames]
+        if missing:
+            print(f"Error: {file_path} has no {' or '.join(missing)}")
+            return False
+        
+        for attribute in STATE_STATEMENTS + tuple(attribute for attribute, _ in STATE_TABLES):
+            setattr(self, attribute, frames.get(attribute))
+        # A state saved without a schedule used the balance sheet approximation
+        self.debt_schedule = None if notes is None else DebtSchedule({name: notes[name].to_numpy()
+                                                                      for name in notes.columns})
+        self.pro_forma_dscr = None
+        self.years = list(self.income_statement.columns)
+        self.reset_metrics()
+        
+        print(f"Loaded state from {file_path}")
+        print(f"Years analyzed: {', '.join(map(str, self.years))}")
+        return True
+    
     def run_full_analysis(self):
         """
         Run all analysis components.
         """
-        success = True
-        success = success and self.calculate_uca_cash_flow()
-        success = success and self.calculate_ebitda()
-        success = success and self.calculate_debt_service_coverage()
-        success = success and self.calculate_financial_ratios()
+        stages = (
+            ('uca', self.calculate_uca_cash_flow),
+            ('ebitda', self.calculate_ebitda),
+            ('dscr', self.calculate_debt_service_coverage),
+            ('ratios', self.calculate_financial_ratios),
+        )
+        with self._stage('analysis'):
+            for name, calculate in stages:
+                with self._stage(name):
+                    if not calculate():
+                        return False
         
-        return success
+        return True
     
     def format_excel_sheet(self, ws, df, title):
         """
@@ -472,48 +1025,90 @@ class SmallBusinessCashFlowAnalyzer:
         title : str
             Title for the worksheet
         """
-        # Add title
-        ws.merge_cells('A1:F1')
-        ws['A1'] = title
-        ws['A1'].font = Font(bold=True, size=14)
-        ws['A1'].alignment = Alignment(horizontal='center')
+        self.write_cells(ws, self._table_cells(df, title), merges=[TITLE_MERGE])
+    
+    def _table_cells(self, df, title):
+        """
+        Yield (row, column, value, style) cells for a titled analysis table.
+        
+        The title is in row 1 and the DataFrame starts at row 3, with the
+        header row highlighted and numbers formatted by metric label.
+        """
+        yield 1, 1, title, 'title'
         
-        # Add DataFrame starting at row 3
         rows = dataframe_to_rows(df, index=True, header=True)
         for r_idx, row in enumerate(rows, start=3):
+            # dataframe_to_rows emits an index-name row after the header,
+            # so take the metric label from the row itself
+            label = str(row[0])
+            percent = 'Ratio' in label or 'Margin' in label or '%' in label
             for c_idx, value in enumerate(row, start=1):
-                cell = ws.cell(row=r_idx, column=c_idx, value=value)
-                
-                # Format the header row
                 if r_idx == 3:
-                    cell.font = Font(bold=True)
-                    cell.fill = PatternFill(start_color="DDEBF7", end_color="DDEBF7", fill_type="solid")
-                    cell.alignment = Alignment(horizontal='center')
-                    
-                # Format the index column
-                if c_idx == 1 and r_idx > 3:
-                    cell.font = Font(bold=True)
-                    
-                # Format numbers
-                if isinstance(value, (int, float)) and r_idx > 3 and c_idx > 1:
-                    if 'Ratio' in str(df.index[r_idx-4]) or 'Margin' in str(df.index[r_idx-4]) or '%' in str(df.index[r_idx-4]):
-                        # Format as percentage with 2 decimal places
-                        ws.cell(row=r_idx, column=c_idx).number_format = '0.00%'
-                    else:
-                        # Format as number with commas and 2 decimal places
-                        ws.cell(row=r_idx, column=c_idx).number_format = '#,##0.00'
+                    # Format the header row
+                    style = 'header'
+                elif c_idx == 1:
+                    # Format the index column
+                    style = 'label'
+                elif isinstance(value, (int, float)):
+                    # Format numbers as percentages or with commas, 2 decimal places
+                    style = 'percent' if percent else 'number'
+                else:
+                    style = None
+                yield r_idx, c_idx, value, style
+    
+    def write_cells(self, ws, cells, merges=()):
+        """
+        Write styled cells to a worksheet and size columns to their contents.
+        
+        Column widths are tracked while the cells are written. For write-only
+        worksheets the rows are buffered until the widths are known (Excel
+        needs them before the first row), then streamed in order.
+        
+        Parameters:
+        ----------
+        ws : openpyxl.worksheet.worksheet.Worksheet
+            Regular or write-only worksheet; a write-only worksheet must not
+            have any rows yet
+        cells : iterable
+            (row, column, value, style) tuples, where style is a CELL_STYLES key
+        merges : iterable
+            Cell ranges to merge, e.g. 'A1:F1'
+        """
+        write_only = ws.parent.write_only
+        widths = {}
+        rows = {}
+        max_column = 0
+        
+        for merge in merges:
+            if write_only:
+                ws.merged_cells.add(merge)
+            else:
+                ws.merge_cells(merge)
+            max_column = max(max_column, range_boundaries(merge)[2])
+        
+        for row, column, value, style in cells:
+            if write_only:
+                cell = WriteOnlyCell(ws, value)
+                rows.setdefault(row, {})[column] = cell
+            else:
+                cell = ws.cell(row=row, column=column, value=value)
+            for attribute, style_value in CELL_STYLES[style].items():
+                setattr(cell, attribute, style_value)
+            
+            max_column = max(max_column, column)
+            if value:
+                widths[column] = max(widths.get(column, 0), len(str(value)))
         
         # Auto-adjust column widths
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                if cell.value:
-                    max_length = max(max_length, len(str(cell.value)))
-            adjusted_width = max_length + 2
-            ws.column_dimensions[column_letter].width = adjusted_width
+        for column in range(1, max_column + 1):
+            ws.column_dimensions[get_column_letter(column)].width = widths.get(column, 0) + 2
+        
+        if write_only:
+            for row in range(1, max(rows, default=0) + 1):
+                row_cells = rows.get(row, {})
+                ws.append([row_cells.get(column) for column in range(1, max(row_cells, default=0) + 1)])
     
-    def add_chart(self, ws, data_range, title, categories_range, position):
+    def add_chart(self, ws, data_range, title, categories_range, position, max_row=None):
         """
         Add a line chart to the worksheet.
         
@@ -529,22 +1124,27 @@ class SmallBusinessCashFlowAnalyzer:
             Excel range for the categories (e.g., 'A4:A10')
         position : str
             Cell position for the top-left corner of the chart
+        max_row : int, optional
+            Last data row; defaults to ws.max_row (required for write-only
+            worksheets, which don't track it)
         """
+        max_row = ws.max_row if max_row is None else max_row
+        
         chart = LineChart()
         chart.title = title
         chart.style = 2
         chart.height = 10
         chart.width = 20
         
-        data = Reference(ws, min_col=2, min_row=3, max_col=len(self.years)+1, max_row=ws.max_row)
-        categories = Reference(ws, min_col=1, min_row=4, max_row=ws.max_row)
+        data = Reference(ws, min_col=2, min_row=3, max_col=len(self.years)+1, max_row=max_row)
+        categories = Reference(ws, min_col=1, min_row=4, max_row=max_row)
         
         chart.add_data(data, titles_from_data=True)
         chart.set_categories(categories)
         
         ws.add_chart(chart, position)
     
-    def export_to_excel(self, output_file='small_business_cash_flow_analysis.xlsx'):
+    def export_to_excel(self, output_file='small_business_cash_flow_analysis.xlsx', write_only=False):
         """
         Export all analysis results to a formatted Excel file.
         
@@ -552,41 +1152,148 @@ class SmallBusinessCashFlowAnalyzer:
         ----------
         output_file : str
             Path for the output Excel file
+        write_only : bool
+            Stream rows through an openpyxl write-only workbook instead of
+            building every sheet in memory. Produces the same workbook with
+            constant memory and much less overhead, which matters when
+            exporting one workbook per borrower across a portfolio.
         """
         if (self.uca_cash_flow is None or self.ebitda_analysis is None or 
             self.dscr_analysis is None or self.ratios is None):
             print("Error: Analysis not complete. Run full analysis first.")
             return False
         
-        # Create workbook
-        wb = Workbook()
+        rule_values = self._rule_values()
+        if rule_values is None:
+            return False
         
-        # Remove default sheet
-        default_sheet = wb.active
-        wb.remove(default_sheet)
+        with self._stage('export'):
+            # Create workbook
+            wb = Workbook(write_only=write_only)
+            
+            if not write_only:
+                # Remove default sheet
+                default_sheet = wb.active
+                wb.remove(default_sheet)
+            
+            # Add sheets for each analysis component
+            ws_summary = wb.create_sheet("Summary")
+            ws_uca = wb.create_sheet("UCA Cash Flow")
+            ws_ebitda = wb.create_sheet("EBITDA Analysis")
+            ws_dscr = wb.create_sheet("Debt Service Coverage")
+            ws_ratios = wb.create_sheet("Financial Ratios")
+            
+            # Format each sheet
+            with self._stage('format_sheets'):
+                self.format_excel_sheet(ws_uca, self.uca_cash_flow, "Uniform Credit Analysis (UCA) Cash Flow")
+                self.format_excel_sheet(ws_ebitda, self.ebitda_analysis, "EBITDA Analysis")
+                self.format_excel_sheet(ws_dscr, self.dscr_analysis, "Debt Service Coverage Analysis")
+                self.format_excel_sheet(ws_ratios, self.ratios, "Financial Ratios Analysis")
+            
+            # Add some charts (tables start at row 3, followed by the index-name row)
+            with self._stage('chart'):
+                self.add_chart(ws_ebitda, 'B9:D9', 'EBITDA Trend', 'A4:A9', 'A20',
+                               max_row=4 + len(self.ebitda_analysis))
+                self.add_chart(ws_dscr, 'B6:D6', 'Debt Service Coverage Ratio Trend', 'A4:A6', 'A15',
+                               max_row=4 + len(self.dscr_analysis))
+            
+            # Create summary sheet
+            with self._stage('summary'):
+                self.write_cells(ws_summary, self._summary_cells(rule_values), merges=[TITLE_MERGE])
+            
+            if self.pro_forma_dscr is not None:
+                with self._stage('pro_forma'):
+                    self.add_pro_forma_sheet(wb.create_sheet("Pro Forma DSCR"), self.pro_forma_dscr)
+            
+            # Save the workbook
+            try:
+                with self._stage('save'):
+                    wb.save(output_file)
+                print(f"Successfully exported analysis to {output_file}")
+                return True
+            except Exception as e:
+                print(f"Error saving Excel file: {e}")
+                return False
+    
+    def add_pro_forma_sheet(self, ws, table):
+        """
+        Write a pro forma DSCR table as a heat map.
         
-        # Add sheets for each analysis component
-        ws_summary = wb.create_sheet("Summary")
-        ws_uca = wb.create_sheet("UCA Cash Flow")
-        ws_ebitda = wb.create_sheet("EBITDA Analysis")
-        ws_dscr = wb.create_sheet("Debt Service Coverage")
-        ws_ratios = wb.create_sheet("Financial Ratios")
+        Each term is a block of loan amount rows with one column per rate,
+        shaded with the DSCR color scale.
         
-        # Format each sheet
-        self.format_excel_sheet(ws_uca, self.uca_cash_flow, "Uniform Credit Analysis (UCA) Cash Flow")
-        self.format_excel_sheet(ws_ebitda, self.ebitda_analysis, "EBITDA Analysis")
-        self.format_excel_sheet(ws_dscr, self.dscr_analysis, "Debt Service Coverage Analysis")
-        self.format_excel_sheet(ws_ratios, self.ratios, "Financial Ratios Analysis")
+        Parameters:
+        ----------
+        ws : openpyxl.worksheet.worksheet.Worksheet
+            Empty regular or write-only worksheet
+        table : pandas.DataFrame
+            Output of calculate_pro_forma_dscr (loan_schedule.pro_forma_to_frame)
+        """
+        self.write_cells(ws, self._pro_forma_cells(table), merges=[TITLE_MERGE])
+        first_row, last_row = 5, 4 + len(table)
+        ws.conditional_formatting.add(
+            f"C{first_row}:{get_column_letter(2 + table.shape[1])}{last_row}", dscr_color_scale())
+    
+    def _pro_forma_cells(self, table):
+        """
+        Yield (row, column, value, style) cells for the Pro Forma DSCR sheet.
+        
+        Title in row 1, basis in row 2, header in row 3 (rates as text so the
+        write-only export needs no per-cell formats) and data from row 5.
+        """
+        yield 1, 1, "Pro Forma Debt Service Coverage", 'title'
+        basis, period = table.attrs.get('basis'), table.attrs.get('period')
+        if basis is not None:
+            yield 2, 1, f"{basis} for {period} over existing plus proposed loan debt service", None
         
-        # Add some charts
-        self.add_chart(ws_ebitda, 'B9:D9', 'EBITDA Trend', 'A4:A9', 'A20')
-        self.add_chart(ws_dscr, 'B6:D6', 'Debt Service Coverage Ratio Trend', 'A4:A6', 'A15')
+        yield 3, 1, 'Term (Years)', 'header'
+        yield 3, 2, 'Loan Amount', 'header'
+        for c_idx, rate in enumerate(table.columns, start=3):
+            yield 3, c_idx, f"{rate:.2%}", 'header'
         
-        # Create summary sheet
-        ws_summary.merge_cells('A1:F1')
-        ws_summary['A1'] = "Small Business Cash Flow Analysis Summary"
-        ws_summary['A1'].font = Font(bold=True, size=16)
-        ws_summary['A1'].alignment = Alignment(horizontal='center')
+        previous_term = None
+        for r_idx, ((term, amount), dscr) in enumerate(zip(table.index, table.to_numpy()), start=5):
+            if term != previous_term:
+                yield r_idx, 1, term, 'label'
+                previous_term = term
+            yield r_idx, 2, amount, 'amount'
+            for c_idx, value in enumerate(dscr.tolist(), start=3):
+                yield r_idx, c_idx, value, 'number'
+    
+    def _rule_values(self):
+        """
+        Most recent period's value of every metric the lending rules read.
+        
+        Values come from the analysis tables shown on the Summary sheet, so
+        the comments always agree with the figures printed beside them.
+        
+        Returns:
+        -------
+        dict or None
+            Metric name -> value, or None if a metric is not in the tables
+        """
+        last_year = self.years[-1]
+        tables = (self.dscr_analysis, self.ratios, self.ebitda_analysis, self.uca_cash_flow)
+        values = {}
+        for metric in self.lending_rules.metrics:
+            table = next((table for table in tables if metric in table.index), None)
+            if table is None:
+                print(f"Error: Lending rules reference '{metric}', which is not in the analysis tables")
+                return None
+            values[metric] = table.loc[metric, last_year]
+        return values
+    
+    def _summary_cells(self, rule_values):
+        """
+        Yield (row, column, value, style) cells for the Summary sheet.
+        
+        Parameters:
+        ----------
+        rule_values : dict
+            Output of _rule_values; one comment line is written per output
+            of the lending rule table
+        """
+        yield 1, 1, "Small Business Cash Flow Analysis Summary", 'summary_title'
         
         # Add key metrics to summary
         key_metrics = [
@@ -598,95 +1305,102 @@ class SmallBusinessCashFlowAnalyzer:
             ('Return on Equity (%)', self.ratios.loc['Return on Equity (%)'])
         ]
         
-        ws_summary['A3'] = "Key Financial Metrics"
-        ws_summary['A3'].font = Font(bold=True, size=12)
+        yield 3, 1, "Key Financial Metrics", 'section'
+        for j, year in enumerate(self.years, start=0):
+            yield 3, j+2, year, 'label'
         
         for i, (metric, values) in enumerate(key_metrics, start=4):
-            ws_summary[f'A{i}'] = metric
-            ws_summary[f'A{i}'].font = Font(bold=True)
+            yield i, 1, metric, 'label'
             
+            # Format cells
+            style = 'percent' if "%" in metric or "Margin" in metric else 'number'
             for j, year in enumerate(self.years, start=0):
-                ws_summary.cell(row=3, column=j+2, value=year).font = Font(bold=True)
-                ws_summary.cell(row=i, column=j+2, value=values[year])
-                
-                # Format cells
-                if "%" in metric or "Margin" in metric:
-                    ws_summary.cell(row=i, column=j+2).number_format = '0.00%'
-                else:
-                    ws_summary.cell(row=i, column=j+2).number_format = '#,##0.00'
+                yield i, j+2, values[year], style
         
         # Add analysis summary and recommendations
-        ws_summary['A12'] = "Analysis Summary"
-        ws_summary['A12'].font = Font(bold=True, size=12)
-        
-        last_year = self.years[-1]
-        
-        # Generate some insights
-        dscr = self.dscr_analysis.loc['Debt Service Coverage Ratio (DSCR)', last_year]
-        current_ratio = self.ratios.loc['Current Ratio', last_year]
-        roe = self.ratios.loc['Return on Equity (%)', last_year]
-        
-        dscr_comment = (
-            "Strong debt service capacity" if dscr >= 1.5 else
-            "Adequate debt service capacity" if dscr >= 1.25 else
-            "Marginal debt service capacity" if dscr >= 1.1 else
-            "Weak debt service capacity - high risk"
-        )
-        
-        liquidity_comment = (
-            "Strong liquidity position" if current_ratio >= 2.0 else
-            "Adequate liquidity" if current_ratio >= 1.5 else
-            "Tight liquidity - monitor closely" if current_ratio >= 1.0 else
-            "Liquidity concern - potential cash flow issues"
-        )
+        yield 12, 1, "Analysis Summary", 'section'
         
-        profitability_comment = (
-            "Excellent profitability" if roe >= 20 else
-            "Good profitability" if roe >= 15 else
-            "Average profitability" if roe >= 10 else
-            "Below average profitability - review business model"
-        )
-        
-        ws_summary['A13'] = f"Debt Service: {dscr_comment} (DSCR: {dscr:.2f})"
-        ws_summary['A14'] = f"Liquidity: {liquidity_comment} (Current Ratio: {current_ratio:.2f})"
-        ws_summary['A15'] = f"Profitability: {profitability_comment} (ROE: {roe:.2f}%)"
+        # Comments and recommendation come from the lending rule table, each
+        # followed by the metrics its rules read
+        comments = self.lending_rules.evaluate_one(rule_values)
+        row = 13
+        for output, comment in comments.items():
+            if output == RECOMMENDATION:
+                continue
+            shown = []
+            for metric in self.lending_rules.output_metrics(output):
+                suffix = '%' if metric.endswith('(%)') else ''
+                shown.append(f"{SUMMARY_ABBREVIATIONS.get(metric, metric)}: {rule_values[metric]:.2f}{suffix}")
+            yield row, 1, f"{output}: {comment}" + (f" ({', '.join(shown)})" if shown else ""), None
+            row += 1
         
         # Overall recommendation
-        ws_summary['A17'] = "Lending Recommendation"
-        ws_summary['A17'].font = Font(bold=True, size=12)
-        
-        if dscr >= 1.25 and current_ratio >= 1.5 and roe >= 12:
-            recommendation = "Strong candidate for lending - low risk profile"
-        elif dscr >= 1.1 and current_ratio >= 1.0 and roe >= 8:
-            recommendation = "Acceptable candidate for lending - moderate risk profile"
-        else:
-            recommendation = "Caution advised - higher risk profile, consider additional collateral or guarantees"
-        
-        ws_summary['A18'] = recommendation
+        if RECOMMENDATION in comments:
+            row += 1
+            yield row, 1, "Lending Recommendation", 'section'
+            row += 1
+            yield row, 1, comments[RECOMMENDATION], None
         
         # Add header with company info
-        ws_summary['A20'] = "Report Generated:"
-        ws_summary['B20'] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
-        
-        # Auto-adjust column widths
-        for ws in [ws_summary, ws_uca, ws_ebitda, ws_dscr, ws_ratios]:
-            for column in ws.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    if cell.value:
-                        max_length = max(max_length, len(str(cell.value)))
-                adjusted_width = max_length + 2
-                ws.column_dimensions[column_letter].width = adjusted_width
-        
-        # Save the workbook
-        try:
-            wb.save(output_file)
-            print(f"Successfully exported analysis to {output_file}")
-            return True
-        except Exception as e:
-            print(f"Error saving Excel file: {e}")
+        row += 2
+        yield row, 1, "Report Generated:", None
+        yield row, 2, datetime.datetime.now().strftime("%Y-%m-%d %H:%M"), None
+        yield row + 1, 1, "Lending Rules Version:", None
+        yield row + 1, 2, self.lending_rules.version, None
+
+
+def compare_engines(income_statement, balance_sheet, years, debt_schedule=None, tolerance=1e-9):
+    """
+    Check that the pandas and vectorized engines agree on a set of statements.
+    
+    Every analysis is run on both engines, without stopping at the first
+    failure; the engines must succeed or fail on the same analyses and
+    produce the same tables where they succeed.
+    
+    Parameters:
+    ----------
+    income_statement, balance_sheet : pandas.DataFrame
+        Statements indexed by account with one column per year
+    years : list
+        Year columns to analyze
+    debt_schedule : DebtSchedule, optional
+        Notes loaded into both analyzers
+    tolerance : float
+        Largest relative difference accepted between table values
+    
+    Returns:
+    -------
+    bool
+        True if the engines agree; each difference is printed
+    """
+    results = {}
+    for engine in ENGINES:
+        analyzer = SmallBusinessCashFlowAnalyzer(engine=engine)
+        analyzer.income_statement = income_statement
+        analyzer.balance_sheet = balance_sheet
+        analyzer.years = list(years)
+        if debt_schedule is not None and not analyzer.load_debt_schedule(debt_schedule):
             return False
+        # Analyses in run_full_analysis order, since the pandas DSCR reads the EBITDA table
+        results[engine] = [(attribute, calculate(), getattr(analyzer, attribute)) for attribute, calculate in (
+            ('uca_cash_flow', analyzer.calculate_uca_cash_flow),
+            ('ebitda_analysis', analyzer.calculate_ebitda),
+            ('dscr_analysis', analyzer.calculate_debt_service_coverage),
+            ('ratios', analyzer.calculate_financial_ratios),
+        )]
+    
+    agree = True
+    for (attribute, expected_ok, expected), (_, ok, table) in zip(*results.values()):
+        if ok != expected_ok:
+            print(f"Engine mismatch: {attribute} {'succeeded' if ok else 'failed'} on the vectorized engine "
+                  f"but {'succeeded' if expected_ok else 'failed'} on the pandas engine")
+            agree = False
+        elif ok and (list(table.index) != list(expected.index) or list(table.columns) != list(expected.columns)
+                     or not np.allclose(table.to_numpy(dtype=np.float64), expected.to_numpy(dtype=np.float64),
+                                        rtol=tolerance, atol=0, equal_nan=True)):
+            print(f"Engine mismatch: {attribute} values differ")
+            agree = False
+    return agree
 
 
 def main():
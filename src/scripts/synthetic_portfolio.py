@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Synthetic Borrower Portfolio Generator
+
+Generates reproducible books of synthetic small business borrowers for load
+testing, benchmarking and capacity planning. N borrowers x Y years of
+statements are drawn in one vectorized pass straight into the
+FinancialStatements array layout (ACCOUNT_SCHEMA rows), so 100k borrowers
+take about a second.
+
+Statements are internally consistent:
+- Income statement subtotals foot (Gross Profit, EBIT, Income Before Taxes,
+  Net Income), and taxes are only charged on positive pre-tax income
+- Balance sheet subtotals foot and Total Assets equal Total Liabilities &
+  Equity; Equity is the balancing item
+- Working capital follows revenue and cost of goods sold through receivable,
+  inventory and payable days, depreciation follows gross PP&E, and interest
+  follows the debt balance
+
+Each borrower belongs to an industry (INDUSTRY_PROFILES) that sets the
+centre of its size, margin, growth, working capital, asset intensity and
+leverage distributions. Borrower-level size, profitability, growth and
+leverage factors are drawn jointly from FACTOR_CORRELATION (e.g. more
+profitable borrowers grow faster and carry less debt), and revenue growth
+shocks persist from year to year.
+
+Usage:
+    borrowers, industries = generate_portfolio(10000, years=5, seed=42)
+    results = analyze_portfolio(borrowers)
+
+    python synthetic_portfolio.py 500 --years 3 --seed 42 --output-dir synthetic/
+
+Author: Clarity Impact Finance
+"""
+
+import os
+import sys
+import argparse
+import datetime
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+from financial_statements import ACCOUNT_SCHEMA, SCHEMA_INDEX, INCOME_SCHEMA, BALANCE_SCHEMA, FinancialStatements
+
+
+# Industry distribution centres. Revenue is lognormal around revenue_median;
+# days are on revenue (receivables) or cost of goods sold (inventory,
+# payables); ratios are of revenue unless noted.
+INDUSTRY_PROFILES = {
+    'Retail': {
+        'revenue_median': 900000, 'revenue_sigma': 0.7, 'gross_margin': 0.35, 'opex_ratio': 0.25,
+        'growth': 0.04, 'receivable_days': 8, 'inventory_days': 70, 'payable_days': 35,
+        'ppe_intensity': 0.25, 'leverage': 0.45,
+    },
+    'Restaurant': {
+        'revenue_median': 750000, 'revenue_sigma': 0.6, 'gross_margin': 0.62, 'opex_ratio': 0.52,
+        'growth': 0.05, 'receivable_days': 3, 'inventory_days': 10, 'payable_days': 20,
+        'ppe_intensity': 0.60, 'leverage': 0.55,
+    },
+    'Manufacturing': {
+        'revenue_median': 2500000, 'revenue_sigma': 0.8, 'gross_margin': 0.30, 'opex_ratio': 0.17,
+        'growth': 0.03, 'receivable_days': 50, 'inventory_days': 80, 'payable_days': 40,
+        'ppe_intensity': 0.70, 'leverage': 0.50,
+    },
+    'Professional Services': {
+        'revenue_median': 600000, 'revenue_sigma': 0.7, 'gross_margin': 0.55, 'opex_ratio': 0.42,
+        'growth': 0.06, 'receivable_days': 45, 'inventory_days': 2, 'payable_days': 15,
+        'ppe_intensity': 0.15, 'leverage': 0.45,
+    },
+    'Construction': {
+        'revenue_median': 1800000, 'revenue_sigma': 0.8, 'gross_margin': 0.22, 'opex_ratio': 0.13,
+        'growth': 0.05, 'receivable_days': 60, 'inventory_days': 15, 'payable_days': 45,
+        'ppe_intensity': 0.35, 'leverage': 0.50,
+    },
+}
+
+# Correlation of the borrower-level (size, profitability, growth, leverage) factors
+FACTOR_CORRELATION = np.array([
+    [1.0, 0.2, -0.1, 0.1],
+    [0.2, 1.0, 0.3, -0.4],
+    [-0.1, 0.3, 1.0, 0.2],
+    [0.1, -0.4, 0.2, 1.0],
+])
+
+# Dispersion around the industry centres and the terms shared by all industries
+MARGIN_SD = 0.04          # Borrower gross margin shift per profitability factor
+MARGIN_NOISE = 0.01       # Year-to-year gross margin noise
+GROWTH_SD = 0.03          # Borrower growth shift per growth factor
+GROWTH_SHOCK_SD = 0.06    # Year-to-year revenue growth shock
+GROWTH_PERSISTENCE = 0.5  # Share of last year's growth shock carried forward
+LEVERAGE_SD = 0.5         # Borrower leverage shift (logit scale) per leverage factor
+TAX_RATE = 0.25
+INTEREST_RATE = (0.075, 0.015)  # Mean and standard deviation of the borrower's rate
+
+
+def _logit(p):
+    return np.log(p / (1 - p))
+
+
+def _expit(x):
+    return 1 / (1 + np.exp(-x))
+
+
+def year_labels(years, end_year=None):
+    """Year labels ending at end_year (default: the current year), as in create_sample_data."""
+    end_year = datetime.datetime.now().year if end_year is None else end_year
+    return [str(end_year - i) for i in range(years)][::-1]
+
+
+def generate_statement_array(n_borrowers, years=3, seed=0, industry_mix=None, end_year=None):
+    """
+    Generate N borrowers x Y years of statements as one array.
+
+    Parameters:
+    ----------
+    n_borrowers : int
+        Number of borrowers
+    years : int
+        Number of years per borrower
+    seed : int
+        Random seed; the same arguments always give the same portfolio
+    industry_mix : dict, optional
+        Industry -> weight (normalized); defaults to equal weights over
+        INDUSTRY_PROFILES
+    end_year : int, optional
+        Last year label; defaults to the current year
+
+    Returns:
+    -------
+    tuple
+        (values, year labels, industries): values has shape
+        (n_borrowers, len(ACCOUNT_SCHEMA), years) in ACCOUNT_SCHEMA row order,
+        industries is an array of industry names per borrower
+    """
+    industry_mix = industry_mix or dict.fromkeys(INDUSTRY_PROFILES, 1.0)
+    unknown = [industry for industry in industry_mix if industry not in INDUSTRY_PROFILES]
+    if unknown:
+        raise ValueError(f"Unknown industries: {', '.join(unknown)}")
+    names = list(industry_mix)
+    weights = np.array([industry_mix[name] for name in names], dtype=np.float64)
+
+    rng = np.random.default_rng(seed)
+    n, shape = n_borrowers, (n_borrowers, years)
+    industry = rng.choice(len(names), size=n, p=weights / weights.sum())
+
+    def profile(key):
+        """Per-borrower column (n, 1) of an industry profile parameter."""
+        return np.array([INDUSTRY_PROFILES[name][key] for name in names], dtype=np.float64)[industry, None]
+
+    # Correlated borrower factors: size, profitability, growth, leverage
+    size, profitability, growth_factor, leverage_factor = (
+        rng.standard_normal((n, 4)) @ np.linalg.cholesky(FACTOR_CORRELATION).T).T[:, :, None]
+
+    # Revenue path: lognormal base year, then persistent growth shocks
+    base_revenue = profile('revenue_median') * np.exp(profile('revenue_sigma') * size)
+    shocks = rng.standard_normal(shape) * GROWTH_SHOCK_SD
+    for t in range(1, years):
+        shocks[:, t] += GROWTH_PERSISTENCE * shocks[:, t - 1]
+    growth = np.clip(profile('growth') + GROWTH_SD * growth_factor + shocks, -0.5, None)
+    growth[:, 0] = 0.0
+    revenue = base_revenue * np.cumprod(1 + growth, axis=1)
+
+    # Income statement
+    gross_margin = np.clip(profile('gross_margin') + MARGIN_SD * profitability
+                           + MARGIN_NOISE * rng.standard_normal(shape), 0.05, 0.95)
+    opex_ratio = profile('opex_ratio') * np.exp(0.1 * rng.standard_normal((n, 1)))
+    cogs = revenue * (1 - gross_margin)
+    gross_profit = revenue - cogs
+    operating_expenses = revenue * opex_ratio
+
+    ppe = revenue * profile('ppe_intensity') * np.exp(0.3 * rng.standard_normal((n, 1)))
+    depreciation = ppe * rng.uniform(0.07, 0.15, (n, 1))
+    intangibles = revenue * rng.uniform(0.0, 0.06, (n, 1))
+    amortization = intangibles * 0.1
+    ebit = gross_profit - operating_expenses - depreciation - amortization
+
+    # Balance sheet assets; accumulated depreciation starts at 20-50% of gross
+    # PP&E and builds with each year's depreciation, capped at 90%
+    cash = revenue * rng.uniform(0.04, 0.12, (n, 1))
+    receivables = revenue * profile('receivable_days') * rng.uniform(0.7, 1.3, (n, 1)) / 365
+    inventory = cogs * profile('inventory_days') * rng.uniform(0.7, 1.3, (n, 1)) / 365
+    other_current_assets = revenue * rng.uniform(0.0, 0.04, (n, 1))
+    total_current_assets = cash + receivables + inventory + other_current_assets
+    accumulated_depreciation = -np.minimum(
+        ppe[:, :1] * rng.uniform(0.2, 0.5, (n, 1)) + np.cumsum(depreciation, axis=1) - depreciation[:, :1],
+        0.9 * ppe)
+    net_ppe = ppe + accumulated_depreciation
+    other_long_term_assets = revenue * rng.uniform(0.0, 0.05, (n, 1))
+    total_assets = total_current_assets + net_ppe + intangibles + other_long_term_assets
+
+    # Liabilities: debt is a leverage share of assets, split into short-term,
+    # current portion (one year of a 3-7 year term) and long-term debt
+    leverage = _expit(_logit(profile('leverage')) + LEVERAGE_SD * leverage_factor)
+    total_debt = total_assets * leverage
+    short_term_share = rng.uniform(0.05, 0.25, (n, 1))
+    term = rng.uniform(3, 7, (n, 1))
+    short_term_debt = total_debt * short_term_share
+    term_debt = total_debt - short_term_debt
+    current_portion = term_debt / term
+    long_term_debt = term_debt - current_portion
+    payables = cogs * profile('payable_days') * rng.uniform(0.7, 1.3, (n, 1)) / 365
+    other_current_liabilities = revenue * rng.uniform(0.01, 0.05, (n, 1))
+    total_current_liabilities = payables + short_term_debt + current_portion + other_current_liabilities
+    other_long_term_liabilities = total_assets * rng.uniform(0.0, 0.05, (n, 1))
+    total_liabilities = total_current_liabilities + long_term_debt + other_long_term_liabilities
+    equity = total_assets - total_liabilities
+
+    interest_rate = np.clip(rng.normal(*INTEREST_RATE, (n, 1)), 0.03, None)
+    interest_expense = total_debt * interest_rate
+    income_before_taxes = ebit - interest_expense
+    income_taxes = np.maximum(income_before_taxes, 0) * TAX_RATE
+    net_income = income_before_taxes - income_taxes
+
+    accounts = {
+        'Revenue': revenue,
+        'Cost of Goods Sold': cogs,
+        'Gross Profit': gross_profit,
+        'Operating Expenses': operating_expenses,
+        'Depreciation': depreciation,
+        'Amortization': amortization,
+        'EBIT': ebit,
+        'Interest Expense': interest_expense,
+        'Income Before Taxes': income_before_taxes,
+        'Income Taxes': income_taxes,
+        'Net Income': net_income,
+        'Cash': cash,
+        'Accounts Receivable': receivables,
+        'Inventory': inventory,
+        'Other Current Assets': other_current_assets,
+        'Total Current Assets': total_current_assets,
+        'Property, Plant & Equipment': ppe,
+        'Accumulated Depreciation': accumulated_depreciation,
+        'Net PP&E': net_ppe,
+        'Intangible Assets': intangibles,
+        'Other Long-term Assets': other_long_term_assets,
+        'Total Assets': total_assets,
+        'Accounts Payable': payables,
+        'Short-term Debt': short_term_debt,
+        'Current Portion of Long-term Debt': current_portion,
+        'Other Current Liabilities': other_current_liabilities,
+        'Total Current Liabilities': total_current_liabilities,
+        'Long-term Debt': long_term_debt,
+        'Other Long-term Liabilities': other_long_term_liabilities,
+        'Total Liabilities': total_liabilities,
+        'Equity': equity,
+        'Total Liabilities & Equity': total_liabilities + equity,
+    }
+
+    values = np.empty((n, len(ACCOUNT_SCHEMA), years))
+    for account, account_values in accounts.items():
+        # Whole currency units, as on borrower statements; subtotals are
+        # recomputed below so rounding never breaks footing
+        values[:, SCHEMA_INDEX[account]] = np.round(np.broadcast_to(account_values, shape))
+    _foot(values)
+    return values, year_labels(years, end_year), np.array(names, dtype=object)[industry]
+
+
+def _foot(values):
+    """Recompute subtotals and the Equity plug in place from rounded line items."""
+    def row(account):
+        return values[:, SCHEMA_INDEX[account]]
+
+    row('Gross Profit')[:] = row('Revenue') - row('Cost of Goods Sold')
+    row('EBIT')[:] = (row('Gross Profit') - row('Operating Expenses')
+                      - row('Depreciation') - row('Amortization'))
+    row('Income Before Taxes')[:] = row('EBIT') - row('Interest Expense')
+    row('Net Income')[:] = row('Income Before Taxes') - row('Income Taxes')
+
+    row('Total Current Assets')[:] = (row('Cash') + row('Accounts Receivable')
+                                      + row('Inventory') + row('Other Current Assets'))
+    row('Net PP&E')[:] = row('Property, Plant & Equipment') + row('Accumulated Depreciation')
+    row('Total Assets')[:] = (row('Total Current Assets') + row('Net PP&E')
+                              + row('Intangible Assets') + row('Other Long-term Assets'))
+    row('Total Current Liabilities')[:] = (row('Accounts Payable') + row('Short-term Debt')
+                                           + row('Current Portion of Long-term Debt')
+                                           + row('Other Current Liabilities'))
+    row('Total Liabilities')[:] = (row('Total Current Liabilities') + row('Long-term Debt')
+                                   + row('Other Long-term Liabilities'))
+    row('Equity')[:] = row('Total Assets') - row('Total Liabilities')
+    row('Total Liabilities & Equity')[:] = row('Total Liabilities') + row('Equity')
+
+
+def generate_portfolio(n_borrowers, years=3, seed=0, industry_mix=None, end_year=None, prefix='SYN'):
+    """
+    Generate a synthetic portfolio in the analyzer's array format.
+
+    Parameters:
+    ----------
+    n_borrowers, years, seed, industry_mix, end_year
+        See generate_statement_array
+    prefix : str
+        Borrower id prefix; ids are '<prefix>-000001', '<prefix>-000002', ...
+
+    Returns:
+    -------
+    tuple
+        (borrowers, industries): borrower id -> FinancialStatements (views
+        into one shared array), ready for analyze_portfolio,
+        summarize_portfolio or SmallBusinessCashFlowAnalyzer.load_statements;
+        and a pandas Series of industry names indexed by borrower id
+    """
+    values, labels, industries = generate_statement_array(
+        n_borrowers, years=years, seed=seed, industry_mix=industry_mix, end_year=end_year)
+    width = max(6, len(str(n_borrowers)))
+    ids = [f"{prefix}-{i:0{width}d}" for i in range(1, n_borrowers + 1)]
+    borrowers = {borrower_id: FinancialStatements(values[i], labels) for i, borrower_id in enumerate(ids)}
+    return borrowers, pd.Series(industries, index=ids, name='Industry')
+
+
+def write_statements_workbook(statements, file_path):
+    """
+    Write one borrower's statements as an xlsx file that load_from_excel reads.
+
+    The workbook has 'Income Statement' and 'Balance Sheet' sheets with
+    accounts down column A and one column per year.
+    """
+    wb = Workbook(write_only=True)
+    for sheet_name, accounts in (('Income Statement', INCOME_SCHEMA), ('Balance Sheet', BALANCE_SCHEMA)):
+        ws = wb.create_sheet(sheet_name)
+        ws.append(['Account'] + list(statements.years))
+        for account in accounts:
+            ws.append([account] + statements[account].tolist())
+    wb.save(file_path)
+
+
+def write_portfolio_workbooks(borrowers, output_dir):
+    """
+    Write one '<borrower id>.xlsx' statements workbook per borrower.
+
+    Returns:
+    -------
+    list
+        Paths of the written workbooks, in borrower order
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for borrower_id, statements in borrowers.items():
+        file_path = os.path.join(output_dir, f"{borrower_id}.xlsx")
+        write_statements_workbook(statements, file_path)
+        paths.append(file_path)
+    return paths
+
+
+def main(argv=None):
+    """
+    Command line interface for writing a synthetic portfolio to xlsx files.
+    """
+    parser = argparse.ArgumentParser(description="Generate synthetic borrower statements.")
+    parser.add_argument('borrowers', type=int, help="Number of borrowers")
+    parser.add_argument('--years', type=int, default=3, help="Years per borrower (default: %(default)s)")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed (default: %(default)s)")
+    parser.add_argument('--output-dir', default='synthetic_portfolio',
+                        help="Directory for the borrower workbooks (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    borrowers, industries = generate_portfolio(args.borrowers, years=args.years, seed=args.seed)
+    paths = write_portfolio_workbooks(borrowers, args.output_dir)
+    print(f"Wrote {len(paths)} borrower workbooks to {args.output_dir}")
+    for industry, count in industries.value_counts().sort_index().items():
+        print(f"  {industry}: {count}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())